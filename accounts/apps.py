@@ -9,3 +9,7 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     # The name of this app as used in settings and migrations.
     name = 'accounts'
+
+    def ready(self):
+        # Register the authorization cache invalidation signal handlers.
+        from . import signals  # noqa: F401
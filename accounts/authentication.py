@@ -0,0 +1,116 @@
+"""Stateless JWT authentication built from the claims in the access token.
+
+`MyTokenObtainPairSerializer` writes the user's role and staff flags into
+every token, so identifying the caller and checking permissions does not need
+the `User` row. `ClaimsJWTAuthentication` returns a `ClaimsUser` backed by the
+token instead of loading the row on every request; views that really need the
+model (to read the email, or to assign the user to a foreign key) call
+`get_full_user(request.user)`, which goes through a short-lived per-process cache.
+Async views use `aauthenticate` and `aget_full_user`, which do the same with
+the async ORM.
+
+Claims are only as fresh as the access token. Refreshing reloads the user
+(`MyTokenRefreshSerializer`), so a role change or deactivation applies within
+`ACCESS_TOKEN_LIFETIME` (five minutes by default) and a deactivated user can't
+refresh at all.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from lms_backend.caching import LRUCache
+
+from .models import User
+
+# Tokens issued before these claims existed are authenticated the old way.
+STATELESS_CLAIMS = ('role', 'is_staff', 'is_superuser')
+
+_users = LRUCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+)
+
+
+def get_cached_user(user_id):
+    """Return the active `User` with this id, from the per-process cache when possible."""
+    user = _users.get(user_id)
+    if user is None:
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        _users.set(user_id, user)
+    return user
+
+
+async def aget_cached_user(user_id):
+    """`get_cached_user` for async views."""
+    user = _users.get(user_id)
+    if user is None:
+        user = await User.objects.filter(pk=user_id, is_active=True).afirst()
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        _users.set(user_id, user)
+    return user
+
+
+def forget_cached_user(user_id):
+    """Drop a user from this process's cache (other processes expire it by TTL)."""
+    _users.delete(user_id)
+
+
+class ClaimsUser(TokenUser):
+    """A request user whose id, role and staff flags come from the token."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    def get_full_user(self):
+        return get_cached_user(self.id)
+
+    async def aget_full_user(self):
+        return await aget_cached_user(self.id)
+
+
+def get_full_user(user):
+    """Return the `User` model instance behind `request.user`."""
+    if isinstance(user, ClaimsUser):
+        return user.get_full_user()
+    return user
+
+
+async def aget_full_user(user):
+    """`get_full_user` for async views."""
+    if isinstance(user, ClaimsUser):
+        return await user.aget_full_user()
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """`JWTAuthentication` that trusts the token's claims instead of loading the user."""
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in STATELESS_CLAIMS):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        return ClaimsUser(validated_token)
+
+    async def aauthenticate(self, request):
+        """`authenticate` for async views; only tokens without the claims touch the database."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if all(claim in validated_token for claim in STATELESS_CLAIMS):
+            return self.get_user(validated_token), validated_token
+        return await sync_to_async(self.get_user)(validated_token), validated_token
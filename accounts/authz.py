@@ -0,0 +1,99 @@
+"""Request-scoped authorization context for role, ownership and enrollment checks.
+
+Permission classes and views ask the same questions many times per request
+("does this user own course 7?", "is this student enrolled in course 7?").
+`get_authorization(request)` builds one context per request that loads the
+user's owned and enrolled course ids lazily, once, as sets. With
+`AUTHZ_CACHE_TIMEOUT` set, the sets are also cached across requests under a
+per-user version (bumped when the user's enrollments change or the user is
+created) and the catalog version (bumped on every course write). Those
+versions live in the default cache, so this is only safe across workers when
+that cache is shared; it is off by default otherwise (see settings).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from courses.catalog import get_catalog_version
+from courses.models import Course
+from enrollments.models import Enrollment
+from lms_backend.caching import bump_version, get_version
+
+
+def _user_version_key(user_id):
+    return f'accounts:authz:version:{user_id}'
+
+
+def invalidate_user_authorization(user_id):
+    """Drop the cross-request cache of a user's owned/enrolled course ids."""
+    bump_version(_user_version_key(user_id))
+
+
+class AuthorizationContext:
+    """Role and course-membership facts about one user, computed at most once."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @property
+    def role(self):
+        return getattr(self.user, 'role', None) if self.is_authenticated else None
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_staff_admin(self):
+        """Admin role or Django staff/superuser flags (used for admin-only endpoints)."""
+        return self.is_authenticated and bool(self.is_admin or self.user.is_staff or self.user.is_superuser)
+
+    @cached_property
+    def _course_ids(self):
+        if not self.is_authenticated:
+            return frozenset(), frozenset()
+        timeout = getattr(settings, 'AUTHZ_CACHE_TIMEOUT', 0)
+        cache_key = None
+        if timeout:
+            user_version = get_version(_user_version_key(self.user.pk))
+            cache_key = f'accounts:authz:{self.user.pk}:{user_version}:{get_catalog_version()}'
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        owned = frozenset(Course.objects.filter(teacher_id=self.user.pk).values_list('id', flat=True))
+        enrolled = frozenset(Enrollment.objects.filter(student_id=self.user.pk).values_list('course_id', flat=True))
+        if cache_key:
+            cache.set(cache_key, (owned, enrolled), timeout=timeout)
+        return owned, enrolled
+
+    @property
+    def owned_course_ids(self):
+        return self._course_ids[0]
+
+    @property
+    def enrolled_course_ids(self):
+        return self._course_ids[1]
+
+    def owns_course(self, course_id):
+        return int(course_id) in self.owned_course_ids
+
+    def is_enrolled(self, course_id):
+        return int(course_id) in self.enrolled_course_ids
+
+    def can_manage_course(self, course_id):
+        """Admins manage every course; teachers manage the courses they own."""
+        return self.is_admin or (self.is_authenticated and self.owns_course(course_id))
+
+
+def get_authorization(request):
+    """Return the authorization context for this request, creating it on first use."""
+    authz = getattr(request, '_lms_authorization', None)
+    if authz is None or authz.user is not request.user:
+        authz = AuthorizationContext(request.user)
+        request._lms_authorization = authz
+    return authz
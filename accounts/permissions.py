@@ -3,12 +3,13 @@
 from rest_framework.permissions import BasePermission
 from rest_framework.permissions import SAFE_METHODS
 from rest_framework.exceptions import NotFound
-from courses.models import Course
 from lessons.models import Lesson
-from enrollments.models import Enrollment
+from .authz import get_authorization
 
 # This file contains custom permission classes for the LMS API.
 # Each class makes it easy to control who can access or modify different resources, using clear role-based rules.
+# Ownership and enrollment questions go through the request's shared authorization context,
+# so the user's course ids are loaded at most once per request however many checks run.
 
 class IsAdmin(BasePermission):
     """
@@ -18,11 +19,7 @@ class IsAdmin(BasePermission):
     Checks authentication and the user's role.
     """
     def has_permission(self, request, view):
-        user = request.user
-        if not user or not user.is_authenticated:
-            return False
-        role = getattr(user, "role", None)
-        return bool(role == "admin" or user.is_staff or user.is_superuser)
+        return get_authorization(request).is_staff_admin
 
 class IsTeacher(BasePermission):
     """
@@ -32,7 +29,7 @@ class IsTeacher(BasePermission):
     """
     def has_permission(self, request, view):
         # Check for authentication and the 'teacher' role.
-        return request.user and request.user.is_authenticated and request.user.role == 'teacher'
+        return get_authorization(request).role == 'teacher'
 
 class IsStudent(BasePermission):
     """
@@ -42,7 +39,7 @@ class IsStudent(BasePermission):
     """
     def has_permission(self, request, view):
         # Check for authentication and the 'student' role.
-        return request.user and request.user.is_authenticated and request.user.role == 'student'
+        return get_authorization(request).role == 'student'
 
 class IsTeacherOrAdmin(BasePermission):
     """
@@ -52,11 +49,7 @@ class IsTeacherOrAdmin(BasePermission):
     This keeps the code clean and makes the intent obvious.
     """
     def has_permission(self, request, view):
-        return bool(
-            request.user and request.user.is_authenticated and (
-                request.user.role == 'teacher' or request.user.role == 'admin'
-            )
-        )
+        return get_authorization(request).role in ('teacher', 'admin')
 
 class IsOwnerOrAdmin(BasePermission):
     """
@@ -65,13 +58,9 @@ class IsOwnerOrAdmin(BasePermission):
     Use this for object-level permissions, like editing a course. Admins can always edit; teachers can edit their own courses.
     """
     def has_object_permission(self, request, view, obj):
-        # Admins can do anything.
-        if request.user.is_authenticated and request.user.role == 'admin':
-            return True
-        
-        # Otherwise, the user must be the teacher of the course.
+        # Admins can do anything; otherwise the user must be the teacher of the course.
         # The 'obj' here is the Course instance.
-        return obj.teacher == request.user
+        return get_authorization(request).can_manage_course(obj.pk)
 
 class IsCourseTeacherOrAdmin(BasePermission):
     """
@@ -80,27 +69,22 @@ class IsCourseTeacherOrAdmin(BasePermission):
     Checks permissions before the object is fetched, using the course ID from the URL.
     """
     def has_permission(self, request, view):
+        authz = get_authorization(request)
         # The user must be authenticated to proceed.
-        if not request.user or not request.user.is_authenticated:
+        if not authz.is_authenticated:
             return False
-        
+
         # Admins are always allowed.
-        if request.user.role == 'admin':
+        if authz.is_admin:
             return True
-        
+
         # Get the course from the URL.
         course_pk = view.kwargs.get('course_pk')
         if not course_pk:
             return False # Should not happen if URL is configured correctly.
 
-        try:
-            course = Course.objects.get(pk=course_pk)
-        except Course.DoesNotExist:
-            # The view will handle the 404, but we deny permission.
-            return False
-
-        # Check if the user is the teacher of the course.
-        return course.teacher == request.user
+        # Teachers must own the course; a missing course is simply not in their set.
+        return authz.owns_course(course_pk)
 
 class IsLessonTeacherOrAdmin(BasePermission):
     """
@@ -108,21 +92,17 @@ class IsLessonTeacherOrAdmin(BasePermission):
     Anyone can read lessons, but only teachers and admins can modify them.
     """
     def has_permission(self, request, view):
-        # Require authentication for any write; reads will be further checked per-object/view.
-        if request.method in SAFE_METHODS:
-            return bool(request.user and request.user.is_authenticated)
-        return bool(request.user and request.user.is_authenticated)
+        # Require authentication for reads and writes; reads are further checked per-object/view.
+        return get_authorization(request).is_authenticated
 
     def has_object_permission(self, request, view, obj):
         if not isinstance(obj, Lesson):
             return False
-        # Admin can read/write any lesson.
-        if request.user and request.user.is_authenticated and getattr(request.user, "role", None) == 'admin':
-            return True
-        # Course teacher can read/write their lessons.
-        if obj.course.teacher == request.user:
+        authz = get_authorization(request)
+        # Admin can read/write any lesson; the course teacher can read/write their lessons.
+        if authz.can_manage_course(obj.course_id):
             return True
         # For SAFE methods (read), allow if the user is enrolled in the course.
         if request.method in SAFE_METHODS:
-            return Enrollment.objects.filter(student=request.user, course=obj.course).exists()
+            return authz.is_authenticated and authz.is_enrolled(obj.course_id)
         return False
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from .models import User
+from lms_backend.metrics import TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     A serializer for the custom User model.
 
@@ -43,4 +44,16 @@ class UserSerializer(serializers.ModelSerializer):
             password=validated_data['password'],
             role='student'
         )
-        return user
\ No newline at end of file
+        return user
+
+
+class UserReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only `UserSerializer` output for lists and nested teachers/students.
+
+    Renders the same fields without building `UniqueValidator` querysets for
+    every instance; see `lms_backend/serializers.py`.
+    """
+
+    def to_representation(self, user):
+        return {'id': user.id, 'username': user.username, 'email': user.email}
@@ -0,0 +1,27 @@
+"""Signal handlers that keep cached authorization and user data in sync with writes."""
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import forget_cached_user
+from .authz import invalidate_user_authorization
+
+
+@receiver(post_save, sender='enrollments.Enrollment')
+@receiver(post_delete, sender='enrollments.Enrollment')
+def invalidate_on_enrollment_change(sender, instance, **kwargs):
+    invalidate_user_authorization(instance.student_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_on_user_created(sender, instance, created=False, **kwargs):
+    # A new account must never inherit cached data from an id used before.
+    if created:
+        invalidate_user_authorization(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user_on_change(sender, instance, **kwargs):
+    forget_cached_user(instance.pk)
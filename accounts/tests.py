@@ -1,8 +1,17 @@
 
+import json
+
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.authentication import ClaimsUser
+from accounts.authz import AuthorizationContext
 from accounts.models import User
+from courses.models import Course
+from enrollments.models import Enrollment
 
 # These tests check that user registration works as expected, including role assignment.
 # They help make sure students, teachers, and admins are created correctly and securely.
@@ -117,3 +126,151 @@ class AuthMeTests(APITestCase):
 		self.assertEqual(data['role'], 'admin')
 		self.assertTrue(data['is_staff'])
 		self.assertTrue(data['is_superuser'])
+
+
+@override_settings(AUTHZ_CACHE_TIMEOUT=300)
+class AuthorizationContextTests(APITestCase):
+	"""Ownership and enrollment checks share one lazily built, cached context."""
+
+	def setUp(self):
+		cache.clear()
+		self.teacher = User.objects.create_user(username='authzT', password='Pass!12345', role='teacher', email='authzT@example.com')
+		self.student = User.objects.create_user(username='authzS', password='Pass!12345', role='student', email='authzS@example.com')
+		self.course = Course.objects.create(title='Authz', description='Checks', teacher=self.teacher)
+		self.other_course = Course.objects.create(title='Other', description='Checks', teacher=self.teacher)
+		Enrollment.objects.create(student=self.student, course=self.course)
+
+	def test_sets_are_loaded_once_and_reused_across_requests(self):
+		with self.assertNumQueries(2):
+			authz = AuthorizationContext(self.student)
+			self.assertTrue(authz.is_enrolled(self.course.id))
+			self.assertFalse(authz.is_enrolled(self.other_course.id))
+			self.assertFalse(authz.owns_course(self.course.id))
+		with self.assertNumQueries(0):
+			self.assertTrue(AuthorizationContext(self.student).is_enrolled(self.course.id))
+
+	def test_enrollment_changes_invalidate_the_cached_sets(self):
+		self.assertFalse(AuthorizationContext(self.student).is_enrolled(self.other_course.id))
+		Enrollment.objects.create(student=self.student, course=self.other_course)
+		self.assertTrue(AuthorizationContext(self.student).is_enrolled(self.other_course.id))
+
+	def test_course_reassignment_invalidates_ownership(self):
+		self.assertTrue(AuthorizationContext(self.teacher).owns_course(self.course.id))
+		new_teacher = User.objects.create_user(username='authzT2', password='Pass!12345', role='teacher', email='authzT2@example.com')
+		self.course.teacher = new_teacher
+		self.course.save()
+		self.assertFalse(AuthorizationContext(self.teacher).owns_course(self.course.id))
+		self.assertTrue(AuthorizationContext(new_teacher).owns_course(self.course.id))
+
+	@override_settings(AUTHZ_CACHE_TIMEOUT=0)
+	def test_sets_are_not_shared_across_requests_when_disabled(self):
+		AuthorizationContext(self.student).is_enrolled(self.course.id)
+		with self.assertNumQueries(2):
+			self.assertTrue(AuthorizationContext(self.student).is_enrolled(self.course.id))
+
+
+class ClaimsAuthenticationTests(APITestCase):
+	"""Requests authenticate from the token's claims without loading the user row."""
+
+	def setUp(self):
+		cache.clear()
+		self.admin = User.objects.create_user(
+			username='claims_admin', password='Pass!12345', role='admin', email='claims_admin@example.com', is_staff=True
+		)
+		self.teacher = User.objects.create_user(
+			username='claims_teacher', password='Pass!12345', role='teacher', email='claims_teacher@example.com'
+		)
+
+	def _login(self, username):
+		resp = self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'Pass!12345'}, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {resp.data['access']}")
+		return resp.data['access']
+
+	def test_token_carries_role_and_staff_claims(self):
+		self._login('claims_admin')
+		resp = self.client.get(reverse('metrics'))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertIsInstance(resp.wsgi_request.user, ClaimsUser)
+		self.assertEqual(resp.wsgi_request.user.role, 'admin')
+		self.assertTrue(resp.wsgi_request.user.is_staff)
+
+	def test_admin_check_runs_no_queries(self):
+		self._login('claims_admin')
+		with self.assertNumQueries(0):
+			resp = self.client.get(reverse('metrics'))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+	def test_me_loads_the_full_user_once_per_ttl(self):
+		self._login('claims_teacher')
+		with self.assertNumQueries(1):
+			resp = self.client.get(reverse('accounts_me'))
+		self.assertEqual(resp.data['email'], 'claims_teacher@example.com')
+		with self.assertNumQueries(0):
+			self.client.get(reverse('accounts_me'))
+
+	def test_tokens_without_claims_fall_back_to_the_database(self):
+		access = RefreshToken.for_user(self.admin).access_token
+		self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+		with self.assertNumQueries(1):
+			resp = self.client.get(reverse('metrics'))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertIsInstance(resp.wsgi_request.user, User)
+
+	def test_refresh_reissues_claims_from_the_user_row(self):
+		resp = self.client.post(reverse('token_obtain_pair'), {'username': 'claims_admin', 'password': 'Pass!12345'}, format='json')
+		refresh = resp.data['refresh']
+		self.admin.role = 'student'
+		self.admin.is_staff = False
+		self.admin.save()
+		for url in ('/api/accounts/login/refresh/', '/api/token/refresh/'):
+			resp = self.client.post(url, {'refresh': refresh}, format='json')
+			self.assertEqual(resp.status_code, status.HTTP_200_OK)
+			self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {resp.data['access']}")
+			self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+	def test_deactivated_users_cannot_refresh(self):
+		resp = self.client.post(reverse('token_obtain_pair'), {'username': 'claims_admin', 'password': 'Pass!12345'}, format='json')
+		refresh = resp.data['refresh']
+		self.admin.is_active = False
+		self.admin.save()
+		for url in ('/api/accounts/login/refresh/', '/api/token/refresh/'):
+			resp = self.client.post(url, {'refresh': refresh}, format='json')
+			self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+	def test_teacher_can_create_a_course_with_a_claims_user(self):
+		self._login('claims_teacher')
+		resp = self.client.post(reverse('course-list-create'), {'title': 'Claims', 'description': 'Course'}, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+		self.assertEqual(Course.objects.get(id=resp.data['id']).teacher_id, self.teacher.id)
+
+
+class UserExportTests(APITestCase):
+	"""Admins can stream every user as CSV or NDJSON."""
+
+	def setUp(self):
+		self.admin = User.objects.create_user(username='export_admin', password='Pass!12345', role='admin', email='export_admin@example.com', is_staff=True)
+		User.objects.create_user(username='=cmd', password='Pass!12345', role='student', email='formula@example.com')
+
+	def _export(self, fmt):
+		self.client.force_authenticate(user=self.admin)
+		resp = self.client.get(reverse('admin_users_export', kwargs={'fmt': fmt}))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertTrue(resp.streaming)
+		return b''.join(resp.streaming_content).decode()
+
+	def test_ndjson_has_one_object_per_user(self):
+		lines = self._export('ndjson').splitlines()
+		self.assertEqual(len(lines), 2)
+		self.assertEqual(json.loads(lines[0])['username'], 'export_admin')
+
+	def test_csv_has_a_header_and_escapes_formulas(self):
+		lines = self._export('csv').splitlines()
+		self.assertTrue(lines[0].startswith('id,username,email,role'))
+		self.assertIn("'=cmd", lines[2])
+
+	def test_unknown_format_and_non_admins_are_rejected(self):
+		self.client.force_authenticate(user=self.admin)
+		self.assertEqual(self.client.get(reverse('admin_users_export', kwargs={'fmt': 'xml'})).status_code, status.HTTP_404_NOT_FOUND)
+		self.client.force_authenticate(user=User.objects.get(username='=cmd'))
+		self.assertEqual(self.client.get(reverse('admin_users_export', kwargs={'fmt': 'csv'})).status_code, status.HTTP_403_FORBIDDEN)
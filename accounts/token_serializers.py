@@ -1,6 +1,20 @@
-"""SimpleJWT serializer that injects the user's role into access tokens."""
+"""SimpleJWT serializers that keep the user's role and staff flags in the tokens up to date."""
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+def add_user_claims(token, user):
+    """Write the claims `ClaimsJWTAuthentication` trusts into `token`, from the user row."""
+    token['role'] = user.role
+    # Staff flags let `ClaimsJWTAuthentication` run admin checks without a query.
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    return token
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -9,6 +23,25 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
 
         # Add custom claims
-        token['role'] = user.role
-        
-        return token
+        return add_user_claims(token, user)
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that reloads the user instead of copying the refresh token's claims.
+
+    SimpleJWT's refresh copies every claim from the refresh token, so a user
+    who was demoted or deactivated would keep minting access tokens with the
+    old role for the refresh token's whole lifetime. Here inactive or deleted
+    users are rejected and the role and staff claims are rewritten from the
+    row before the access token is issued.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(_('No active account found for the given token.'), code='no_active_account')
+        # Re-signing keeps the token's jti and expiry, so rotation and blacklisting work as before.
+        return super().validate({**attrs, 'refresh': str(add_user_claims(refresh, user))})
@@ -1,9 +1,8 @@
 """URL routes for account creation, authentication, and admin user actions."""
 
 from django.urls import path
-from .views import UserCreate, MyTokenObtainPairView, me, AdminUserList, AdminUserDetail
-from rest_framework_simplejwt.views import (
-    TokenRefreshView,
+from .views import (
+    UserCreate, MyTokenObtainPairView, MyTokenRefreshView, MeView, AdminUserList, AdminUserDetail, AdminUserExport,
 )
 
 # This file defines the API endpoints for user registration and authentication.
@@ -14,10 +13,12 @@ urlpatterns = [
     # Endpoint for logging in and getting a JWT token.
     path('login/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     # Endpoint for refreshing an existing JWT token.
-    path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('login/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),
     # Endpoint to get current authenticated user's info including role.
-    path('me/', me, name='accounts_me'),
+    path('me/', MeView.as_view(), name='accounts_me'),
     # Admin endpoints to list and update users
     path('users/', AdminUserList.as_view(), name='admin_users_list'),
     path('users/<int:user_id>/', AdminUserDetail.as_view(), name='admin_users_detail'),
+    # Admin export of every user, streamed as CSV or NDJSON
+    path('users/export.<str:fmt>', AdminUserExport.as_view(), name='admin_users_export'),
 ]
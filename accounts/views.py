@@ -5,20 +5,25 @@ future readers. JWT views are thin wrappers around SimpleJWT.
 """
 
 from rest_framework import generics
-from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import User
 from .serializers import UserSerializer
-from rest_framework_simplejwt.views import TokenObtainPairView
-from .token_serializers import MyTokenObtainPairSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .token_serializers import MyTokenObtainPairSerializer, MyTokenRefreshSerializer
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 from .permissions import IsAdmin
+from .authentication import aget_full_user
+from lms_backend.async_views import AsyncAPIView
+from lms_backend.exports import streaming_export
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
+class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = MyTokenRefreshSerializer
+
 # This view lets users register for the LMS (students, teachers, or admins).
 # It uses DRF's CreateAPIView, which handles all the details of creating a new user record.
 class UserCreate(generics.CreateAPIView):
@@ -30,39 +35,50 @@ class UserCreate(generics.CreateAPIView):
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    # Password hashing is slow on purpose: 5 units of 50/hour is 10 sign-ups an hour per client.
+    throttle_scope = 'register'
+    throttle_cost = 5
+
 
+class MeView(AsyncAPIView):
+    """
+    The current user's profile: GET /api/accounts/me/
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def me(request):
-    user = request.user
-    data = {
-        "id": user.id,
-        "username": getattr(user, "username", None),
-        "email": getattr(user, "email", None),
-        "role": getattr(user, "role", None),
-        "is_staff": getattr(user, "is_staff", False),
-        "is_superuser": getattr(user, "is_superuser", False),
-    }
-    return Response(data)
+    Async, because every page load of the frontend calls it; the row usually
+    comes from the per-process user cache without touching the database.
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        # The request user may be built from token claims; username and email live on the row.
+        user = await aget_full_user(request.user)
+        data = {
+            "id": user.id,
+            "username": getattr(user, "username", None),
+            "email": getattr(user, "email", None),
+            "role": getattr(user, "role", None),
+            "is_staff": getattr(user, "is_staff", False),
+            "is_superuser": getattr(user, "is_superuser", False),
+        }
+        return Response(data)
 
 class AdminUserList(APIView):
     permission_classes = [IsAdmin]
 
     def get(self, request):
-        qs = User.objects.all().order_by('id')
-        data = [
-            {
-                "id": u.id,
-                "username": u.username,
-                "email": u.email,
-                "role": getattr(u, "role", None),
-                "is_staff": u.is_staff,
-                "is_superuser": u.is_superuser,
-            }
-            for u in qs
-        ]
-        return Response(data)
+        # Plain dicts straight from the database; use the export endpoint for very large user bases.
+        qs = User.objects.order_by('id').values("id", "username", "email", "role", "is_staff", "is_superuser")
+        return Response(list(qs))
+
+class AdminUserExport(APIView):
+    """
+    Stream every user as CSV or NDJSON: GET /api/accounts/users/export.csv (or .ndjson)
+    """
+    permission_classes = [IsAdmin]
+    columns = ["id", "username", "email", "role", "is_staff", "is_superuser", "is_active", "date_joined", "last_login"]
+
+    def get(self, request, fmt):
+        return streaming_export(request, User.objects.order_by('id'), self.columns, fmt, "users")
 
 class AdminUserDetail(APIView):
     permission_classes = [IsAdmin]
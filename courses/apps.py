@@ -8,3 +8,7 @@ class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     # The name of this app as used in settings and migrations.
     name = 'courses'
+
+    def ready(self):
+        # Register the catalog cache invalidation signal handlers.
+        from . import signals  # noqa: F401
@@ -0,0 +1,78 @@
+"""Versioned read model for the public course catalog.
+
+The catalog is the busiest public endpoint and changes rarely, so rendered
+pages are cached under a catalog-wide version number. Any write to a course or
+to a teacher bumps the version (see `courses/signals.py`), which makes every
+previously cached page unreachable without having to track individual keys.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from lms_backend.caching import aget_version, bump_version, get_version
+
+CATALOG_VERSION_KEY = "courses:catalog:version"
+
+
+def get_catalog_version():
+    """Return the current catalog version, creating it on first use."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+async def aget_catalog_version():
+    """`get_catalog_version` for async views."""
+    return await aget_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog page by moving to a new version."""
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def catalog_cache_key(version, url):
+    """Build the cache key for one catalog page (the full URL includes page/query params)."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return f"courses:catalog:{version}:{digest}"
+
+
+def make_etag(data):
+    """Return a strong ETag for serialized data, based on its JSON rendering."""
+    content = JSONRenderer().render(data)
+    return quote_etag(hashlib.sha256(content).hexdigest()[:32])
+
+
+def get_cached_page(version, url):
+    """Return the cached `{'etag', 'data'}` entry for a catalog URL, or None."""
+    return cache.get(catalog_cache_key(version, url))
+
+
+async def aget_cached_page(version, url):
+    """`get_cached_page` for async views."""
+    return await cache.aget(catalog_cache_key(version, url))
+
+
+def store_page(version, url, data):
+    """
+    Cache a freshly serialized catalog page and return its entry.
+
+    `version` must be the one read *before* the page was built, so a write
+    that lands while we are serializing leaves this entry under a stale key.
+    """
+    entry = {"etag": make_etag(data), "data": data}
+    cache.set(catalog_cache_key(version, url), entry, timeout=_page_timeout())
+    return entry
+
+
+async def astore_page(version, url, data):
+    """`store_page` for async views."""
+    entry = {"etag": make_etag(data), "data": data}
+    await cache.aset(catalog_cache_key(version, url), entry, timeout=_page_timeout())
+    return entry
+
+
+def _page_timeout():
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
@@ -0,0 +1,313 @@
+"""Generate production-sized synthetic data for benchmarking, for the `generate_load_data` command.
+
+Everything is derived from one `random.Random(seed)`, so the same options
+always produce the same rows. Rows are built in memory and written with
+`bulk_create`, one transaction per chunk. Passwords are hashed once and the
+hash is shared by every generated account, because hashing is deliberately
+slow.
+
+The shape follows the live site:
+- course popularity is skewed, so a few courses have most of the enrollments;
+- students work through a course in lesson order, stopping somewhere along the way;
+- quiz scores follow each student's skill.
+
+bulk_create sends no signals, so progress summaries are rebuilt at the end
+and the catalog cache is invalidated. The SQLite search index is filled by
+its triggers.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from enrollments.models import Enrollment
+from enrollments.progress import rebuild_progress_summaries
+from lessons.models import Lesson, LessonProgress
+from quizzes.models import Answer, Choice, Question, Quiz, QuizAttempt
+from .catalog import bump_catalog_version
+from .models import Course
+
+CHUNK_SIZE = 5000
+
+TOPICS = (
+    'Python', 'JavaScript', 'React', 'Django', 'SQL', 'Statistics', 'Algebra', 'Biology', 'Chemistry',
+    'Marketing', 'Accounting', 'Design', 'Photography', 'Spanish', 'French', 'History', 'Physics', 'DevOps',
+)
+LEVELS = ('Intro to', 'Foundations of', 'Practical', 'Intermediate', 'Advanced', 'Applied', 'Mastering')
+WORDS = (
+    'data', 'model', 'practice', 'example', 'review', 'concept', 'project', 'method', 'pattern', 'theory',
+    'exercise', 'summary', 'question', 'answer', 'system', 'process', 'analysis', 'design', 'test', 'result',
+    'learn', 'build', 'apply', 'compare', 'explain', 'measure', 'improve', 'explore', 'write', 'read',
+)
+
+
+@dataclass
+class LoadDataSpec:
+    students: int = 1000
+    teachers: int = 0  # 0 means one teacher per ten courses
+    courses: int = 100
+    lessons_per_course: int = 10
+    enrollments_per_student: int = 3
+    # Fraction of lessons that have a quiz, and the quiz shape.
+    quiz_ratio: float = 0.3
+    questions_per_quiz: int = 5
+    choices_per_question: int = 4
+    attempts: int = 1000
+    seed: int = 42
+    prefix: str = 'load'
+    password: str = 'password123'
+    chunk_size: int = CHUNK_SIZE
+
+
+def _chunked(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _write(model, rows, chunk_size):
+    """bulk_create `rows` (any iterable) one chunk and one transaction at a time; return the count."""
+    written = 0
+    for batch in _chunked(rows, chunk_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=chunk_size)
+        written += len(batch)
+    return written
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+class LoadDataGenerator:
+    """Builds the rows described by a `LoadDataSpec`; call `run()` once."""
+
+    def __init__(self, spec, log=None):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.counts = {}
+
+    def run(self):
+        """Generate everything and return the number of rows written per table."""
+        if User.objects.filter(username__startswith=f'{self.spec.prefix}_').exists():
+            raise ValueError(
+                f"Users named '{self.spec.prefix}_*' already exist; use an empty database or another --prefix."
+            )
+        for name, stage in (
+            ('users', self.create_users),
+            ('courses', self.create_courses),
+            ('lessons', self.create_lessons),
+            ('quizzes', self.create_quizzes),
+            ('enrollments', self.create_enrollments),
+            ('lesson_progress', self.create_progress),
+            ('quiz_attempts', self.create_attempts),
+            ('progress_summaries', self.rebuild_summaries),
+        ):
+            start = time.perf_counter()
+            self.counts[name] = stage()
+            self.log(f'{name}: {self.counts[name]} rows in {time.perf_counter() - start:.1f}s')
+        bump_catalog_version()
+        return self.counts
+
+    def _username(self, role, index):
+        return f'{self.spec.prefix}_{role}_{index}'
+
+    def _past(self, max_days):
+        return self.now - timedelta(days=self.rng.uniform(0, max_days))
+
+    def _user_ids(self, role):
+        return list(
+            User.objects.filter(username__startswith=f'{self.spec.prefix}_{role}_').order_by('id').values_list('id', flat=True)
+        )
+
+    def create_users(self):
+        spec = self.spec
+        teachers = spec.teachers or max(1, spec.courses // 10)
+        # One hash for everyone: hashing is slow on purpose and the accounts only need to log in.
+        password = make_password(spec.password)
+
+        def rows():
+            for role, count in (('teacher', teachers), ('student', spec.students)):
+                for index in range(count):
+                    username = self._username(role, index)
+                    yield User(
+                        username=username, email=f'{username}@example.com', password=password, role=role,
+                        first_name=role.title(), last_name=str(index), date_joined=self._past(730),
+                    )
+
+        written = _write(User, rows(), spec.chunk_size)
+        self.teacher_ids = self._user_ids('teacher')
+        self.student_ids = self._user_ids('student')
+        return written
+
+    def _generated_courses(self):
+        return Course.objects.filter(teacher__username__startswith=f'{self.spec.prefix}_teacher_')
+
+    def create_courses(self):
+        rng = self.rng
+
+        def rows():
+            for index in range(self.spec.courses):
+                title = f'{rng.choice(LEVELS)} {rng.choice(TOPICS)} {index + 1}'
+                yield Course(
+                    title=title,
+                    description=' '.join(_sentence(rng, 12) for _ in range(3)),
+                    teacher_id=rng.choice(self.teacher_ids),
+                )
+
+        written = _write(Course, rows(), self.spec.chunk_size)
+        self.course_ids = list(self._generated_courses().order_by('id').values_list('id', flat=True))
+        return written
+
+    def create_lessons(self):
+        rng = self.rng
+
+        def rows():
+            for course_id in self.course_ids:
+                for order in range(1, self.spec.lessons_per_course + 1):
+                    yield Lesson(
+                        course_id=course_id,
+                        title=f'Lesson {order}: {_sentence(rng, 4)[:-1]}',
+                        content='\n\n'.join(_sentence(rng, 15) for _ in range(6)),
+                        order=order,
+                    )
+
+        written = _write(Lesson, rows(), self.spec.chunk_size)
+        self.lessons = {course_id: [] for course_id in self.course_ids}
+        generated = Lesson.objects.filter(course_id__in=self._generated_courses().values('id'))
+        for course_id, lesson_id in generated.order_by('course_id', 'order').values_list('course_id', 'id').iterator():
+            self.lessons[course_id].append(lesson_id)
+        return written
+
+    def create_quizzes(self):
+        spec, rng = self.spec, self.rng
+        lesson_course = {lesson_id: course_id for course_id, ids in self.lessons.items() for lesson_id in ids}
+        quiz_lessons = [lesson_id for lesson_id in lesson_course if rng.random() < spec.quiz_ratio]
+        written = _write(Quiz, (Quiz(lesson_id=lesson_id, title=f'Quiz: {_sentence(rng, 3)[:-1]}') for lesson_id in quiz_lessons), spec.chunk_size)
+
+        quizzes = Quiz.objects.filter(lesson_id__in=Lesson.objects.filter(course_id__in=self._generated_courses().values('id')).values('id'))
+        quiz_ids = list(quizzes.order_by('id').values_list('id', 'lesson_id'))
+        self.course_quizzes = {}
+        for quiz_id, lesson_id in quiz_ids:
+            self.course_quizzes.setdefault(lesson_course[lesson_id], []).append(quiz_id)
+
+        self.counts['questions'] = _write(Question, (
+            Question(quiz_id=quiz_id, text=_sentence(rng, 10)[:-1] + '?', explanation=_sentence(rng, 12))
+            for quiz_id, _ in quiz_ids for _ in range(spec.questions_per_quiz)
+        ), spec.chunk_size)
+        questions = list(
+            Question.objects.filter(quiz__in=quizzes).order_by('id').values_list('id', 'quiz_id')
+        )
+
+        def choices():
+            for question_id, _ in questions:
+                correct = rng.randrange(spec.choices_per_question)
+                for index in range(spec.choices_per_question):
+                    yield Choice(question_id=question_id, text=_sentence(rng, 5)[:-1], is_correct=index == correct)
+
+        self.counts['choices'] = _write(Choice, choices(), spec.chunk_size)
+        # quiz id -> [(question id, correct choice id, wrong choice ids)], for grading generated attempts.
+        options = {}
+        for question_id, choice_id, is_correct in (
+            Choice.objects.filter(question__quiz__in=quizzes).order_by('id').values_list('question_id', 'id', 'is_correct').iterator()
+        ):
+            entry = options.setdefault(question_id, [None, []])
+            if is_correct:
+                entry[0] = choice_id
+            else:
+                entry[1].append(choice_id)
+        self.quiz_questions = {}
+        for question_id, quiz_id in questions:
+            correct, wrong = options.get(question_id, (None, []))
+            if correct is not None:
+                self.quiz_questions.setdefault(quiz_id, []).append((question_id, correct, wrong))
+        return written
+
+    def create_enrollments(self):
+        spec, rng = self.spec, self.rng
+        # Popularity falls off with rank, so a few courses hold most of the students.
+        ranked = list(self.course_ids)
+        rng.shuffle(ranked)
+        cum_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(ranked))))
+        per_student = min(spec.enrollments_per_student, len(ranked))
+        self.enrollments = []
+        # How well each student does on quizzes and how far they get through courses.
+        self.skill = {}
+        for student_id in self.student_ids:
+            chosen = set()
+            while len(chosen) < per_student:
+                chosen.update(rng.choices(ranked, cum_weights=cum_weights, k=per_student - len(chosen)))
+            self.enrollments.extend((student_id, course_id) for course_id in sorted(chosen))
+            self.skill[student_id] = 0.35 + 0.6 * rng.random()
+        return _write(Enrollment, (
+            Enrollment(student_id=student_id, course_id=course_id) for student_id, course_id in self.enrollments
+        ), spec.chunk_size)
+
+    def create_progress(self):
+        rng = self.rng
+
+        def rows():
+            for student_id, course_id in self.enrollments:
+                lessons = self.lessons[course_id]
+                # Students work through lessons in order and stop somewhere along the way.
+                completed = round(len(lessons) * rng.random() ** (1 - self.skill[student_id] / 2))
+                at = self._past(365)
+                for lesson_id in lessons[:completed]:
+                    at += timedelta(hours=rng.uniform(1, 72))
+                    yield LessonProgress(student_id=student_id, lesson_id=lesson_id, is_completed=True, completed_at=min(at, self.now))
+                if completed < len(lessons) and rng.random() < 0.5:
+                    yield LessonProgress(student_id=student_id, lesson_id=lessons[completed], is_completed=False)
+
+        return _write(LessonProgress, rows(), self.spec.chunk_size)
+
+    def create_attempts(self):
+        rng = self.rng
+        eligible = [(student_id, course_id) for student_id, course_id in self.enrollments if course_id in self.course_quizzes]
+        if not eligible:
+            self.counts['answers'] = 0
+            return 0
+
+        def graded():
+            for _ in range(self.spec.attempts):
+                student_id, course_id = rng.choice(eligible)
+                quiz_id = rng.choice(self.course_quizzes[course_id])
+                skill = self.skill[student_id]
+                picks = [
+                    (question_id, correct if not wrong or rng.random() < skill else rng.choice(wrong), correct)
+                    for question_id, correct, wrong in self.quiz_questions.get(quiz_id, [])
+                ]
+                right = sum(1 for _, picked, correct in picks if picked == correct)
+                score = round(100 * right / len(picks), 2) if picks else 0.0
+                yield QuizAttempt(student_id=student_id, quiz_id=quiz_id, score=score), picks
+
+        written = answers = 0
+        for batch in _chunked(graded(), self.spec.chunk_size):
+            with transaction.atomic():
+                # Primary keys come back from the insert (SQLite 3.35+ and PostgreSQL).
+                attempts = QuizAttempt.objects.bulk_create([attempt for attempt, _ in batch])
+                answers += len(Answer.objects.bulk_create([
+                    Answer(attempt_id=attempt.pk, question_id=question_id, selected_choice_id=picked)
+                    for attempt, (_, picks) in zip(attempts, batch)
+                    for question_id, picked, _ in picks
+                ], batch_size=self.spec.chunk_size))
+            written += len(batch)
+        self.counts['answers'] = answers
+        return written
+
+    def rebuild_summaries(self):
+        enrollments = Enrollment.objects.filter(course_id__in=self._generated_courses().values('id'))
+        return rebuild_progress_summaries(enrollments, chunk_size=self.spec.chunk_size)
+
+
+def generate_load_data(spec, log=None):
+    """Generate the data described by `spec` and return the rows written per table."""
+    return LoadDataGenerator(spec, log=log).run()
@@ -0,0 +1,30 @@
+"""Command to time the API serializers against their read-only variants and report the results as JSON."""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from lms_backend.serializer_benchmarks import BENCHMARKS, run_benchmarks
+
+class Command(BaseCommand):
+    help = (
+        "Serializes in-memory instances with each full serializer and its read-only variant, with database access "
+        "blocked, and prints objects per second and bytes allocated per object as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Instances serialized per run.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per serializer; the fastest is reported.')
+        parser.add_argument('--only', action='append', choices=[benchmark.name for benchmark in BENCHMARKS],
+                            help='Run only this benchmark (repeatable).')
+        parser.add_argument('--output', help='Also write the report to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_benchmarks(count=options['count'], repeat=options['repeat'], names=options['only'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+        self.stdout.write(output)
@@ -0,0 +1,48 @@
+"""Command to fill the database with production-sized synthetic data for benchmarking."""
+
+from django.core.management.base import BaseCommand, CommandError
+from courses.load_data import CHUNK_SIZE, LoadDataSpec, generate_load_data
+
+class Command(BaseCommand):
+    help = (
+        "Generates reproducible synthetic users, courses, lessons, quizzes, enrollments, progress and attempts "
+        "with bulk inserts. Existing data is left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of students.')
+        parser.add_argument('--teachers', type=int, default=0, help='Number of teachers (default: one per ten courses).')
+        parser.add_argument('--courses', type=int, default=100)
+        parser.add_argument('--lessons-per-course', type=int, default=10)
+        parser.add_argument('--enrollments-per-student', type=int, default=3)
+        parser.add_argument('--quiz-ratio', type=float, default=0.3, help='Fraction of lessons that get a quiz.')
+        parser.add_argument('--questions-per-quiz', type=int, default=5)
+        parser.add_argument('--attempts', type=int, default=1000, help='Total quiz attempts.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--prefix', default='load', help="Username prefix for generated accounts (default 'load').")
+        parser.add_argument('--password', default='password123', help='Password for every generated account.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows per insert and transaction.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        spec = LoadDataSpec(
+            students=options['users'],
+            teachers=options['teachers'],
+            courses=options['courses'],
+            lessons_per_course=options['lessons_per_course'],
+            enrollments_per_student=options['enrollments_per_student'],
+            quiz_ratio=options['quiz_ratio'],
+            questions_per_quiz=options['questions_per_quiz'],
+            attempts=options['attempts'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            password=options['password'],
+            chunk_size=options['chunk_size'],
+        )
+        try:
+            counts = generate_load_data(spec, log=self.stdout.write)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Generated {summary}.'))
@@ -0,0 +1,86 @@
+"""Command to load test the API with mixed user scenarios and report latency percentiles as JSON."""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from lms_backend.loadtest import DEFAULT_MIX, SCENARIOS, InProcessASGIServer, InProcessServer, LoadTest, compare
+
+def parse_mix(value):
+    """Parse `catalog=50,lessons=30` into scenario weights."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS or not weight.strip().isdigit():
+            raise CommandError(f"Bad --mix entry '{part}'. Use name=weight with names from: {', '.join(SCENARIOS)}.")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise CommandError('--mix needs at least one scenario with a positive weight.')
+    return mix
+
+class Command(BaseCommand):
+    help = (
+        "Drives mixed catalog/lesson/quiz/roster scenarios against the API with concurrent workers and prints "
+        "p50/p95/p99 latency, throughput and error rates as JSON. Uses accounts from generate_load_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server. Without it the app is served in-process.')
+        parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi',
+                            help='How the in-process server runs the app (asgi needs uvicorn). Ignored with --url.')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent workers.')
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds.')
+        parser.add_argument('--warmup', type=float, default=5, help='Seconds to run before measuring.')
+        parser.add_argument('--users', type=int, default=50, help='Generated students to act as (teachers: a tenth of this).')
+        parser.add_argument('--mix', default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+                            help='Scenario weights, e.g. catalog=50,lessons=30,quiz=10,roster=10.')
+        parser.add_argument('--prefix', default='load', help='Username prefix used by generate_load_data.')
+        parser.add_argument('--password', default='password123', help='Password of the generated accounts.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--think-time', type=float, default=0,
+                            help='Mean seconds each virtual user pauses between scenarios, keeping its connection open.')
+        parser.add_argument('--output', help='Also write the report to this file (use it as a later --baseline).')
+        parser.add_argument('--baseline', help='Compare against a report saved with --output.')
+        parser.add_argument('--tolerance', type=float, default=10.0, help='Allowed slowdown in percent before a step counts as a regression.')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error if the comparison finds regressions.')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['duration'] <= 0:
+            raise CommandError('--workers and --duration must be positive.')
+        if options['think_time'] < 0:
+            raise CommandError('--think-time cannot be negative.')
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Can't read baseline: {exc}")
+
+        config = dict(
+            prefix=options['prefix'], users=options['users'], password=options['password'], mix=parse_mix(options['mix']),
+            workers=options['workers'], duration=options['duration'], warmup=options['warmup'], seed=options['seed'],
+            think_time=options['think_time'],
+        )
+        try:
+            if options['url']:
+                report = LoadTest.from_database(options['url'], **config).run()
+            else:
+                server_class = InProcessASGIServer if options['server'] == 'asgi' else InProcessServer
+                with server_class() as server:
+                    report = LoadTest.from_database(server.url, **config).run()
+                report['config']['server'] = options['server']
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if baseline is not None:
+            report['comparison'] = compare(report, baseline, options['tolerance'])
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+        self.stdout.write(output)
+
+        regressions = report.get('comparison', {}).get('regressions', [])
+        if regressions and options['fail_on_regression']:
+            raise CommandError('Performance regressions against the baseline:\n' + '\n'.join(regressions))
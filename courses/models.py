@@ -28,6 +28,9 @@ class Course(models.Model):
 
     # Automatically records when the course was created.
     created_at = models.DateTimeField(auto_now_add=True)
+    # When the course (or anything shown with it: a lesson, its teacher) last changed.
+    # Saves set it; the handlers in courses/signals.py touch it for the rest.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """
@@ -2,9 +2,11 @@
 
 from rest_framework import serializers
 from .models import Course
-from accounts.serializers import UserSerializer
+from accounts.serializers import UserSerializer, UserReadSerializer
+from lms_backend.serializers import datetime_representation
+from lms_backend.metrics import TimedSerializerMixin
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     A serializer for the Course model.
 
@@ -20,4 +22,20 @@ class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
         # These are the fields that will be included in the API representation.
-        fields = ['id', 'title', 'description', 'created_at', 'teacher']
\ No newline at end of file
+        fields = ['id', 'title', 'description', 'created_at', 'teacher']
+
+
+class CourseReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only `CourseSerializer` output, used by the catalog and other course lists.
+    """
+    teacher_serializer = UserReadSerializer()
+
+    def to_representation(self, course):
+        return {
+            'id': course.id,
+            'title': course.title,
+            'description': course.description,
+            'created_at': datetime_representation(course.created_at),
+            'teacher': self.teacher_serializer.to_representation(course.teacher),
+        }
@@ -0,0 +1,46 @@
+"""Signal handlers that keep the cached course catalog and course timestamps in sync with writes."""
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from lms_backend.conditional import touch
+from lms_backend.signals import deleted_in_cascade
+from .catalog import bump_catalog_version
+from .models import Course
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_catalog_on_course_change(sender, **kwargs):
+    # Any course write changes what the public catalog shows.
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_catalog_on_user_save(sender, instance, created=False, update_fields=None, **kwargs):
+    # The catalog nests each course's teacher, so teacher edits must show up.
+    # Student sign-ups and login timestamp updates never appear in the catalog,
+    # so skip them to keep registrations from flushing the cache.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    if created and getattr(instance, "role", None) != "teacher":
+        return
+    bump_catalog_version()
+    if not created:
+        # Course detail nests the teacher too, so their courses count as changed.
+        touch(Course.objects.filter(teacher_id=instance.pk))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_catalog_on_user_delete(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender="lessons.Lesson")
+@receiver(post_delete, sender="lessons.Lesson")
+def touch_course_on_lesson_change(sender, instance, origin=None, **kwargs):
+    # A lesson removed along with its course (or its teacher) has no course left to touch.
+    if deleted_in_cascade(sender, origin):
+        return
+    touch(Course.objects.filter(pk=instance.course_id))
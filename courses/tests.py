@@ -1,8 +1,18 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.urls import reverse
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APITestCase
+from .load_data import LoadDataSpec, generate_load_data
 from .models import Course
 from accounts.models import User
+from enrollments.models import EnrollmentProgress
+from lessons.models import Lesson, LessonProgress
+from quizzes.models import QuizAttempt
 
 # This test suite checks the Course API endpoints for correct behavior and permissions.
 # It creates users with different roles and verifies that only the right people can create, update, or delete courses.
@@ -197,3 +207,149 @@ class CourseAPITests(APITestCase):
         url = reverse('my-courses')
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CourseCatalogCacheTests(APITestCase):
+    """The public course list is served from a versioned cache with ETags."""
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='cat_teacher', password='password123', role='teacher', email='cat_teacher@example.com')
+        for i in range(3):
+            Course.objects.create(title=f"Catalog {i}", description="Listed.", teacher=self.teacher)
+        self.url = reverse('course-list-create')
+
+    def test_repeat_requests_are_served_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_course_write_invalidates_catalog(self):
+        etag = self.client.get(self.url)['ETag']
+        Course.objects.create(title="Brand New", description="Fresh.", teacher=self.teacher)
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp['ETag'], etag)
+        self.assertIn("Brand New", {c['title'] for c in resp.data['results']})
+
+    def test_teacher_update_invalidates_catalog(self):
+        self.client.get(self.url)
+        self.teacher.email = 'renamed@example.com'
+        self.teacher.save()
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.data['results'][0]['teacher']['email'], 'renamed@example.com')
+
+    def test_student_registration_keeps_catalog_cached(self):
+        self.client.get(self.url)
+        User.objects.create_user(username='new_student', password='password123', role='student', email='new_student@example.com')
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+class CourseConditionalGetTests(APITestCase):
+    """Course detail answers conditional GETs from the course's `updated_at`."""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='cond_teacher', password='password123', role='teacher', email='cond_teacher@example.com')
+        self.course = Course.objects.create(title="Conditional", description="Cached by clients.", teacher=self.teacher)
+        self.url = reverse('course-detail', kwargs={'pk': self.course.pk})
+
+    def test_unchanged_course_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp['ETag'], first['ETag'])
+
+    def test_same_second_edit_is_not_hidden(self):
+        # HTTP dates stop at whole seconds, so no Last-Modified is sent for
+        # If-Modified-Since to match against an edit made in the same second.
+        first = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', first)
+        self.course.title = "Edited at once"
+        self.course.save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'], HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['title'], "Edited at once")
+
+    def test_course_edit_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.course.title = "Renamed"
+        self.course.save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['title'], "Renamed")
+
+    def test_lesson_and_teacher_edits_touch_the_course(self):
+        etag = self.client.get(self.url)['ETag']
+        lesson = Lesson.objects.create(course=self.course, title="New lesson", content="Body", order=1)
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        etag = resp['ETag']
+        self.teacher.email = 'cond_renamed@example.com'
+        self.teacher.save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.data['teacher']['email'], 'cond_renamed@example.com')
+
+        etag = resp['ETag']
+        lesson.delete()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+
+class GenerateLoadDataTests(APITestCase):
+    """The load data generator writes consistent, reproducible rows in bulk."""
+
+    def setUp(self):
+        cache.clear()
+
+    def _generate(self, prefix, seed=7):
+        spec = LoadDataSpec(students=30, courses=6, lessons_per_course=4, enrollments_per_student=2,
+                            quiz_ratio=0.5, attempts=40, seed=seed, prefix=prefix, chunk_size=25)
+        return generate_load_data(spec)
+
+    def test_generates_every_table(self):
+        counts = self._generate('a')
+        self.assertEqual(counts['users'], 31)
+        self.assertEqual(counts['courses'], 6)
+        self.assertEqual(counts['lessons'], 24)
+        self.assertEqual(counts['enrollments'], 60)
+        self.assertEqual(counts['quiz_attempts'], 40)
+        self.assertEqual(counts['questions'], counts['quizzes'] * 5)
+        self.assertEqual(counts['answers'], 40 * 5)
+        self.assertEqual(LessonProgress.objects.count(), counts['lesson_progress'])
+        # Summaries match the generated progress, as if every row had been written through the API.
+        for summary in EnrollmentProgress.objects.select_related('enrollment'):
+            completed = LessonProgress.objects.filter(
+                student_id=summary.enrollment.student_id, lesson__course_id=summary.enrollment.course_id, is_completed=True,
+            ).count()
+            self.assertEqual((summary.completed_lessons, summary.total_lessons), (completed, 4))
+        self.assertTrue(self.client.login(username='a_student_0', password='password123'))
+
+    def test_same_seed_gives_same_data(self):
+        self._generate('a')
+        self._generate('b')
+        self._generate('c', seed=8)
+
+        def snapshot(prefix):
+            courses = Course.objects.filter(teacher__username__startswith=f'{prefix}_').order_by('id')
+            attempts = QuizAttempt.objects.filter(student__username__startswith=f'{prefix}_').order_by('id')
+            return list(courses.values_list('title', flat=True)), list(attempts.values_list('score', flat=True))
+
+        self.assertEqual(snapshot('a'), snapshot('b'))
+        self.assertNotEqual(snapshot('a'), snapshot('c'))
+
+    def test_command_refuses_to_reuse_a_prefix(self):
+        call_command('generate_load_data', users=2, courses=1, lessons_per_course=1, attempts=0, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('generate_load_data', users=2, courses=1, lessons_per_course=1, attempts=0, stdout=StringIO())
@@ -1,22 +1,58 @@
 """Course API views for listing, creating, and managing ownership rules."""
 
+from django.http import Http404
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from .models import Course
-from .serializers import CourseSerializer
+from .serializers import CourseSerializer, CourseReadSerializer
 from accounts.permissions import IsTeacherOrAdmin, IsOwnerOrAdmin, IsTeacher
+from accounts.authentication import get_full_user
 from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from lms_backend import conditional
+from lms_backend.async_views import AsyncAPIView
+from . import catalog
 
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseListCreateView(AsyncAPIView, generics.ListCreateAPIView):
     """
     API view to list all courses or create a new one.
 
     - GET: Anyone can list all existing courses.
     - POST: Only teachers and admins can create new courses.
+
+    The list is the same for every visitor, so pages are served from the
+    versioned catalog cache with a strong ETag (see `courses/catalog.py`).
+    GET is async: a cache hit never leaves the event loop.
     """
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('teacher')
     serializer_class = CourseSerializer
 
+    def get_serializer_class(self):
+        # Listing only renders, so it skips the full serializer's validators.
+        if self.request.method == 'GET':
+            return CourseReadSerializer
+        return CourseSerializer
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Serve a catalog page from cache, answering `If-None-Match` with 304.
+
+        Only a cache miss touches the database, through the async ORM; the
+        version is read before the page is built so a concurrent write can
+        never be cached as current.
+        """
+        version = await catalog.aget_catalog_version()
+        url = request.build_absolute_uri()
+        entry = await catalog.aget_cached_page(version, url)
+        if entry is None:
+            response = await self.alist(request, *args, **kwargs)
+            entry = await catalog.astore_page(version, url, response.data)
+
+        not_modified = conditional.not_modified_response(request, entry['etag'])
+        if not_modified is not None:
+            return not_modified
+        return Response(entry['data'], headers={'ETag': entry['etag']})
+
     def get_permissions(self):
         """
         Set permissions for this view based on the request method.
@@ -40,7 +76,8 @@ class CourseListCreateView(generics.ListCreateAPIView):
         user = self.request.user
         # If a teacher is creating the course, assign them as the teacher.
         if getattr(user, 'role', None) == 'teacher':
-            serializer.save(teacher=user)
+            # The serializer nests the teacher, so assign the full row rather than the token user.
+            serializer.save(teacher=get_full_user(user))
             return
 
         # If an admin is creating the course, use the provided teacher id.
@@ -58,16 +95,30 @@ class CourseListCreateView(generics.ListCreateAPIView):
         raise ValidationError({'teacher': 'Admin must supply a valid teacher id when creating a course.'})
 
 
-class CourseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class CourseRetrieveUpdateDestroyView(AsyncAPIView, generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a single course.
 
-    - GET: Anyone can view a course.
+    - GET: Anyone can view a course. Async, with one `aget` for the course and its teacher,
+      and a 304 without serializing when the client's ETag still matches.
     - PUT/PATCH/DELETE: Only the teacher who owns the course or an admin can modify or delete it.
     """
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('teacher')
     serializer_class = CourseSerializer
 
+    async def get(self, request, *args, **kwargs):
+        try:
+            course = await self.get_queryset().aget(pk=self.kwargs['pk'])
+        except Course.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(request, course)
+        # Teacher edits touch their courses (courses/signals.py), so this covers the nested teacher too.
+        etag = conditional.make_etag(course.updated_at)
+        not_modified = conditional.not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return conditional.set_etag(Response(CourseReadSerializer(course).data), etag)
+
     def get_permissions(self):
         """
         Set permissions for this view based on the request method.
@@ -86,7 +137,9 @@ class MyCoursesListView(generics.ListAPIView):
 
     - GET: Only authenticated teachers can view their own courses.
     """
-    serializer_class = CourseSerializer
+    serializer_class = CourseReadSerializer
+    # Newest first, matching get_queryset, when keyset pagination is requested.
+    keyset_ordering = '-id'
 
     def get_permissions(self):
         # Must be authenticated and have teacher role
@@ -94,5 +147,5 @@ class MyCoursesListView(generics.ListAPIView):
 
     def get_queryset(self):
         # Filter by current user as the course teacher
-        return Course.objects.filter(teacher=self.request.user).order_by('-id')
+        return Course.objects.filter(teacher_id=self.request.user.pk).select_related('teacher').order_by('-id')
 
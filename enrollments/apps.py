@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EnrollmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'enrollments'
+
+    def ready(self):
+        # Keep per-enrollment progress summaries up to date.
+        from . import signals  # noqa: F401
@@ -0,0 +1,38 @@
+"""Command to enroll a cohort of students in a course from ids or a CSV file."""
+
+from django.core.management.base import BaseCommand, CommandError
+from courses.models import Course
+from enrollments.bulk import bulk_enroll, read_student_csv
+
+class Command(BaseCommand):
+    help = "Enrolls many students in a course at once. Students already enrolled are skipped."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int, help='Course to enroll the students in.')
+        parser.add_argument('--students', nargs='+', type=int, default=[], metavar='ID', help='Student user ids.')
+        parser.add_argument('--csv', dest='csv_path', help="CSV file with a 'student_id', 'username' or 'email' column.")
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(pk=options['course_id']).first()
+        if course is None:
+            raise CommandError(f"Course {options['course_id']} does not exist.")
+
+        student_ids = list(options['students'])
+        not_found = []
+        if options['csv_path']:
+            try:
+                with open(options['csv_path'], encoding='utf-8-sig', newline='') as handle:
+                    csv_ids, not_found = read_student_csv(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(str(exc))
+            student_ids.extend(csv_ids)
+        if not student_ids and not not_found:
+            raise CommandError("Pass --students and/or --csv.")
+
+        result = bulk_enroll(course, student_ids)
+        not_found.extend(result.not_found)
+        self.stdout.write(self.style.SUCCESS(
+            f"Enrolled {result.created} new students in '{course.title}'; {result.already_enrolled} were already enrolled."
+        ))
+        if not_found:
+            self.stdout.write(self.style.WARNING(f"Not found or not students: {', '.join(str(value) for value in not_found)}"))
@@ -0,0 +1,23 @@
+"""Command to recompute every enrollment's progress summary from lesson progress."""
+
+from django.core.management.base import BaseCommand
+from courses.models import Course
+from enrollments.models import Enrollment
+from enrollments.progress import rebuild_progress_summaries
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-enrollment progress summaries (completed/total lessons, last activity) in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help='Only rebuild enrollments in this course.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows written per batch.')
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.all()
+        if options['course']:
+            if not Course.objects.filter(pk=options['course']).exists():
+                self.stdout.write(self.style.ERROR(f"Course {options['course']} does not exist."))
+                return
+            enrollments = enrollments.filter(course_id=options['course'])
+        count = rebuild_progress_summaries(enrollments, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} enrollment progress summaries.'))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_progress(apps, schema_editor):
+    # Same numbers as `rebuild_progress_summaries`, minus the last-activity columns,
+    # which fill in on the next progress write.
+    Enrollment = apps.get_model('enrollments', 'Enrollment')
+    EnrollmentProgress = apps.get_model('enrollments', 'EnrollmentProgress')
+    Lesson = apps.get_model('lessons', 'Lesson')
+    LessonProgress = apps.get_model('lessons', 'LessonProgress')
+    completed = LessonProgress.objects.filter(
+        student_id=OuterRef('student_id'), lesson__course_id=OuterRef('course_id'), is_completed=True,
+    ).order_by().values('student_id').annotate(n=Count('id')).values('n')[:1]
+    total = Lesson.objects.filter(course_id=OuterRef('course_id')).order_by().values('course_id').annotate(n=Count('id')).values('n')[:1]
+    rows = Enrollment.objects.order_by().annotate(
+        completed=Coalesce(Subquery(completed), Value(0)),
+        total=Coalesce(Subquery(total), Value(0)),
+    ).values_list('id', 'completed', 'total')
+    EnrollmentProgress.objects.bulk_create(
+        [EnrollmentProgress(enrollment_id=pk, completed_lessons=done, total_lessons=count) for pk, done, count in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollments', '0002_alter_enrollment_options'),
+        ('lessons', '0005_lessonprogress_completed_at_from_client'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentProgress',
+            fields=[
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress', serialize=False, to='enrollments.enrollment')),
+                ('completed_lessons', models.PositiveIntegerField(default=0)),
+                ('total_lessons', models.PositiveIntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('last_lesson', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='lessons.lesson')),
+            ],
+            options={
+                'verbose_name': 'Enrollment progress',
+                'verbose_name_plural': 'Enrollment progress',
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
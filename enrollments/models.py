@@ -1,4 +1,4 @@
-"""Enrollment model linking students to courses with a unique constraint."""
+"""Enrollment model linking students to courses, plus its denormalized progress summary."""
 
 from django.db import models
 from django.conf import settings
@@ -37,6 +37,10 @@ class Enrollment(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['student', 'course'], name='unique_enrollment')
         ]
+        indexes = [
+            # Course rosters and exports, newest or oldest enrollments first.
+            models.Index(fields=['course', 'enrolled_at'], name='enrollment_course_enrolled_at'),
+        ]
         verbose_name = 'Enrollment'
         verbose_name_plural = 'Enrollments'
         ordering = ['id']
@@ -45,4 +49,47 @@ class Enrollment(models.Model):
         """
         Return a readable string showing which student is enrolled in which course.
         """
-        return f"{self.student.username} enrolled in {self.course.title}"
\ No newline at end of file
+        return f"{self.student.username} enrolled in {self.course.title}"
+
+
+class EnrollmentProgress(models.Model):
+    """
+    Denormalized progress for one enrollment.
+
+    Dashboards and rosters read "% complete" from here instead of counting
+    LessonProgress rows per student and course. Progress writes and lesson
+    additions/removals update it incrementally (see `enrollments/progress.py`);
+    `python manage.py rebuild_progress_summaries` recomputes it in bulk.
+    """
+    enrollment = models.OneToOneField(
+        Enrollment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='progress',
+    )
+    # How many of the course's lessons the student has completed.
+    completed_lessons = models.PositiveIntegerField(default=0)
+    # How many lessons the course has.
+    total_lessons = models.PositiveIntegerField(default=0)
+    # The lesson the student last marked, and when.
+    last_lesson = models.ForeignKey(
+        'lessons.Lesson',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+    )
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Enrollment progress'
+        verbose_name_plural = 'Enrollment progress'
+
+    @property
+    def percent_complete(self):
+        if not self.total_lessons:
+            return 0
+        return round(100 * min(self.completed_lessons, self.total_lessons) / self.total_lessons)
+
+    def __str__(self):
+        return f"{self.enrollment_id}: {self.completed_lessons}/{self.total_lessons} lessons"
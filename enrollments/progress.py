@@ -0,0 +1,131 @@
+"""Maintenance of the per-enrollment progress summary (`EnrollmentProgress`).
+
+Writes adjust the stored counts with `F()` expressions instead of recounting:
+a progress write changes one enrollment's completed count, and adding or
+removing a lesson changes the totals of everyone enrolled in its course.
+`rebuild_progress_summaries` recomputes rows from scratch with correlated
+subqueries, for new enrollments, for rows that are missing, and for the
+`rebuild_progress_summaries` management command.
+
+Incremental counts are only right if each write sees the one before it, so
+progress writers call `lock_progress` inside their transaction before reading
+a student's previous state.
+"""
+
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from lessons.models import Lesson, LessonProgress
+from .models import Enrollment, EnrollmentProgress
+
+CHUNK_SIZE = 1000
+
+
+def _count(queryset, group_field):
+    return Subquery(queryset.order_by().values(group_field).annotate(n=Count('id')).values('n')[:1])
+
+
+def rebuild_progress_summaries(enrollments=None, chunk_size=CHUNK_SIZE):
+    """
+    Recompute the summary of every enrollment in `enrollments` (all by default)
+    and return how many rows were written.
+    """
+    if enrollments is None:
+        enrollments = Enrollment.objects.all()
+    progress = LessonProgress.objects.filter(student_id=OuterRef('student_id'), lesson__course_id=OuterRef('course_id'))
+    latest = progress.filter(is_completed=True).order_by(F('completed_at').desc(nulls_last=True), '-id')
+    rows = enrollments.order_by().annotate(
+        completed=Coalesce(_count(progress.filter(is_completed=True), 'student_id'), Value(0)),
+        total=Coalesce(_count(Lesson.objects.filter(course_id=OuterRef('course_id')), 'course_id'), Value(0)),
+        latest_lesson_id=Subquery(latest.values('lesson_id')[:1]),
+        latest_at=Subquery(latest.values('completed_at')[:1]),
+    ).values_list('id', 'completed', 'total', 'latest_lesson_id', 'latest_at')
+
+    written = 0
+    batch = []
+    for enrollment_id, completed, total, lesson_id, at in rows.iterator(chunk_size=chunk_size):
+        batch.append(EnrollmentProgress(
+            enrollment_id=enrollment_id, completed_lessons=completed, total_lessons=total,
+            last_lesson_id=lesson_id, last_activity_at=at,
+        ))
+        if len(batch) >= chunk_size:
+            written += _upsert(batch)
+            batch = []
+    if batch:
+        written += _upsert(batch)
+    return written
+
+
+def _upsert(rows):
+    EnrollmentProgress.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['enrollment'],
+        update_fields=['completed_lessons', 'total_lessons', 'last_lesson', 'last_activity_at'],
+    )
+    return len(rows)
+
+
+def lock_progress(student_id, course_ids):
+    """
+    Lock the student's enrollments in these courses until the transaction ends.
+
+    Concurrent progress writes for the same student and course then run one
+    after the other, so a completion is never counted twice. Must be called
+    inside `transaction.atomic()`. SQLite has no row locks, but its
+    transactions already take the write lock up front (BEGIN IMMEDIATE), so
+    there this does nothing.
+    """
+    if not connection.features.has_select_for_update:
+        return
+    list(
+        Enrollment.objects.select_for_update()
+        .filter(student_id=student_id, course_id__in=course_ids)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def record_progress(student_id, course_id, completed_delta, lesson_id, at):
+    """
+    Apply one student's progress writes in a course to their summary.
+
+    `completed_delta` is how many lessons became completed (negative when
+    completions were undone). A missing summary row is rebuilt instead.
+    """
+    summary = EnrollmentProgress.objects.filter(enrollment__student_id=student_id, enrollment__course_id=course_id)
+    updated = summary.update(
+        completed_lessons=Greatest(F('completed_lessons') + completed_delta, Value(0)),
+        last_lesson_id=lesson_id,
+        last_activity_at=at,
+    )
+    if not updated:
+        rebuild_progress_summaries(Enrollment.objects.filter(student_id=student_id, course_id=course_id))
+
+
+def lesson_added(lesson):
+    EnrollmentProgress.objects.filter(enrollment__course_id=lesson.course_id).update(
+        total_lessons=F('total_lessons') + 1,
+    )
+
+
+def lesson_removed(lesson):
+    """Take a lesson that is about to be deleted out of its course's summaries."""
+    _count_lesson(lesson.pk, lesson.course_id, -1)
+
+
+def lesson_moved(lesson, from_course_id):
+    """Move a lesson's counts from its previous course's summaries to its current course's."""
+    _count_lesson(lesson.pk, from_course_id, -1)
+    _count_lesson(lesson.pk, lesson.course_id, 1)
+
+
+def _count_lesson(lesson_id, course_id, step):
+    """Add `step` to a course's lesson totals and to the completed counts of students who completed the lesson."""
+    completed_by = LessonProgress.objects.filter(lesson_id=lesson_id, is_completed=True).values('student_id')
+    EnrollmentProgress.objects.filter(
+        enrollment__course_id=course_id, enrollment__student_id__in=completed_by,
+    ).update(completed_lessons=Greatest(F('completed_lessons') + step, Value(0)))
+    EnrollmentProgress.objects.filter(enrollment__course_id=course_id).update(
+        total_lessons=Greatest(F('total_lessons') + step, Value(0)),
+    )
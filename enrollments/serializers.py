@@ -1,11 +1,14 @@
-"""Serializers for enrollment records, rosters, and student enrollment lists."""
+"""Serializers for enrollment records, rosters, student enrollment lists, and bulk enrollment."""
 
 from rest_framework import serializers
-from .models import Enrollment
-from courses.serializers import CourseSerializer
-from accounts.serializers import UserSerializer
+from .models import Enrollment, EnrollmentProgress
+from courses.serializers import CourseSerializer, CourseReadSerializer
+from accounts.serializers import UserSerializer, UserReadSerializer
+from lms_backend.serializers import datetime_representation
+from lms_backend.metrics import TimedSerializerMixin
+from .bulk import read_student_csv
 
-class EnrollmentSerializer(serializers.ModelSerializer):
+class EnrollmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     This serializer is used for creating and viewing enrollment records.
 
@@ -16,6 +19,16 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'student', 'course', 'enrolled_at']
         read_only_fields = ['student', 'course', 'enrolled_at']
 
+class EnrollmentProgressSerializer(serializers.ModelSerializer):
+    """
+    The stored progress summary of one enrollment, for dashboards and rosters.
+    """
+    percent_complete = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = EnrollmentProgress
+        fields = ['completed_lessons', 'total_lessons', 'percent_complete', 'last_lesson', 'last_activity_at']
+
 class StudentEnrollmentSerializer(serializers.ModelSerializer):
     """
     This serializer lists all the courses a student is enrolled in.
@@ -23,10 +36,11 @@ class StudentEnrollmentSerializer(serializers.ModelSerializer):
     It's used for the 'my-enrollments' endpoint, and includes full course details by nesting the CourseSerializer.
     """
     course = CourseSerializer(read_only=True)
+    progress = EnrollmentProgressSerializer(read_only=True, default=None)
 
     class Meta:
         model = Enrollment
-        fields = ['course', 'enrolled_at']
+        fields = ['course', 'enrolled_at', 'progress']
 
 class CourseRosterSerializer(serializers.ModelSerializer):
     """
@@ -35,7 +49,73 @@ class CourseRosterSerializer(serializers.ModelSerializer):
     It's used for the teacher's 'course roster' view, and includes full student details by nesting the UserSerializer.
     """
     student = UserSerializer(read_only=True)
+    progress = EnrollmentProgressSerializer(read_only=True, default=None)
 
     class Meta:
         model = Enrollment
-        fields = ['student', 'enrolled_at']
+        fields = ['student', 'enrolled_at', 'progress']
+
+class EnrollmentProgressReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only `EnrollmentProgressSerializer` output; an enrollment without a summary renders as None.
+    """
+    def to_representation(self, progress):
+        if progress is None:
+            return None
+        return {
+            'completed_lessons': progress.completed_lessons,
+            'total_lessons': progress.total_lessons,
+            'percent_complete': progress.percent_complete,
+            'last_lesson': progress.last_lesson_id,
+            'last_activity_at': datetime_representation(progress.last_activity_at),
+        }
+
+class StudentEnrollmentReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only `StudentEnrollmentSerializer` output for the 'my-enrollments' list.
+    """
+    course_serializer = CourseReadSerializer()
+    progress_serializer = EnrollmentProgressReadSerializer()
+
+    def to_representation(self, enrollment):
+        return {
+            'course': self.course_serializer.to_representation(enrollment.course),
+            'enrolled_at': datetime_representation(enrollment.enrolled_at),
+            'progress': self.progress_serializer.to_representation(getattr(enrollment, 'progress', None)),
+        }
+
+class CourseRosterReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only `CourseRosterSerializer` output for the roster list.
+    """
+    student_serializer = UserReadSerializer()
+    progress_serializer = EnrollmentProgressReadSerializer()
+
+    def to_representation(self, enrollment):
+        return {
+            'student': self.student_serializer.to_representation(enrollment.student),
+            'enrolled_at': datetime_representation(enrollment.enrolled_at),
+            'progress': self.progress_serializer.to_representation(getattr(enrollment, 'progress', None)),
+        }
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    """
+    Input for bulk enrollment: a JSON list of student ids or a CSV `file` upload.
+
+    The CSV needs a `student_id`, `username` or `email` column. Validated data
+    holds the resolved `student_ids` plus any CSV values that matched no user.
+    """
+    student_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=10000)
+    file = serializers.FileField(required=False)
+
+    def validate(self, attrs):
+        if 'file' in attrs:
+            try:
+                student_ids, not_found = read_student_csv(attrs.pop('file'))
+            except (ValueError, UnicodeDecodeError) as exc:
+                raise serializers.ValidationError({'file': str(exc)})
+            attrs['student_ids'] = attrs.get('student_ids', []) + student_ids
+            attrs['not_found'] = not_found
+        elif 'student_ids' not in attrs:
+            raise serializers.ValidationError('Send a list of student_ids or a CSV file.')
+        return attrs
@@ -0,0 +1,37 @@
+"""Signal handlers that keep enrollment progress summaries in sync with enrollments and lessons."""
+
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from lms_backend.signals import deleted_in_cascade
+from .models import Enrollment
+from .progress import lesson_added, lesson_moved, lesson_removed, rebuild_progress_summaries
+
+
+@receiver(post_save, sender=Enrollment)
+def create_progress_summary(sender, instance, created=False, **kwargs):
+    # A student re-enrolling may already have progress in the course, so count it.
+    if created:
+        rebuild_progress_summaries(Enrollment.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender='lessons.Lesson')
+def count_new_lesson(sender, instance, created=False, **kwargs):
+    if created:
+        lesson_added(instance)
+        return
+    # `Lesson.from_db` remembers the stored course; a changed one means the lesson moved.
+    loaded_course_id = getattr(instance, '_loaded_course_id', None)
+    if loaded_course_id is not None and loaded_course_id != instance.course_id:
+        lesson_moved(instance, loaded_course_id)
+    instance._loaded_course_id = instance.course_id
+
+
+@receiver(pre_delete, sender='lessons.Lesson')
+def uncount_deleted_lesson(sender, instance, origin=None, **kwargs):
+    # Deleting a course deletes its enrollments and their summaries too, so
+    # there is nothing to update (and one update per lesson would be wasted).
+    if deleted_in_cascade(sender, origin):
+        return
+    # Before the delete, while the lesson's progress rows still say who completed it.
+    lesson_removed(instance)
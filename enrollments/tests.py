@@ -1,9 +1,18 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models.signals import pre_delete
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from .models import Enrollment
+from .bulk import bulk_enroll
+from .models import Enrollment, EnrollmentProgress
 from courses.models import Course
+from lessons.models import Lesson
 from accounts.models import User
+from accounts.authz import AuthorizationContext
 
 class EnrollmentAPITests(APITestCase):
     """
@@ -116,3 +125,213 @@ class EnrollmentAPITests(APITestCase):
         response = self.client.get(self.roster_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
+
+    def test_roster_supports_keyset_pagination(self):
+        """
+        Verify a teacher can walk a large roster with stable cursors.
+        """
+        for i in range(12):
+            student = User.objects.create_user(username=f'bulk{i}', password='password123', role='student', email=f'bulk{i}@example.com')
+            Enrollment.objects.create(student=student, course=self.course1)
+        self.client.force_authenticate(user=self.teacher1)
+        first = self.client.get(self.roster_url, {'pagination': 'cursor'})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', first.data)
+        self.assertEqual(len(first.data['results']), 10)
+        second = self.client.get(first.data['next'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second.data['results']), 3)
+        self.assertIsNone(second.data['next'])
+        usernames = [row['student']['username'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(len(set(usernames)), 13)
+
+
+class BulkEnrollmentTests(APITestCase):
+    """
+    Tests for enrolling a cohort of students in one request or command.
+    """
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='bulkteacher', password='password123', role='teacher', email='bulkteacher@example.com')
+        self.other_teacher = User.objects.create_user(username='bulkother', password='password123', role='teacher', email='bulkother@example.com')
+        self.students = [
+            User.objects.create_user(username=f'cohort{i}', password='password123', role='student', email=f'cohort{i}@example.com')
+            for i in range(5)
+        ]
+        self.course = Course.objects.create(title="Cohort Course", description="Bulk.", teacher=self.teacher)
+        Enrollment.objects.create(student=self.students[0], course=self.course)
+        self.url = reverse('course-bulk-enroll', kwargs={'course_pk': self.course.pk})
+
+    def test_teacher_enrolls_student_ids(self):
+        """
+        Verify new, existing and unknown ids are counted separately.
+        """
+        self.client.force_authenticate(user=self.teacher)
+        ids = [student.id for student in self.students] + [self.other_teacher.id, 999999]
+        response = self.client.post(self.url, {'student_ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual(response.data['already_enrolled'], 1)
+        self.assertEqual(response.data['not_found'], [self.other_teacher.id, 999999])
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 5)
+        self.assertTrue(AuthorizationContext(self.students[1]).is_enrolled(self.course.id))
+
+    def test_csv_upload_by_username(self):
+        """
+        Verify a CSV of usernames is resolved and enrolled.
+        """
+        self.client.force_authenticate(user=self.teacher)
+        upload = SimpleUploadedFile('cohort.csv', b'username\ncohort0\ncohort1\nnobody\n', content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'created': 1, 'already_enrolled': 1, 'not_found': ['nobody']})
+
+    def test_csv_without_known_column_is_rejected(self):
+        self.client.force_authenticate(user=self.teacher)
+        upload = SimpleUploadedFile('cohort.csv', b'name\ncohort0\n', content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', response.data)
+
+    def test_only_the_course_teacher_or_admin_can_bulk_enroll(self):
+        for user in (self.other_teacher, self.students[1]):
+            self.client.force_authenticate(user=user)
+            response = self.client.post(self.url, {'student_ids': [self.students[2].id]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Enrollment.objects.filter(student=self.students[2]).exists())
+
+    def test_bulk_enroll_is_a_fixed_number_of_queries(self):
+        """
+        Verify the work is chunked rather than done per student.
+        """
+        more = [
+            User.objects.create_user(username=f'cohortx{i}', password='x', role='student', email=f'cohortx{i}@example.com')
+            for i in range(30)
+        ]
+        self.client.force_authenticate(user=self.teacher)
+        # Ownership sets (2), course, student lookup, existing enrollments, insert, re-read
+        # of the inserted rows, progress summary rebuild (select + upsert) and the savepoint pair.
+        with self.assertNumQueries(11):
+            response = self.client.post(self.url, {'student_ids': [student.id for student in more]}, format='json')
+        self.assertEqual(response.data['created'], 30)
+
+    def test_concurrent_enrollments_count_as_already_enrolled(self):
+        """
+        Verify rows skipped by the insert because another request enrolled the student are not reported as created.
+        """
+        insert = Enrollment.objects.bulk_create
+
+        def racing_insert(rows, **kwargs):
+            Enrollment.objects.create(student=self.students[1], course=self.course)
+            return insert(rows, **kwargs)
+
+        with mock.patch.object(Enrollment.objects, 'bulk_create', side_effect=racing_insert):
+            result = bulk_enroll(self.course, [student.id for student in self.students])
+        self.assertEqual((result.created, result.already_enrolled), (3, 2))
+        self.assertEqual(EnrollmentProgress.objects.filter(enrollment__course=self.course).count(), 5)
+
+    def test_management_command_reports_counts(self):
+        out = StringIO()
+        ids = [str(student.id) for student in self.students[:3]]
+        call_command('bulk_enroll', str(self.course.pk), '--students', *ids, stdout=out)
+        self.assertIn('Enrolled 2 new students', out.getvalue())
+        self.assertIn('1 were already enrolled', out.getvalue())
+
+
+class EnrollmentProgressSummaryTests(APITestCase):
+    """
+    Tests that the stored per-enrollment progress follows progress and lesson changes.
+    """
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='sumteacher', password='password123', role='teacher', email='sumteacher@example.com')
+        self.student = User.objects.create_user(username='sumstudent', password='password123', role='student', email='sumstudent@example.com')
+        self.course = Course.objects.create(title="Summary Course", description="Progress.", teacher=self.teacher)
+        self.lessons = [
+            Lesson.objects.create(course=self.course, title=f"Lesson {i}", content="Body", order=i) for i in range(1, 5)
+        ]
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        self.client.force_authenticate(user=self.student)
+
+    def summary(self):
+        return EnrollmentProgress.objects.get(enrollment=self.enrollment)
+
+    def test_enrolling_creates_the_summary(self):
+        summary = self.summary()
+        self.assertEqual((summary.completed_lessons, summary.total_lessons), (0, 4))
+
+    def test_progress_writes_update_the_summary(self):
+        url = reverse('lesson-progress')
+        self.client.post(url, {'lesson': self.lessons[0].id}, format='json')
+        self.client.post(url, {'lesson': self.lessons[0].id}, format='json')
+        self.client.post(reverse('lesson-progress-batch'), {'items': [
+            {'lesson': self.lessons[1].id, 'is_completed': True},
+            {'lesson': self.lessons[2].id, 'is_completed': True},
+            {'lesson': self.lessons[0].id, 'is_completed': False},
+        ]}, format='json')
+        summary = self.summary()
+        self.assertEqual(summary.completed_lessons, 2)
+        self.assertEqual(summary.last_lesson_id, self.lessons[0].id)
+        self.assertIsNotNone(summary.last_activity_at)
+        self.assertEqual(summary.percent_complete, 50)
+
+    def test_adding_and_removing_lessons_updates_totals(self):
+        self.client.post(reverse('lesson-progress'), {'lesson': self.lessons[3].id}, format='json')
+        Lesson.objects.create(course=self.course, title="Lesson 5", content="Body", order=5)
+        self.assertEqual(self.summary().total_lessons, 5)
+        self.lessons[3].delete()
+        summary = self.summary()
+        self.assertEqual((summary.completed_lessons, summary.total_lessons), (0, 4))
+
+    def test_delete_signal_without_origin_still_counts(self):
+        # Signals sent by hand (or by older collectors) carry no origin.
+        pre_delete.send(sender=Lesson, instance=self.lessons[3], using='default', origin=None)
+        self.assertEqual(self.summary().total_lessons, 3)
+
+    def test_moving_a_lesson_moves_its_counts(self):
+        other = Course.objects.create(title="Other Course", description="Moved to.", teacher=self.teacher)
+        other_student = User.objects.create_user(username='sumother', password='password123', role='student', email='sumother@example.com')
+        other_enrollment = Enrollment.objects.create(student=other_student, course=other)
+        Enrollment.objects.create(student=self.student, course=other)
+        self.client.post(reverse('lesson-progress'), {'lesson': self.lessons[0].id}, format='json')
+
+        lesson = Lesson.objects.get(pk=self.lessons[0].pk)
+        lesson.course = other
+        lesson.save()
+        summary = self.summary()
+        self.assertEqual((summary.completed_lessons, summary.total_lessons), (0, 3))
+        moved = EnrollmentProgress.objects.get(enrollment__student=self.student, enrollment__course=other)
+        self.assertEqual((moved.completed_lessons, moved.total_lessons), (1, 1))
+        untouched = EnrollmentProgress.objects.get(enrollment=other_enrollment)
+        self.assertEqual((untouched.completed_lessons, untouched.total_lessons), (0, 1))
+
+        # Saving again without a move changes nothing.
+        lesson.save()
+        self.assertEqual(self.summary().total_lessons, 3)
+
+    def test_my_enrollments_reads_the_summary(self):
+        self.client.post(reverse('lesson-progress'), {'lesson': self.lessons[0].id}, format='json')
+        response = self.client.get(reverse('my-enrollments'))
+        self.assertEqual(response.data['results'][0]['progress']['percent_complete'], 25)
+
+    def test_rebuild_command_repairs_summaries(self):
+        self.client.post(reverse('lesson-progress'), {'lesson': self.lessons[0].id}, format='json')
+        EnrollmentProgress.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_progress_summaries', stdout=out)
+        self.assertIn('Rebuilt 1 enrollment progress summaries', out.getvalue())
+        summary = self.summary()
+        self.assertEqual((summary.completed_lessons, summary.total_lessons), (1, 4))
+        self.assertEqual(summary.last_lesson_id, self.lessons[0].id)
+
+    def test_roster_export_streams_progress(self):
+        """
+        Verify the roster export includes each student's stored progress.
+        """
+        self.client.post(reverse('lesson-progress'), {'lesson': self.lessons[0].id}, format='json')
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(reverse('course-roster-export', kwargs={'course_pk': self.course.pk, 'fmt': 'csv'}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'student_id,username,email,enrolled_at,completed_lessons,total_lessons')
+        self.assertTrue(lines[1].startswith(f'{self.student.id},sumstudent,'))
+        self.assertTrue(lines[1].endswith(',1,4'))
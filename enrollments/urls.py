@@ -5,6 +5,8 @@ from .views import (
     StudentEnrollmentListView,
     EnrollmentCreateView,
     CourseRosterListView,
+    BulkEnrollmentView,
+    CourseRosterExportView,
 )
 
 urlpatterns = [
@@ -14,4 +16,8 @@ urlpatterns = [
     path('courses/<int:course_pk>/enroll/', EnrollmentCreateView.as_view(), name='course-enroll'),
     # Course roster (teacher/admin)
     path('courses/<int:course_pk>/roster/', CourseRosterListView.as_view(), name='course-roster'),
+    # Streamed roster export as CSV or NDJSON (teacher/admin)
+    path('courses/<int:course_pk>/roster/export.<str:fmt>', CourseRosterExportView.as_view(), name='course-roster-export'),
+    # Enroll many students at once from ids or a CSV (teacher/admin)
+    path('courses/<int:course_pk>/bulk-enroll/', BulkEnrollmentView.as_view(), name='course-bulk-enroll'),
 ]
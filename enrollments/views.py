@@ -1,14 +1,19 @@
-"""Endpoints for creating enrollments, listing a student's courses, and course rosters."""
+"""Endpoints for creating enrollments (one or in bulk), listing a student's courses, and course rosters and their exports."""
 
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.db import IntegrityError
+from django.db.models import F
 
 from .models import Enrollment
-from .serializers import EnrollmentSerializer, StudentEnrollmentSerializer, CourseRosterSerializer
+from .serializers import EnrollmentSerializer, StudentEnrollmentReadSerializer, CourseRosterReadSerializer, BulkEnrollmentSerializer
+from .bulk import bulk_enroll
 from courses.models import Course
+from lms_backend.async_views import AsyncAPIView
+from lms_backend.exports import streaming_export
 from accounts.permissions import IsStudent, IsCourseTeacherOrAdmin
 
 class EnrollmentCreateView(generics.CreateAPIView):
@@ -25,33 +30,35 @@ class EnrollmentCreateView(generics.CreateAPIView):
         # Get the course ID from the URL and fetch the course object.
         course_pk = self.kwargs.get('course_pk')
         course = get_object_or_404(Course, pk=course_pk)
-        student = request.user
 
         try:
             # Try to create the enrollment. If the student is already enrolled, the unique constraint will raise an error.
-            Enrollment.objects.create(student=student, course=course)
+            Enrollment.objects.create(student_id=request.user.pk, course=course)
             return Response({'detail': 'Successfully enrolled in the course.'}, status=status.HTTP_201_CREATED)
         except IntegrityError:
             # If the student is already enrolled, return a friendly error message.
             return Response({'detail': 'You are already enrolled in this course.'}, status=status.HTTP_400_BAD_REQUEST)
 
-class StudentEnrollmentListView(generics.ListAPIView):
+class StudentEnrollmentListView(AsyncAPIView, generics.ListAPIView):
     """
     API view for a student to list their own enrollments.
 
     GET-only endpoint: returns a list of courses the authenticated student is enrolled in.
     Uses a dedicated serializer for clean, useful output.
     """
-    serializer_class = StudentEnrollmentSerializer
+    serializer_class = StudentEnrollmentReadSerializer
     permission_classes = [IsAuthenticated]
 
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
     def get_queryset(self):
         """
         Return all enrollments for the currently authenticated user.
         This makes it easy for students to see what courses they're taking.
         """
         user = self.request.user
-        return Enrollment.objects.filter(student=user).select_related('course', 'course__teacher')
+        return Enrollment.objects.filter(student_id=user.pk).select_related('course', 'course__teacher', 'progress')
 
 class CourseRosterListView(generics.ListAPIView):
     """
@@ -60,7 +67,7 @@ class CourseRosterListView(generics.ListAPIView):
     GET-only endpoint: only the teacher who owns the course (or an admin) can view the list of enrolled students.
     This helps teachers manage their classes and see who's enrolled.
     """
-    serializer_class = CourseRosterSerializer
+    serializer_class = CourseRosterReadSerializer
     permission_classes = [IsAuthenticated, IsCourseTeacherOrAdmin]
 
     def get_queryset(self):
@@ -69,4 +76,44 @@ class CourseRosterListView(generics.ListAPIView):
         This lets teachers see every student enrolled in their course.
         """
         course_pk = self.kwargs.get('course_pk')
-        return Enrollment.objects.filter(course__pk=course_pk).select_related('student')
+        return Enrollment.objects.filter(course__pk=course_pk).select_related('student', 'progress')
+
+class BulkEnrollmentView(generics.GenericAPIView):
+    """
+    API view for a teacher or admin to enroll many students in a course at once.
+
+    POST-only endpoint: send `{"student_ids": [...]}` as JSON, or a CSV `file`
+    (multipart) with a `student_id`, `username` or `email` column. Students who
+    are already enrolled are skipped, and the response reports the counts.
+    """
+    serializer_class = BulkEnrollmentSerializer
+    permission_classes = [IsAuthenticated, IsCourseTeacherOrAdmin]
+
+    def post(self, request, *args, **kwargs):
+        course = get_object_or_404(Course, pk=self.kwargs.get('course_pk'))
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_enroll(course, serializer.validated_data['student_ids'])
+        # CSV values that didn't match any user are reported alongside ids that aren't students.
+        result.not_found = serializer.validated_data.get('not_found', []) + result.not_found
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+class CourseRosterExportView(APIView):
+    """
+    Stream a course roster with each student's progress as CSV or NDJSON.
+
+    GET /api/enrollments/courses/<course_pk>/roster/export.csv (or .ndjson);
+    same access rules as the roster itself.
+    """
+    permission_classes = [IsAuthenticated, IsCourseTeacherOrAdmin]
+    columns = ['student_id', 'username', 'email', 'enrolled_at', 'completed_lessons', 'total_lessons']
+
+    def get(self, request, course_pk, fmt):
+        course = get_object_or_404(Course.objects.only('id'), pk=course_pk)
+        rows = Enrollment.objects.filter(course=course).order_by('id').annotate(
+            username=F('student__username'),
+            email=F('student__email'),
+            completed_lessons=F('progress__completed_lessons'),
+            total_lessons=F('progress__total_lessons'),
+        )
+        return streaming_export(request, rows, self.columns, fmt, f'course-{course.pk}-roster')
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+def clear_incomplete_timestamps(apps, schema_editor):
+    # auto_now stamped every save; only completed rows should carry a completion time.
+    LessonProgress = apps.get_model('lessons', 'LessonProgress')
+    LessonProgress.objects.filter(is_completed=False).update(completed_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0004_remove_lessonprogress_unique_user_lesson_progress_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lessonprogress',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(clear_incomplete_timestamps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0005_lessonprogress_completed_at_from_client'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['student', 'is_completed', 'lesson'], name='lessonprogress_student_done'),
+        ),
+    ]
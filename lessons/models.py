@@ -4,6 +4,40 @@ from django.db import models
 from django.conf import settings
 from courses.models import Course
 
+# Custom queryset so every place that lists lessons applies the same visibility rules.
+class LessonQuerySet(models.QuerySet):
+    def visible_to(self, user, authz=None):
+        """
+        Return the lessons this user is allowed to read.
+        - Admins see all lessons.
+        - Teachers see lessons for their own courses.
+        - Students see lessons for courses they're enrolled in.
+        - Anyone else gets nothing.
+        Pass the request's authorization context (`accounts.authz`) to filter on
+        its already-loaded course id sets instead of joining other tables.
+        """
+        if not user or not user.is_authenticated:
+            return self.none()
+        role = getattr(user, "role", None)
+        if role == "admin":
+            return self
+        if role == "teacher":
+            if authz is not None:
+                return self.filter(course_id__in=authz.owned_course_ids)
+            return self.filter(course__teacher_id=user.pk)
+        if role == "student":
+            if authz is not None:
+                return self.filter(course_id__in=authz.enrolled_course_ids)
+            return self.filter(course__enrollments__student_id=user.pk).distinct()
+        return self.none()
+
+    def with_quiz_id(self):
+        """
+        Attach each lesson's quiz id as `quiz_pk` through a LEFT JOIN, so
+        serializers don't need a reverse one-to-one lookup per lesson.
+        """
+        return self.annotate(quiz_pk=models.F("quiz__id"))
+
 # The Lesson model represents a single lesson within a course.
 # Each lesson is linked to a course, has a title, some content, and an order value to control its position.
 class Lesson(models.Model):
@@ -15,6 +49,17 @@ class Lesson(models.Model):
     content = models.TextField()
     # The order of this lesson within the course. Lower numbers come first.
     order = models.PositiveIntegerField(default=0)
+    # When the lesson last changed, including a quiz being added or removed; used for conditional GETs.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = LessonQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        lesson = super().from_db(db, field_names, values)
+        # Remember the stored course, so moving the lesson can fix both courses' progress totals.
+        lesson._loaded_course_id = lesson.__dict__.get("course_id")
+        return lesson
 
     def __str__(self):
         # When you print a lesson, show its title and which course it belongs to.
@@ -28,6 +73,18 @@ class Lesson(models.Model):
             models.UniqueConstraint(fields=["course", "order"], name="unique_lesson_order_per_course")
         ]
 
+# Queryset helpers for progress lookups that serve whole lists of lessons at once.
+class LessonProgressQuerySet(models.QuerySet):
+    def completed_lesson_ids(self, student, lesson_ids=None):
+        """
+        Return the set of lesson ids this student has completed, in one query.
+        Pass `lesson_ids` (ids or a queryset) to only look at some lessons.
+        """
+        qs = self.filter(student_id=student.pk, is_completed=True)
+        if lesson_ids is not None:
+            qs = qs.filter(lesson_id__in=lesson_ids)
+        return set(qs.values_list("lesson_id", flat=True))
+
 # The LessonProgress model tracks a student's completion status for a specific lesson.
 # It links a user to a lesson and stores whether they have completed it.
 class LessonProgress(models.Model):
@@ -37,14 +94,21 @@ class LessonProgress(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="progress")
     # Boolean field to mark the lesson as completed. Defaults to False.
     is_completed = models.BooleanField(default=False)
-    # Timestamp for when the lesson was marked as complete.
-    completed_at = models.DateTimeField(auto_now=True)
+    # When the student completed the lesson, as reported by the client event (empty while incomplete).
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LessonProgressQuerySet.as_manager()
 
     class Meta:
         # Ensure that a user can only have one progress entry per lesson.
         constraints = [
             models.UniqueConstraint(fields=["student", "lesson"], name="unique_student_lesson_progress")
         ]
+        indexes = [
+            # A student's completed lessons, read by every lesson list and course outline.
+            # lesson is included so the lookup is answered from the index alone.
+            models.Index(fields=["student", "is_completed", "lesson"], name="lessonprogress_student_done"),
+        ]
 
     def __str__(self):
         # A string representation for the admin panel and debugging.
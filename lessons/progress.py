@@ -0,0 +1,88 @@
+"""Batched lesson progress sync for clients that queue completion events offline.
+
+A batch is checked against the student's enrollments in one query and written
+with a single upsert (`bulk_create(update_conflicts=True)`), instead of an
+enrollment check plus `update_or_create` per lesson, and each course's
+progress summary is adjusted once per batch. Each item gets its own
+status so the client knows which events it can drop from its queue.
+"""
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from enrollments.models import Enrollment
+from enrollments.progress import lock_progress, record_progress
+from .models import Lesson, LessonProgress
+
+APPLIED = 'applied'
+SUPERSEDED = 'superseded'
+NOT_FOUND = 'not_found'
+NOT_ENROLLED = 'not_enrolled'
+
+
+def apply_progress_batch(student, items):
+    """
+    Record validated progress `items` (dicts with `lesson`, `is_completed` and
+    optional `completed_at`) for `student` and return one status per item.
+
+    When a lesson appears more than once, the last item wins and the earlier
+    ones are reported as superseded. Completion times default to now and are
+    never accepted from the future.
+    """
+    if not items:
+        return []
+    lesson_ids = {item['lesson'] for item in items}
+    lessons = {
+        lesson_id: (course_id, enrolled)
+        for lesson_id, course_id, enrolled in Lesson.objects.filter(id__in=lesson_ids)
+        .annotate(enrolled=Exists(Enrollment.objects.filter(course_id=OuterRef('course_id'), student_id=student.pk)))
+        .values_list('id', 'course_id', 'enrolled')
+    }
+
+    now = timezone.now()
+    last_index = {item['lesson']: index for index, item in enumerate(items)}
+    statuses = []
+    rows = []
+    for index, item in enumerate(items):
+        lesson_id = item['lesson']
+        if lesson_id not in lessons:
+            statuses.append(NOT_FOUND)
+        elif not lessons[lesson_id][1]:
+            statuses.append(NOT_ENROLLED)
+        elif last_index[lesson_id] != index:
+            statuses.append(SUPERSEDED)
+        else:
+            completed_at = None
+            if item['is_completed']:
+                completed_at = min(item.get('completed_at') or now, now)
+            rows.append(LessonProgress(
+                student_id=student.pk, lesson_id=lesson_id,
+                is_completed=item['is_completed'], completed_at=completed_at,
+            ))
+            statuses.append(APPLIED)
+
+    if rows:
+        with transaction.atomic():
+            # Previous states turn the upsert into per-course deltas for the progress summaries.
+            # They are read under the lock so a concurrent write can't be counted twice.
+            lock_progress(student.pk, {lessons[row.lesson_id][0] for row in rows})
+            was_completed = dict(
+                LessonProgress.objects.filter(student_id=student.pk, lesson_id__in=[row.lesson_id for row in rows])
+                .values_list('lesson_id', 'is_completed')
+            )
+            changes = {}
+            for row in rows:
+                course_id = lessons[row.lesson_id][0]
+                delta = int(row.is_completed) - int(was_completed.get(row.lesson_id, False))
+                previous_delta = changes.get(course_id, (0,))[0]
+                changes[course_id] = (previous_delta + delta, row.lesson_id)
+            LessonProgress.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['student', 'lesson'],
+                update_fields=['is_completed', 'completed_at'],
+            )
+            for course_id, (delta, last_lesson_id) in changes.items():
+                record_progress(student.pk, course_id, delta, last_lesson_id, now)
+    return statuses
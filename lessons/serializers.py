@@ -4,11 +4,33 @@
 from rest_framework import serializers
 from .models import Lesson, LessonProgress
 from courses.models import Course
-from courses.serializers import CourseSerializer
+from courses.serializers import CourseSerializer, CourseReadSerializer
+from lms_backend.metrics import TimedSerializerMixin
+
+# How a lesson's `is_completed` and `quiz_id` are worked out, shared by the full
+# serializer and its read-only variant.
+class LessonStateMixin:
+    def get_is_completed(self, obj):
+        # Views that serialize many lessons preload the student's completed ids once.
+        completed_ids = self.context.get('completed_lesson_ids')
+        if completed_ids is not None:
+            return obj.id in completed_ids
+        request = self.context.get('request', None)
+        if request and request.user.is_authenticated:
+            return LessonProgress.objects.filter(lesson=obj, student_id=request.user.pk, is_completed=True).exists()
+        return False
+
+    def get_quiz_id(self, obj):
+        # Querysets built with `with_quiz_id()` already carry the quiz id.
+        if hasattr(obj, 'quiz_pk'):
+            return obj.quiz_pk
+        if hasattr(obj, 'quiz') and obj.quiz:
+            return obj.quiz.id
+        return None
 
 # This serializer turns Lesson objects into JSON and back again.
 # It's used by the API to send lesson data to the frontend and accept new lessons from users.
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(TimedSerializerMixin, LessonStateMixin, serializers.ModelSerializer):
     # For read operations, show full course details. For write operations, allow picking a course by ID.
     course = CourseSerializer(read_only=True)
     course_id = serializers.PrimaryKeyRelatedField(
@@ -22,23 +44,45 @@ class LessonSerializer(serializers.ModelSerializer):
         # These are the fields that will be included in the API responses and requests.
         fields = ["id", "course", "course_id", "title", "content", "order", "is_completed", "quiz_id"]
 
-    def get_is_completed(self, obj):
-        request = self.context.get('request', None)
-        if request and request.user.is_authenticated:
-            student = request.user
-            return LessonProgress.objects.filter(lesson=obj, student=student, is_completed=True).exists()
-        return False
+# Read-only `LessonSerializer` output for lesson lists. Builds the same dict by
+# hand instead of binding a field per value (see `lms_backend/serializers.py`).
+class LessonReadSerializer(TimedSerializerMixin, LessonStateMixin, serializers.BaseSerializer):
+    course_serializer = CourseReadSerializer()
 
-    def get_quiz_id(self, obj):
-        if hasattr(obj, 'quiz') and obj.quiz:
-            return obj.quiz.id
-        return None
+    def to_representation(self, lesson):
+        return {
+            "id": lesson.id,
+            "course": self.course_serializer.to_representation(lesson.course),
+            "title": lesson.title,
+            "content": lesson.content,
+            "order": lesson.order,
+            "is_completed": self.get_is_completed(lesson),
+            "quiz_id": self.get_quiz_id(lesson),
+        }
+
+# A compact lesson row for the course outline: no content and no nested course,
+# just what a syllabus sidebar needs. Completion and quiz ids come from the view's
+# preloaded context and annotations, so the whole outline costs a fixed number of queries.
+class LessonOutlineSerializer(LessonSerializer):
+    class Meta(LessonSerializer.Meta):
+        fields = ["id", "title", "order", "is_completed", "quiz_id"]
 
 # Serializer for tracking student progress on lessons.
 # This handles the data for marking a lesson as complete.
-class LessonProgressSerializer(serializers.ModelSerializer):
+class LessonProgressSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = LessonProgress
         # The fields to include in the API representation.
         fields = ["id", "student", "lesson", "is_completed", "completed_at"]
         read_only_fields = ["student", "completed_at"]
+
+# One offline progress event in a batch sync. `completed_at` is when the student
+# finished the lesson on their device; it defaults to the time the batch arrives.
+class LessonProgressItemSerializer(serializers.Serializer):
+    lesson = serializers.IntegerField(min_value=1)
+    is_completed = serializers.BooleanField(default=True)
+    completed_at = serializers.DateTimeField(required=False, allow_null=True)
+
+# The batch envelope; items are validated one by one so a bad item doesn't reject the rest.
+class LessonProgressBatchSerializer(serializers.Serializer):
+    items = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=500)
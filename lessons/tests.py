@@ -1,10 +1,16 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from accounts.models import User
 from courses.models import Course
 from enrollments.models import Enrollment
-from lessons.models import Lesson
+from lessons.models import Lesson, LessonProgress
+from quizzes.models import Quiz
 
 
 class LessonVisibilityTests(APITestCase):
@@ -73,3 +79,200 @@ class LessonVisibilityTests(APITestCase):
 		self.assertEqual(resp.status_code, status.HTTP_200_OK)
 		self.lesson2.refresh_from_db()
 		self.assertEqual(self.lesson2.title, 'Admin Updated L2')
+
+	def test_student_lesson_list_stays_unpaginated(self):
+		self.client.force_authenticate(user=self.student_enrolled)
+		resp = self.client.get(reverse('lesson-list'))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertEqual([l['title'] for l in resp.data], ['L1', 'L2'])
+
+	def test_admin_lesson_list_is_bounded_by_keyset_pages(self):
+		for order in range(3, 15):
+			Lesson.objects.create(course=self.course, title=f'L{order}', content='More', order=order)
+		self.client.force_authenticate(user=self.admin)
+		resp = self.client.get(reverse('lesson-list'))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertEqual(len(resp.data['results']), 10)
+		self.assertIsNotNone(resp.data['next'])
+
+	def test_keyset_pages_follow_lesson_order_within_a_course(self):
+		self.client.force_authenticate(user=self.teacher)
+		resp = self.client.get(reverse('lesson-list'), {'course': self.course.id, 'pagination': 'cursor', 'page_size': 1})
+		self.assertEqual([l['title'] for l in resp.data['results']], ['L1'])
+		resp = self.client.get(resp.data['next'])
+		self.assertEqual([l['title'] for l in resp.data['results']], ['L2'])
+
+
+class CourseOutlineTests(APITestCase):
+	"""The outline and lesson list cost the same number of queries for any course length."""
+
+	def setUp(self):
+		self.teacher = User.objects.create_user(username='outlineT', password='Pass!12345', role='teacher', email='outlineT@example.com')
+		self.student = User.objects.create_user(username='outlineS', password='Pass!12345', role='student', email='outlineS@example.com')
+		self.course = Course.objects.create(title='Outline Course', description='Many lessons.', teacher=self.teacher)
+		Enrollment.objects.create(student=self.student, course=self.course)
+		self.url = reverse('course-outline', kwargs={'course_id': self.course.id})
+		self.client.force_authenticate(user=self.student)
+
+	def _add_lessons(self, count):
+		start = Lesson.objects.filter(course=self.course).count()
+		for order in range(start + 1, start + count + 1):
+			lesson = Lesson.objects.create(course=self.course, title=f'Lesson {order}', content='Body', order=order)
+			if order % 2:
+				Quiz.objects.create(lesson=lesson, title=f'Quiz {order}')
+				LessonProgress.objects.create(student=self.student, lesson=lesson, is_completed=True)
+
+	def _count_queries(self, url, **params):
+		# Prime per-user caches so both sizes are measured in the same steady state.
+		self.client.get(url, params)
+		with CaptureQueriesContext(connection) as ctx:
+			resp = self.client.get(url, params)
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		return len(ctx.captured_queries), resp
+
+	def test_outline_reports_completion_and_quiz_ids(self):
+		self._add_lessons(3)
+		resp = self.client.get(self.url)
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertEqual(resp.data['total_lessons'], 3)
+		self.assertEqual(resp.data['completed_lessons'], 2)
+		rows = resp.data['lessons']
+		self.assertEqual([r['order'] for r in rows], [1, 2, 3])
+		self.assertEqual([r['is_completed'] for r in rows], [True, False, True])
+		self.assertIsNotNone(rows[0]['quiz_id'])
+		self.assertIsNone(rows[1]['quiz_id'])
+
+	def test_outline_query_count_does_not_grow_with_lessons(self):
+		self._add_lessons(2)
+		small, _ = self._count_queries(self.url)
+		self._add_lessons(20)
+		large, resp = self._count_queries(self.url)
+		self.assertEqual(len(resp.data['lessons']), 22)
+		self.assertEqual(small, large)
+
+	def test_lesson_list_query_count_does_not_grow_with_lessons(self):
+		self._add_lessons(2)
+		small, _ = self._count_queries(reverse('lesson-list'))
+		self._add_lessons(20)
+		large, resp = self._count_queries(reverse('lesson-list'))
+		self.assertEqual(len(resp.data), 22)
+		self.assertEqual(small, large)
+
+	def test_outline_hides_lessons_from_students_not_enrolled(self):
+		self._add_lessons(2)
+		outsider = User.objects.create_user(username='outlineX', password='Pass!12345', role='student', email='outlineX@example.com')
+		self.client.force_authenticate(user=outsider)
+		resp = self.client.get(self.url)
+		self.assertEqual(resp.data['lessons'], [])
+
+
+class LessonProgressBatchTests(APITestCase):
+	"""Batched progress sync validates and writes all items at once."""
+
+	def setUp(self):
+		self.teacher = User.objects.create_user(username='batchT', password='Pass!12345', role='teacher', email='batchT@example.com')
+		self.student = User.objects.create_user(username='batchS', password='Pass!12345', role='student', email='batchS@example.com')
+		self.course = Course.objects.create(title='Batch Course', description='Sync.', teacher=self.teacher)
+		self.other_course = Course.objects.create(title='Other Course', description='Not enrolled.', teacher=self.teacher)
+		Enrollment.objects.create(student=self.student, course=self.course)
+		self.lessons = [
+			Lesson.objects.create(course=self.course, title=f'Batch {i}', content='Body', order=i) for i in range(1, 4)
+		]
+		self.foreign = Lesson.objects.create(course=self.other_course, title='Foreign', content='Body', order=1)
+		self.url = reverse('lesson-progress-batch')
+		self.client.force_authenticate(user=self.student)
+
+	def test_items_get_their_own_status(self):
+		finished = timezone.now() - timedelta(hours=2)
+		items = [
+			{'lesson': self.lessons[0].id, 'is_completed': True, 'completed_at': finished.isoformat()},
+			{'lesson': self.lessons[1].id, 'is_completed': True},
+			{'lesson': self.foreign.id, 'is_completed': True},
+			{'lesson': 999999, 'is_completed': True},
+			{'lesson': 'abc'},
+		]
+		resp = self.client.post(self.url, {'items': items}, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		statuses = [r['status'] for r in resp.data['results']]
+		self.assertEqual(statuses, ['applied', 'applied', 'not_enrolled', 'not_found', 'invalid'])
+		progress = LessonProgress.objects.get(student=self.student, lesson=self.lessons[0])
+		self.assertTrue(progress.is_completed)
+		self.assertEqual(progress.completed_at, finished)
+		self.assertFalse(LessonProgress.objects.filter(lesson=self.foreign).exists())
+
+	def test_existing_progress_is_updated_and_last_duplicate_wins(self):
+		LessonProgress.objects.create(student=self.student, lesson=self.lessons[0], is_completed=True, completed_at=timezone.now())
+		items = [
+			{'lesson': self.lessons[0].id, 'is_completed': True},
+			{'lesson': self.lessons[0].id, 'is_completed': False},
+		]
+		resp = self.client.post(self.url, {'items': items}, format='json')
+		self.assertEqual([r['status'] for r in resp.data['results']], ['superseded', 'applied'])
+		progress = LessonProgress.objects.get(student=self.student, lesson=self.lessons[0])
+		self.assertFalse(progress.is_completed)
+		self.assertIsNone(progress.completed_at)
+
+	def test_future_completion_times_are_clamped(self):
+		future = timezone.now() + timedelta(days=1)
+		self.client.post(self.url, {'items': [{'lesson': self.lessons[2].id, 'completed_at': future.isoformat()}]}, format='json')
+		self.assertLessEqual(LessonProgress.objects.get(lesson=self.lessons[2]).completed_at, timezone.now())
+
+	def test_batch_runs_a_fixed_number_of_queries(self):
+		more = [Lesson.objects.create(course=self.course, title=f'More {i}', content='Body', order=10 + i) for i in range(20)]
+		items = [{'lesson': lesson.id, 'is_completed': True} for lesson in self.lessons + more]
+		# Enrollment/lesson check, previous states, then upsert and summary update in a savepoint.
+		with self.assertNumQueries(6):
+			resp = self.client.post(self.url, {'items': items}, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertEqual(LessonProgress.objects.filter(student=self.student, is_completed=True).count(), 23)
+
+	def test_only_students_can_sync(self):
+		self.client.force_authenticate(user=self.teacher)
+		resp = self.client.post(self.url, {'items': [{'lesson': self.lessons[0].id}]}, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LessonConditionalGetTests(APITestCase):
+	"""Lesson detail is revalidated by an ETag that covers the lesson, its course and the caller's completion."""
+
+	def setUp(self):
+		self.teacher = User.objects.create_user(username='etagTeacher', password='Pass!12345', role='teacher', email='etagTeacher@example.com')
+		self.student = User.objects.create_user(username='etagStudent', password='Pass!12345', role='student', email='etagStudent@example.com')
+		self.course = Course.objects.create(title='ETag Course', description='Conditional GETs.', teacher=self.teacher)
+		Enrollment.objects.create(student=self.student, course=self.course)
+		self.lesson = Lesson.objects.create(course=self.course, title='ETag Lesson', content='Long content', order=1)
+		self.url = reverse('lesson-detail', kwargs={'pk': self.lesson.pk})
+		self.client.force_authenticate(user=self.student)
+
+	def test_unchanged_lesson_returns_304(self):
+		first = self.client.get(self.url)
+		self.assertEqual(first.status_code, status.HTTP_200_OK)
+		self.assertNotIn('Last-Modified', first)
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+		self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+		self.assertEqual(resp.content, b'')
+
+	def test_completing_the_lesson_changes_the_etag(self):
+		etag = self.client.get(self.url)['ETag']
+		LessonProgress.objects.create(student=self.student, lesson=self.lesson, is_completed=True, completed_at=timezone.now())
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertTrue(resp.data['is_completed'])
+
+	def test_adding_and_removing_a_quiz_changes_the_etag(self):
+		etag = self.client.get(self.url)['ETag']
+		quiz = Quiz.objects.create(lesson=self.lesson, title='New Quiz')
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.data['quiz_id'], quiz.id)
+
+		etag = resp['ETag']
+		quiz.delete()
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertIsNone(resp.data['quiz_id'])
+
+	def test_course_edit_changes_the_etag(self):
+		etag = self.client.get(self.url)['ETag']
+		self.course.title = 'Renamed Course'
+		self.course.save()
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.data['course']['title'], 'Renamed Course')
@@ -3,7 +3,7 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import LessonViewSet, lesson_detail_view, LessonProgressView
+from .views import LessonViewSet, lesson_detail_view, LessonProgressView, LessonProgressBatchView, CourseOutlineView
 
 # Set up a router for the LessonViewSet, which handles all lesson-related API endpoints.
 # This makes it easy to add, list, update, and delete lessons using RESTful routes.
@@ -20,5 +20,9 @@ urlpatterns = [
     # API endpoint for students to mark lessons as complete
     # Exposed at /api/lessons/progress/ to match the frontend client
     path("progress/", LessonProgressView.as_view(), name="lesson-progress"),
+    # Batched progress sync for clients that queue completions offline
+    path("progress/batch/", LessonProgressBatchView.as_view(), name="lesson-progress-batch"),
+    # Ordered lesson outline with completion flags and quiz ids for one course
+    path("courses/<int:course_id>/outline/", CourseOutlineView.as_view(), name="course-outline"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
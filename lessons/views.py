@@ -4,67 +4,151 @@
 from rest_framework import viewsets, permissions, generics, status
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from courses.models import Course
 from .models import Lesson, LessonProgress
-from .serializers import LessonSerializer, LessonProgressSerializer
+from .serializers import (
+    LessonSerializer, LessonReadSerializer, LessonOutlineSerializer, LessonProgressSerializer,
+    LessonProgressBatchSerializer, LessonProgressItemSerializer,
+)
+from .progress import apply_progress_batch
+from enrollments.progress import lock_progress, record_progress
+from accounts.authz import get_authorization
 from accounts.permissions import IsLessonTeacherOrAdmin, IsStudent
+from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import render, get_object_or_404
+from django.utils import timezone
+from lms_backend.conditional import make_etag, not_modified_response, set_etag
+from lms_backend.pagination import OptInKeysetPagination
 
 # This viewset handles all CRUD operations for lessons.
 # It enforces permissions so only the right users can access or modify lessons.
 
+class LessonPagination(OptInKeysetPagination):
+	"""
+	Lessons are returned as a plain list for teachers and students, as the frontend expects.
+	Admins see every lesson in the system, so their listing is always bounded with keyset pages.
+	Anyone can opt in to keyset pages with `?pagination=cursor`.
+	"""
+	def use_keyset(self, request, view=None):
+		return super().use_keyset(request, view) or getattr(request.user, "role", None) == "admin"
+
+	def paginate_queryset(self, queryset, request, view=None):
+		if not self.use_keyset(request, view):
+			self.keyset = None
+			return None
+		return super().paginate_queryset(queryset, request, view)
+
+
 class LessonViewSet(viewsets.ModelViewSet):
 	serializer_class = LessonSerializer
 	permission_classes = [permissions.IsAuthenticated, IsLessonTeacherOrAdmin]
-	pagination_class = None
+	pagination_class = LessonPagination
 
 	def get_queryset(self):
 		"""
 		Returns the set of lessons the current user is allowed to see.
-		- Admins see all lessons.
-		- Teachers see lessons for their own courses.
-		- Students see lessons for courses they're enrolled in.
-		- Anyone else gets nothing.
+		The role rules live in `LessonQuerySet.visible_to` so search and other
+		endpoints apply exactly the same visibility. The list can be narrowed to one course with `?course=<id>`.
 		"""
+		base = Lesson.objects.select_related("course", "course__teacher").with_quiz_id().order_by("order")
+		if self.action == "list" and self._course_filter() is not None:
+			base = base.filter(course_id=self._course_filter())
+		return base.visible_to(self.request.user, get_authorization(self.request))
+
+	def get_serializer_class(self):
+		# Lists only render, so they use the read-only variant of the same output.
+		if self.action == "list":
+			return LessonReadSerializer
+		return LessonSerializer
+
+	def get_serializer_context(self):
+		"""
+		For lists, load the student's completed lesson ids once so each lesson's
+		`is_completed` is a set lookup instead of one query per lesson.
+		"""
+		context = super().get_serializer_context()
 		user = self.request.user
-		print(f"DEBUG: User in LessonViewSet get_queryset: {user.username}, ID: {user.id}, Role: {getattr(user, 'role', 'N/A')}")
-
-		base = Lesson.objects.select_related("course", "course__teacher").order_by("order")
-		if getattr(user, "role", None) == "admin":
-			print("DEBUG: User is admin, returning all lessons.")
-			return base
-		if getattr(user, "role", None) == "teacher":
-			print(f"DEBUG: User is teacher, filtering by courses for teacher {user.username}.")
-			return base.filter(course__teacher=user)
-		if getattr(user, "role", None) == "student":
-			print(f"DEBUG: User is student, filtering by enrolled courses for student {user.username}.")
-			queryset = base.filter(course__enrollments__student=user).distinct()
-			print(f"DEBUG: Student queryset contains {queryset.count()} lessons.")
-			for lesson_item in queryset:
-				print(f"  - Lesson ID: {lesson_item.id}, Title: {lesson_item.title}, Course: {lesson_item.course.title}")
-			return queryset
-		print("DEBUG: User has no recognized role, returning empty queryset.")
-		return base.none()
+		if self.action == "list" and user.is_authenticated:
+			course_id = self._course_filter()
+			lesson_ids = Lesson.objects.filter(course_id=course_id).values("id") if course_id is not None else None
+			context["completed_lesson_ids"] = LessonProgress.objects.completed_lesson_ids(user, lesson_ids)
+		return context
+
+	def retrieve(self, request, *args, **kwargs):
+		"""
+		Answer conditional GETs before serializing. The lesson nests its course
+		(whose timestamp also moves on teacher edits) and the caller's completion
+		state, so all three go into the ETag.
+		"""
+		lesson = self.get_object()
+		completed = LessonProgress.objects.filter(lesson_id=lesson.id, student_id=request.user.pk, is_completed=True).exists()
+		etag = make_etag(lesson.updated_at, lesson.course.updated_at, state=completed)
+		not_modified = not_modified_response(request, etag)
+		if not_modified is not None:
+			return not_modified
+		context = {**self.get_serializer_context(), "completed_lesson_ids": {lesson.id} if completed else set()}
+		return set_etag(Response(self.get_serializer(lesson, context=context).data), etag)
+
+	def get_keyset_ordering(self):
+		# Lesson order is only unique within a course, so keyset pages use it as
+		# the key when one course is requested and fall back to the id otherwise.
+		return "order" if self._course_filter() is not None else "id"
+
+	def _course_filter(self):
+		course_id = self.request.query_params.get("course")
+		if course_id is None or not course_id.isdigit():
+			return None
+		return int(course_id)
 
 	def perform_create(self, serializer):
-		user = self.request.user
+		authz = get_authorization(self.request)
 		course = serializer.validated_data.get("course")
-		if not user.is_authenticated:
+		if not authz.is_authenticated:
 			raise PermissionDenied("Authentication required.")
 		# Only course owners or admins can add lessons; enforce here even though permissions are set on the viewset.
-		if getattr(user, "role", None) == "admin" or course.teacher == user:
+		if authz.can_manage_course(course.id):
 			serializer.save()
 		else:
 			raise PermissionDenied("Only the course teacher or admin can create lessons for this course.")
 
 	def perform_update(self, serializer):
-		user = self.request.user
-		course = serializer.instance.course
-		if getattr(user, "role", None) == "admin" or course.teacher == user:
+		if get_authorization(self.request).can_manage_course(serializer.instance.course_id):
 			serializer.save()
 		else:
 			raise PermissionDenied("Only the course teacher or admin can modify this lesson.")
 
+class CourseOutlineView(APIView):
+    """
+    Ordered lesson outline for one course with the student's completion status.
+
+    GET /api/lessons/courses/<course_id>/outline/
+    Uses a fixed number of queries however long the course is: the course,
+    the visible lessons (with quiz ids joined in) and the completed lesson ids.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, course_id):
+        course = get_object_or_404(Course.objects.only("id", "title"), pk=course_id)
+        lessons = list(
+            Lesson.objects.visible_to(request.user, get_authorization(request))
+            .filter(course_id=course.id)
+            .with_quiz_id()
+            .order_by("order")
+        )
+        completed_ids = LessonProgress.objects.completed_lesson_ids(request.user, [lesson.id for lesson in lessons])
+        serializer = LessonOutlineSerializer(
+            lessons, many=True, context={"request": request, "completed_lesson_ids": completed_ids}
+        )
+        return Response({
+            "course": {"id": course.id, "title": course.title},
+            "total_lessons": len(lessons),
+            "completed_lessons": len(completed_ids),
+            "lessons": serializer.data,
+        })
+
+
 class LessonProgressView(generics.CreateAPIView):
     """
     API view for students to mark a lesson as complete.
@@ -80,21 +164,63 @@ class LessonProgressView(generics.CreateAPIView):
         lesson = get_object_or_404(Lesson, id=lesson_id)
 
         # Check if the student is enrolled in the course this lesson belongs to
-        if not request.user.enrollments.filter(course=lesson.course).exists():
+        if not get_authorization(request).is_enrolled(lesson.course_id):
             return Response({"detail": "You are not enrolled in the course for this lesson."}, status=status.HTTP_403_FORBIDDEN)
 
-        progress, created = LessonProgress.objects.update_or_create(
-            student=request.user,
-            lesson=lesson,
-            defaults={'is_completed': True}
-        )
-        
+        now = timezone.now()
+        with transaction.atomic():
+            # Wait for any other progress write by this student in the course, so the row read below is current.
+            lock_progress(request.user.pk, [lesson.course_id])
+            progress, created = LessonProgress.objects.get_or_create(
+                student_id=request.user.pk,
+                lesson=lesson,
+                defaults={'is_completed': True, 'completed_at': now}
+            )
+            newly_completed = created or not progress.is_completed
+            if not created:
+                progress.is_completed = True
+                progress.completed_at = now
+                progress.save(update_fields=['is_completed', 'completed_at'])
+            # Keep the enrollment's progress summary in step with this write.
+            record_progress(request.user.pk, lesson.course_id, 1 if newly_completed else 0, lesson.id, now)
+
         serializer = self.get_serializer(progress)
         headers = self.get_success_headers(serializer.data)
         status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
         return Response(serializer.data, status=status_code, headers=headers)
 
 
+class LessonProgressBatchView(APIView):
+    """
+    API view for students to sync many lesson progress events in one request.
+
+    POST {"items": [{"lesson": 1, "is_completed": true, "completed_at": "..."}, ...]}
+    returns one result per item, in order, with a status of `applied`,
+    `superseded`, `not_found`, `not_enrolled` or `invalid` (with `errors`).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsStudent]
+
+    def post(self, request):
+        batch = LessonProgressBatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+
+        results = []
+        valid = []
+        for raw in batch.validated_data["items"]:
+            item = LessonProgressItemSerializer(data=raw)
+            if item.is_valid():
+                result = {"lesson": item.validated_data["lesson"]}
+                valid.append((result, item.validated_data))
+            else:
+                result = {"lesson": raw.get("lesson"), "status": "invalid", "errors": item.errors}
+            results.append(result)
+
+        statuses = apply_progress_batch(request.user, [data for _, data in valid])
+        for (result, _), item_status in zip(valid, statuses):
+            result["status"] = item_status
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 def lesson_detail_view(request, course_id, lesson_id):
 	# Debug: Print lesson_id and course_id to verify correct values
 	print(f"Requested lesson_id: {lesson_id}, course_id: {course_id}")
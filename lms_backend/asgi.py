@@ -2,6 +2,12 @@
 ASGI config for lms_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with uvicorn, e.g.::
+
+    uvicorn lms_backend.asgi:application --host 0.0.0.0 --port $PORT --workers 4
+
+The hot read endpoints are async views (see `lms_backend/async_views.py`), so
+one process can hold many slow clients while they wait.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +18,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lms_backend.settings')
+# Under ASGI each request's synchronous database work runs in its own thread, so
+# persistent connections would pile up one per thread; open them per request instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,103 @@
+"""`AsyncAPIView`: DRF views whose read handlers are coroutines.
+
+Under ASGI (`lms_backend/asgi.py`, served by uvicorn) a handler written as
+`async def get(...)` runs on the event loop, so a request waiting on the cache
+or on an async ORM call (`aget`, `afirst`, `async for`) does not hold a worker
+thread. Under WSGI Django still runs the coroutine, one event loop per request.
+
+`dispatch` mirrors `APIView.dispatch` with the blocking steps moved off the
+loop:
+
+- authentication uses an authenticator's `aauthenticate` when it has one
+  (`ClaimsJWTAuthentication` only decodes the token) and a thread otherwise;
+- throttles, which update the shared counter store, run in a thread;
+- permission checks run inline, so they must not query the database. The
+  claim-based checks in `accounts.permissions` don't.
+
+`alist` is `ListModelMixin.list` on the async ORM: the page is counted and
+loaded with `acount` and `async for`, and serialized on the loop, so list
+serializers must only read relations the queryset already joins.
+
+Handlers that are still plain methods (the write methods a generic view
+inherits, and OPTIONS) are served by the normal synchronous `dispatch` in a
+thread, so a view can make only its hot read path async.
+"""
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.functional import classproperty
+from rest_framework import exceptions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+
+    @classproperty
+    def view_is_async(cls):
+        # Mixed sync and async handlers are allowed; see `dispatch`.
+        return True
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if handler is None or not iscoroutinefunction(handler):
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """`APIView.initial` for async handlers."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        await sync_to_async(self.check_throttles, thread_sensitive=False)(request)
+
+    async def aperform_authentication(self, request):
+        """Resolve `request.user` and `request.auth` the way `Request._authenticate` does, without blocking."""
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def alist(self, request, *args, **kwargs):
+        """`ListModelMixin.list` for async handlers."""
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        if paginator is not None:
+            if hasattr(paginator, 'apaginate_queryset'):
+                page = await paginator.apaginate_queryset(queryset, request, view=self)
+            else:
+                page = await sync_to_async(paginator.paginate_queryset)(queryset, request, view=self)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
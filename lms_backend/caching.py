@@ -0,0 +1,90 @@
+"""Small caching helpers shared by the read models.
+
+Cached data is stored under a *version* number instead of being deleted on
+writes: bumping the version makes every entry built from the old data
+unreachable at once, even entries held by other workers, and the stale ones
+simply expire. `LRUCache` is a bounded per-process layer in front of the
+shared Django cache for values that are read on every request.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    """
+    Return the version stored under `key`, creating it on first use.
+
+    The starting value is time-based so a version that was evicted from the
+    cache never restarts at a number older entries were stored under.
+    """
+    version = cache.get(key)
+    if version is None:
+        # add() is a no-op if another worker created the key first, so re-read it.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+async def aget_version(key):
+    """`get_version` for async views."""
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key, time.time_ns())
+    return version
+
+
+def bump_version(key):
+    """Move `key` to a new version, invalidating everything cached under the old one."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version key was missing (first run or evicted); start a fresh one.
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded in-process cache with least-recently-used eviction.
+
+    Pass `ttl` (seconds) for values that must not outlive a short window
+    because other processes cannot invalidate them.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            expires, value = self._data[key]
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
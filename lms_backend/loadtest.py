@@ -0,0 +1,444 @@
+"""HTTP load test with mixed user scenarios, for the `loadtest` management command.
+
+Every virtual user logs in first. Then worker threads act as those students
+and teachers and keep running weighted scenarios until the time is up. Each
+worker uses one keep-alive connection.
+- `catalog`: page through the catalog, open a course, search.
+- `lessons`: list my enrollments, open a course outline and a lesson, mark it complete.
+- `quiz`: open a quiz from a course outline, submit answers, view the result.
+- `roster`: a teacher lists their courses, opens a roster and the course analytics.
+
+Every request is timed. The report has p50/p95/p99 latency, throughput and
+error rates overall, per step and per scenario, and `compare()` checks a
+report against a stored baseline. Accounts come from `generate_load_data`.
+Without a `--url` the command serves the app from a thread in its own
+process, over WSGI or (with uvicorn installed) ASGI. That is handy for smoke
+runs, but the server then shares the CPU with the workers, so measure
+against a separate server for real numbers. `think_time` makes each virtual
+user pause between scenarios while keeping its connection open, like a
+person reading a page; that is where an ASGI server, which doesn't tie a
+thread to an idle connection, pulls ahead of a threaded WSGI one.
+"""
+
+import http.client
+import json
+import math
+import random
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+
+from accounts.models import User
+from courses.load_data import WORDS
+from courses.models import Course
+from quizzes.analytics import percentile
+
+SCENARIOS = ('catalog', 'lessons', 'quiz', 'roster')
+DEFAULT_MIX = {'catalog': 50, 'lessons': 30, 'quiz': 10, 'roster': 10}
+
+# Latency percentiles compared against a baseline, and the fewest requests a step
+# needs in both runs before its percentiles are compared at all.
+COMPARED_PERCENTILES = ('p50', 'p95', 'p99')
+MIN_COMPARED_REQUESTS = 20
+
+
+class ScenarioError(Exception):
+    """A step failed, so the rest of the scenario can't run."""
+
+
+class Sample:
+    __slots__ = ('scenario', 'step', 'status', 'seconds')
+
+    def __init__(self, scenario, step, status, seconds):
+        self.scenario = scenario
+        self.step = step
+        self.status = status
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 400
+
+
+class Client:
+    """One worker's keep-alive connection; records a `Sample` per request."""
+
+    def __init__(self, base_url, samples, timeout=30):
+        parts = urlsplit(base_url)
+        self.secure = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.samples = samples
+        self.scenario = None
+        self.connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        self.connection = connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, step, method, path, token=None, data=None, record=True):
+        """Send one request and return its parsed JSON body; raise ScenarioError on failure."""
+        headers = {'Accept': 'application/json'}
+        body = None
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+        if self.connection is None:
+            self._connect()
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Status 0 is a connection error; reconnect for the next request.
+            self.connection.close()
+            self.connection = None
+            content, status = b'', 0
+        elapsed = time.perf_counter() - start
+        if record:
+            self.samples.append(Sample(self.scenario, step, status, elapsed))
+        if not 200 <= status < 300:
+            raise ScenarioError(f'{method} {path} returned {status}')
+        return json.loads(content) if content else None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+def _results(body):
+    """List endpoints return a page object unless they are plain lists."""
+    return body.get('results', []) if isinstance(body, dict) else (body or [])
+
+
+class Actor:
+    def __init__(self, username, role):
+        self.username = username
+        self.role = role
+        self.token = None
+
+
+class LoadTest:
+    def __init__(self, base_url, students, teachers, course_ids, password, mix=None,
+                 workers=8, duration=30, warmup=0, seed=0, think_time=0):
+        self.base_url = base_url
+        self.students = [Actor(username, 'student') for username in students]
+        self.teachers = [Actor(username, 'teacher') for username in teachers]
+        self.course_ids = list(course_ids)
+        self.password = password
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.workers = workers
+        self.duration = duration
+        self.warmup = warmup
+        self.seed = seed
+        self.think_time = think_time
+        self.catalog_pages = max(1, math.ceil(len(self.course_ids) / settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)))
+
+    @classmethod
+    def from_database(cls, base_url, prefix='load', users=50, **options):
+        """Pick virtual users and courses from the accounts `generate_load_data` created."""
+        students = list(
+            User.objects.filter(username__startswith=f'{prefix}_student_', enrollments__isnull=False)
+            .distinct().order_by('id').values_list('username', flat=True)[:users]
+        )
+        teachers = list(
+            User.objects.filter(username__startswith=f'{prefix}_teacher_', course__isnull=False)
+            .distinct().order_by('id').values_list('username', flat=True)[:max(1, users // 10)]
+        )
+        course_ids = Course.objects.order_by('id').values_list('id', flat=True)
+        return cls(base_url, students, teachers, course_ids, **options)
+
+    # Scenarios. Each runs a user's steps in order and stops at the first failure.
+
+    def catalog(self, client, actor, rng):
+        page = rng.randint(1, min(self.catalog_pages, 20))
+        courses = _results(client.request('catalog.list', 'GET', f'/api/courses/?page={page}', actor.token))
+        course_id = rng.choice(courses)['id'] if courses else rng.choice(self.course_ids)
+        client.request('catalog.detail', 'GET', f'/api/courses/{course_id}/', actor.token)
+        client.request('catalog.search', 'GET', f'/api/search/?q={rng.choice(WORDS)}', actor.token)
+
+    def _outline(self, client, actor, rng, scenario):
+        enrollments = _results(client.request(f'{scenario}.my_enrollments', 'GET', '/api/enrollments/my-enrollments/', actor.token))
+        if not enrollments:
+            raise ScenarioError(f'{actor.username} has no enrollments')
+        course_id = rng.choice(enrollments)['course']['id']
+        return client.request(f'{scenario}.outline', 'GET', f'/api/lessons/courses/{course_id}/outline/', actor.token)['lessons']
+
+    def lessons(self, client, actor, rng):
+        lessons = self._outline(client, actor, rng, 'lessons')
+        if not lessons:
+            return
+        # Students mostly open the first lesson they haven't finished.
+        lesson = next((lesson for lesson in lessons if not lesson['is_completed']), rng.choice(lessons))
+        client.request('lessons.detail', 'GET', f"/api/lessons/{lesson['id']}/", actor.token)
+        client.request('lessons.complete', 'POST', '/api/lessons/progress/', actor.token, {'lesson': lesson['id']})
+
+    def quiz(self, client, actor, rng):
+        with_quiz = [lesson for lesson in self._outline(client, actor, rng, 'quiz') if lesson.get('quiz_id')]
+        if not with_quiz:
+            return
+        lesson = rng.choice(with_quiz)
+        quiz = client.request('quiz.detail', 'GET', f"/api/quizzes/{lesson['id']}/", actor.token)
+        answers = [
+            {'question': question['id'], 'selected_choice': rng.choice(question['choices'])['id']}
+            for question in quiz['questions'] if question['choices']
+        ]
+        attempt = client.request('quiz.submit', 'POST', '/api/quizzes/attempt/', actor.token, {'quiz': quiz['id'], 'answers': answers})
+        client.request('quiz.result', 'GET', f"/api/quizzes/result/{attempt['id']}/", actor.token)
+
+    def roster(self, client, actor, rng):
+        courses = _results(client.request('roster.my_courses', 'GET', '/api/courses/my/', actor.token))
+        if not courses:
+            return
+        course_id = rng.choice(courses)['id']
+        client.request('roster.list', 'GET', f'/api/enrollments/courses/{course_id}/roster/', actor.token)
+        client.request('roster.analytics', 'GET', f'/api/quizzes/analytics/course/{course_id}/', actor.token)
+
+    def _login(self, actors):
+        """Log every actor in up front: password checks are slow by design and would swamp the measurements."""
+        client = Client(self.base_url, [])
+        try:
+            for actor in actors:
+                data = {'username': actor.username, 'password': self.password}
+                try:
+                    actor.token = client.request('login', 'POST', '/api/accounts/login/', data=data, record=False)['access']
+                except ScenarioError:
+                    # run() reports actors left without a token.
+                    return
+        finally:
+            client.close()
+
+    def _worker(self, index, samples, runs, failed, start_at, stop_at):
+        rng = random.Random(self.seed * 1000 + index)
+        client = Client(self.base_url, samples)
+        scenarios = [name for name in SCENARIOS if self.mix.get(name)]
+        weights = [self.mix[name] for name in scenarios]
+        try:
+            while time.monotonic() < stop_at:
+                scenario = rng.choices(scenarios, weights=weights)[0]
+                actors = self.teachers if scenario == 'roster' else self.students
+                if not actors:
+                    continue
+                actor = rng.choice(actors)
+                client.scenario = scenario
+                measured = time.monotonic() >= start_at
+                before = len(samples)
+                try:
+                    getattr(self, scenario)(client, actor, rng)
+                except ScenarioError:
+                    if measured:
+                        failed[scenario] += 1
+                if measured:
+                    runs[scenario] += 1
+                else:
+                    # Requests made while warming up are not measured.
+                    del samples[before:]
+                if self.think_time:
+                    time.sleep(min(rng.uniform(0, 2 * self.think_time), max(0.0, stop_at - time.monotonic())))
+        finally:
+            client.close()
+
+    def run(self):
+        """Run the workers for `warmup + duration` seconds and return the report dict."""
+        if not self.students:
+            raise ValueError('No generated students with enrollments were found; run generate_load_data first.')
+        actors = self.students + self.teachers
+        login_threads = [
+            threading.Thread(target=self._login, args=(actors[index::self.workers],)) for index in range(self.workers)
+        ]
+        for thread in login_threads:
+            thread.start()
+        for thread in login_threads:
+            thread.join()
+        if any(actor.token is None for actor in actors):
+            raise ValueError('Could not log in as every generated user; check --password and the server URL.')
+
+        per_worker = [([], Counter(), Counter()) for _ in range(self.workers)]
+        start_at = time.monotonic() + self.warmup
+        stop_at = start_at + self.duration
+        threads = [
+            threading.Thread(target=self._worker, args=(index, *per_worker[index], start_at, stop_at))
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = max(time.monotonic() - start_at, 1e-9)
+        samples = [sample for worker_samples, _, _ in per_worker for sample in worker_samples]
+        runs = sum((worker_runs for _, worker_runs, _ in per_worker), Counter())
+        failed = sum((worker_failed for _, _, worker_failed in per_worker), Counter())
+        report = build_report(samples, elapsed, runs, failed)
+        report['config'] = {
+            'url': self.base_url, 'workers': self.workers, 'duration': self.duration, 'warmup': self.warmup,
+            'mix': self.mix, 'students': len(self.students), 'teachers': len(self.teachers), 'seed': self.seed,
+            'think_time': self.think_time,
+        }
+        return report
+
+
+def _latency(seconds):
+    ordered = sorted(seconds)
+    if not ordered:
+        return {'mean': None, 'max': None, **{name: None for name in COMPARED_PERCENTILES}}
+    return {
+        'mean': round(1000 * sum(ordered) / len(ordered), 2),
+        'max': round(1000 * ordered[-1], 2),
+        **{name: round(1000 * percentile(ordered, int(name[1:])), 2) for name in COMPARED_PERCENTILES},
+    }
+
+
+def _summary(samples, elapsed):
+    errors = sum(1 for sample in samples if not sample.ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throttled': sum(1 for sample in samples if sample.status == 429),
+        'throughput_rps': round(len(samples) / elapsed, 2),
+        'latency_ms': _latency([sample.seconds for sample in samples]),
+    }
+
+
+def build_report(samples, elapsed, runs=None, failed=None):
+    """Aggregate request samples, and scenario run/failure counts, into the JSON report."""
+    by_step, by_scenario = defaultdict(list), defaultdict(list)
+    for sample in samples:
+        by_step[sample.step].append(sample)
+        by_scenario[sample.scenario].append(sample)
+    scenarios = {}
+    for name, scenario_samples in sorted(by_scenario.items()):
+        scenarios[name] = _summary(scenario_samples, elapsed)
+        scenarios[name]['runs'] = (runs or {}).get(name, 0)
+        scenarios[name]['failed_runs'] = (failed or {}).get(name, 0)
+    return {
+        'elapsed_s': round(elapsed, 2),
+        **_summary(samples, elapsed),
+        'status_codes': {str(code): count for code, count in sorted(Counter(sample.status for sample in samples).items())},
+        'steps': {name: _summary(step_samples, elapsed) for name, step_samples in sorted(by_step.items())},
+        'scenarios': scenarios,
+    }
+
+
+def _change(baseline, current):
+    if baseline in (None, 0) or current is None:
+        return None
+    return round(100 * (current - baseline) / baseline, 1)
+
+
+def compare(report, baseline, tolerance=10.0):
+    """
+    Compare a report with a baseline report.
+
+    Latency percentiles that grew by more than `tolerance` percent,
+    throughput that fell by more than `tolerance` percent and error rates
+    that rose by more than a percentage point are listed as regressions.
+    Steps missing from either report, or with too few requests for stable
+    percentiles, are skipped.
+    """
+    regressions = []
+
+    def check(name, current, previous):
+        result = {}
+        for key in COMPARED_PERCENTILES:
+            now, before = current['latency_ms'][key], previous['latency_ms'][key]
+            change = _change(before, now)
+            result[f'{key}_ms'] = {'baseline': before, 'current': now, 'change_pct': change}
+            if change is not None and change > tolerance:
+                regressions.append(f'{name}: {key} {before}ms -> {now}ms (+{change}%)')
+        change = _change(previous['throughput_rps'], current['throughput_rps'])
+        result['throughput_rps'] = {'baseline': previous['throughput_rps'], 'current': current['throughput_rps'], 'change_pct': change}
+        if change is not None and change < -tolerance:
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps ({change}%)")
+        result['error_rate'] = {'baseline': previous['error_rate'], 'current': current['error_rate']}
+        if current['error_rate'] - previous['error_rate'] > 0.01:
+            regressions.append(f"{name}: error rate {previous['error_rate']:.2%} -> {current['error_rate']:.2%}")
+        return result
+
+    comparison = {'tolerance_pct': tolerance, 'overall': check('overall', report, baseline), 'steps': {}}
+    for step, current in report['steps'].items():
+        previous = baseline.get('steps', {}).get(step)
+        if previous and min(previous['requests'], current['requests']) >= MIN_COMPARED_REQUESTS:
+            comparison['steps'][step] = check(step, current, previous)
+    comparison['regressions'] = regressions
+    return comparison
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler without access logs or Nagle delays, for load-test servers."""
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; without this, Nagle's algorithm and
+        # delayed ACKs add ~40ms to every response on a keep-alive connection.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class InProcessServer:
+    """Serve the project's WSGI app on a free local port from a background thread."""
+
+    def __init__(self, host='127.0.0.1'):
+        self.server = ThreadedWSGIServer((host, 0), QuietRequestHandler, allow_reuse_address=False)
+        self.server.set_app(get_wsgi_application())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class InProcessASGIServer:
+    """Serve the project's ASGI app with uvicorn on a free local port from a background thread."""
+
+    def __init__(self, host='127.0.0.1'):
+        try:
+            import uvicorn
+        except ImportError as exc:
+            raise ValueError('Serving the ASGI app in-process needs uvicorn; pip install uvicorn.') from exc
+        self.socket = socket.create_server((host, 0))
+        config = uvicorn.Config(get_asgi_application(), log_level='warning', access_log=False, lifespan='off')
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, kwargs={'sockets': [self.socket]}, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.socket.getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise ValueError('uvicorn did not start.')
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
+        self.socket.close()
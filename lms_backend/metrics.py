@@ -0,0 +1,262 @@
+"""Per-endpoint request, database and serializer metrics.
+
+`MetricsMiddleware` records, for each resolved URL name, the request count,
+a latency histogram, how many DB queries each request ran, the time spent in
+the database and the time spent in DRF serializers that opt in with
+`TimedSerializerMixin`. `MetricsView` exposes the
+numbers at `/api/metrics/` in the Prometheus text format for admins.
+
+Recording is a handful of dict updates under a lock per request, so it is
+safe to leave on in production. The middleware runs natively under ASGI too;
+there the queries of async views run in worker threads, so they are timed by
+a wrapper added to every new connection instead of per request. Numbers are per process: with several
+workers, scrape each one or put a shared exporter in front.
+"""
+
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdmin
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+UNMATCHED = 'unmatched'
+
+
+class Histogram:
+    """Fixed-bucket histogram; `counts[i]` holds observations <= `buckets[i]`."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+
+class EndpointStats:
+    def __init__(self):
+        self.responses = {}  # (method, status) -> count
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Thread-safe, in-process store of endpoint statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, method, status, seconds, queries, db_seconds, serializer_seconds):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            key = (method, status)
+            stats.responses[key] = stats.responses.get(key, 0) + 1
+            stats.latency.observe(seconds)
+            stats.queries.observe(queries)
+            stats.db_seconds += db_seconds
+            stats.serializer_seconds += serializer_seconds
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+            _header(lines, 'lms_http_requests_total', 'counter', 'Responses by endpoint, method and status.')
+            for name, stats in endpoints:
+                for (method, status), count in sorted(stats.responses.items()):
+                    lines.append(f'lms_http_requests_total{{endpoint="{name}",method="{method}",status="{status}"}} {count}')
+            _header(lines, 'lms_http_request_duration_seconds', 'histogram', 'Request latency in seconds.')
+            for name, stats in endpoints:
+                _histogram(lines, 'lms_http_request_duration_seconds', name, stats.latency)
+            _header(lines, 'lms_db_queries_per_request', 'histogram', 'Database queries run per request.')
+            for name, stats in endpoints:
+                _histogram(lines, 'lms_db_queries_per_request', name, stats.queries)
+            _header(lines, 'lms_db_query_seconds_total', 'counter', 'Time spent executing database queries.')
+            for name, stats in endpoints:
+                lines.append(f'lms_db_query_seconds_total{{endpoint="{name}"}} {stats.db_seconds:.6f}')
+            _header(lines, 'lms_serializer_seconds_total', 'counter', 'Time spent building serializer output.')
+            for name, stats in endpoints:
+                lines.append(f'lms_serializer_seconds_total{{endpoint="{name}"}} {stats.serializer_seconds:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+def _header(lines, name, kind, help_text):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def _histogram(lines, metric, endpoint, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.total}')
+    lines.append(f'{metric}_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+    lines.append(f'{metric}_count{{endpoint="{endpoint}"}} {histogram.total}')
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    """Counters for the request currently being handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        # Set while a query is being timed, so a connection with two wrappers counts it once.
+        self.in_query = False
+
+
+_current = ContextVar('lms_request_stats', default=None)
+
+
+def _timed_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None or stats.in_query:
+        return execute(sql, params, many, context)
+    stats.in_query = True
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.in_query = False
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def _add_query_timer(sender, connection, **kwargs):
+    if _timed_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_query)
+
+
+class TimedSerializerMixin:
+    """
+    Count the time spent in this serializer's `.data` toward the request's
+    serializer time. List it before the DRF base class.
+
+    `.data` is where DRF runs `to_representation` for the whole tree, so timing
+    the outermost access covers nested serializers without counting them twice.
+    With `many=True` the list serializer DRF builds is timed the same way.
+    """
+
+    @property
+    def data(self):
+        stats = _current.get()
+        if stats is None:
+            return super().data
+        stats.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            stats.serializer_depth -= 1
+            if stats.serializer_depth == 0:
+                stats.serializer_seconds += time.perf_counter() - start
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_serializer = super().many_init(*args, **kwargs)
+        # DRF picks the list class from `Meta`; swap in the timed variant of the default one.
+        if type(list_serializer) is serializers.ListSerializer:
+            list_serializer.__class__ = TimedListSerializer
+        return list_serializer
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class MetricsMiddleware:
+    """Record metrics for every request; disable with `METRICS_ENABLED = False`."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            connection_created.connect(_add_query_timer, dispatch_uid='lms_metrics_query_timer')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_timed_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def _record(self, request, response, stats, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.url_name or match.view_name) if match else UNMATCHED
+        registry.record(
+            endpoint or UNMATCHED,
+            request.method,
+            response.status_code,
+            elapsed,
+            stats.queries,
+            stats.db_seconds,
+            stats.serializer_seconds,
+        )
+
+
+class MetricsView(APIView):
+    """
+    Admin-only Prometheus scrape endpoint: GET /api/metrics/
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,102 @@
+"""Shared pagination classes for the API.
+
+Page-number pagination stays the default so existing clients keep working,
+but every list can switch to keyset (cursor) pagination with
+`?pagination=cursor`. Keyset pages seek straight to the last seen key instead
+of running `COUNT(*)` plus an `OFFSET` scan, so page 500 costs the same as
+page one and cursors stay stable while rows are being added.
+
+`OptInKeysetPagination.apaginate_queryset` is the same for async views: page
+numbers are counted and loaded with the async ORM. DRF's cursor logic loads
+its page with the sync ORM, so keyset pages are still built in a thread.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+CURSOR_MODE = 'cursor'
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on a unique, unchanging column (`id` by default).
+
+    Views can choose the key with a `keyset_ordering` attribute or a
+    `get_keyset_ordering()` method, e.g. lesson `order` within one course.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, 'get_keyset_ordering'):
+            ordering = view.get_keyset_ordering()
+        else:
+            ordering = getattr(view, 'keyset_ordering', self.ordering)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+
+class OptInKeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination unless the client asks for keyset pagination.
+
+    Keyset mode is enabled by `?pagination=cursor`, or implicitly when a
+    `cursor` from a previous keyset page is sent back.
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request, view=None):
+        params = request.query_params
+        return params.get(self.mode_query_param) == CURSOR_MODE or self.keyset_class.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` for async views."""
+        if self.use_keyset(request, view):
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+        self.keyset = None
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # `count` is a cached property; fill it so the paginator never counts synchronously.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        # The page's object list is still a lazy slice of the queryset.
+        self.page.object_list = [obj async for obj in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return self.keyset.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
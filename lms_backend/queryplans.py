@@ -0,0 +1,41 @@
+"""Query plans for querysets, used by the index regression tests.
+
+`full_scans(queryset)` runs EXPLAIN (`EXPLAIN QUERY PLAN` on SQLite) and
+returns the tables the database would read from start to end instead of
+seeking into an index; on SQLite that includes walking a whole index.
+
+On PostgreSQL sequential scans are disabled for the EXPLAIN, because the
+planner prefers them on the small tables a test creates even when a usable
+index exists. A `Seq Scan` that survives means there is no index.
+"""
+
+import re
+
+from django.db import connections, transaction
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (\w+)')
+_POSTGRES_SCAN = re.compile(r'\bSeq Scan on (\w+)')
+
+
+def explain(queryset):
+    """Return the plan for `queryset` as a list of lines."""
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+    else:
+        plan = queryset.explain()
+    return plan.splitlines()
+
+
+def full_scans(queryset):
+    """Return the names of the tables `queryset` reads without an index."""
+    pattern = _POSTGRES_SCAN if connections[queryset.db].vendor == 'postgresql' else _SQLITE_SCAN
+    tables = []
+    for line in explain(queryset):
+        match = pattern.search(line)
+        # SQLite reports `SCAN CONSTANT ROW` for queries that read no table.
+        if match and match.group(1) != 'CONSTANT':
+            tables.append(match.group(1))
+    return tables
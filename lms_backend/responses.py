@@ -0,0 +1,50 @@
+"""Response helpers for serving payloads that were rendered ahead of time."""
+
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+def render_json(data):
+    """Render data to bytes exactly as the API's JSONRenderer would."""
+    return JSONRenderer().render(data)
+
+
+class PrerenderedJSONResponse(Response):
+    """
+    A DRF response whose JSON body is already rendered (usually cached bytes).
+
+    When the client negotiates plain JSON the bytes are sent as they are, so
+    neither the serializer nor the JSON encoder runs. Other renderers, such as
+    the browsable API, fall back to normal rendering from the decoded data.
+    """
+
+    def __init__(self, content, **kwargs):
+        self.prerendered = content
+        super().__init__(data=None, **kwargs)
+
+    @property
+    def data(self):
+        # Only decoded when something actually needs the Python structure.
+        if self._data is None:
+            self._data = json.loads(self.prerendered)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        media_type = getattr(self, 'accepted_media_type', '') or ''
+        if isinstance(renderer, JSONRenderer) and 'indent' not in media_type:
+            content_type = self.content_type
+            if content_type is None:
+                content_type = renderer.media_type
+                if renderer.charset:
+                    content_type = f'{content_type}; charset={renderer.charset}'
+            self['Content-Type'] = content_type
+            return self.prerendered
+        return super().rendered_content
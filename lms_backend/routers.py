@@ -0,0 +1,148 @@
+"""Send reads from GET endpoints to the read replica, everything else to the primary.
+
+`ReplicaRoutingMiddleware` marks a request as replica-safe when its method is
+GET/HEAD/OPTIONS and the caller has not written anything in the last
+`REPLICA_PIN_SECONDS`. `PrimaryReplicaRouter` then sends that request's reads
+to the `replica` alias. Reads go to the primary instead when:
+
+- the request is not a safe method, or ran outside a request (commands, shell);
+- the caller wrote recently (read-your-writes: replicas lag behind the primary,
+  so someone who just enrolled or submitted a quiz must not read stale rows);
+- the request has already written, or the primary is inside a transaction.
+
+Callers are identified by the user id in their access token, falling back to
+the client address for anonymous requests. Behind a proxy every request comes
+from the proxy's address, so the client address is read the way DRF's
+throttles read it: from `X-Forwarded-For`, trusting the last `NUM_PROXIES`
+hops (see `REST_FRAMEWORK` in settings). When no `replica` database is
+configured the middleware removes itself and the router always answers
+`default`. Under ASGI the routing state is a context variable, which the
+worker threads running async views' queries inherit.
+"""
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+REPLICA_DB_ALIAS = 'replica'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = ContextVar('lms_db_routing', default=None)
+
+# Only used for `get_ident`, the proxy-aware client address the anonymous throttle uses too.
+_client_address = BaseThrottle()
+
+
+class RoutingState:
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def _pin_key(identity):
+    return f'db:pin:{identity}'
+
+
+def _pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def request_identity(request):
+    """`user:<id>` from a valid access token, otherwise `addr:<client address>`."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is not None:
+        try:
+            return f'user:{AccessToken(raw_token)[jwt_settings.USER_ID_CLAIM]}'
+        except (TokenError, KeyError):
+            pass
+    return f'addr:{_client_address.get_ident(request)}'
+
+
+def pin_to_primary(identity):
+    """Send this caller's reads to the primary until the replica has caught up."""
+    cache.set(_pin_key(identity), 1, timeout=_pin_seconds())
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        identity = request_identity(request)
+        use_replica = request.method in SAFE_METHODS and not cache.get(_pin_key(identity))
+        state = RoutingState(use_replica)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            pin_to_primary(identity)
+        return response
+
+    async def __acall__(self, request):
+        identity = request_identity(request)
+        use_replica = request.method in SAFE_METHODS and not await cache.aget(_pin_key(identity))
+        state = RoutingState(use_replica)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            await cache.aset(_pin_key(identity), 1, timeout=_pin_seconds())
+        return response
+
+
+class PrimaryReplicaRouter:
+    """Database router for a primary `default` database and a read-only `replica`."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary and is never migrated directly.
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,200 @@
+"""Serializer throughput micro-benchmarks.
+
+Each benchmark serializes `count` in-memory instances (unsaved models with
+their related objects and prefetches filled in by hand) with a full
+serializer and with its read-only variant, and reports objects per second
+(best of `repeat` runs) and the memory allocated while rendering, measured
+with `tracemalloc`. Database access is blocked for the whole run, so a
+serializer that queries per object fails instead of timing the database.
+
+Run it with `python manage.py benchmark_serializers`.
+"""
+
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connections
+
+from accounts.models import User
+from accounts.serializers import UserReadSerializer, UserSerializer
+from courses.models import Course
+from courses.serializers import CourseReadSerializer, CourseSerializer
+from enrollments.models import Enrollment, EnrollmentProgress
+from enrollments.serializers import (
+    CourseRosterReadSerializer, CourseRosterSerializer, StudentEnrollmentReadSerializer, StudentEnrollmentSerializer,
+)
+from lessons.models import Lesson
+from lessons.serializers import LessonReadSerializer, LessonSerializer
+from quizzes.models import Choice, Question, Quiz
+from quizzes.serializers import QuizReadSerializer, QuizSerializer
+
+CREATED_AT = datetime(2025, 1, 6, 9, 30, tzinfo=dt_timezone.utc)
+
+CONTENT = 'Read the chapter, work through the examples and note anything that is unclear. ' * 6
+
+QUESTIONS_PER_QUIZ = 5
+CHOICES_PER_QUESTION = 4
+
+
+class DatabaseAccessBlocked(RuntimeError):
+    pass
+
+
+def _block(execute, sql, params, many, context):
+    raise DatabaseAccessBlocked(f'Serializer benchmarks must not query the database: {sql}')
+
+
+@contextmanager
+def database_blocked():
+    """Make every configured database raise on any query inside the block."""
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(_block))
+        yield
+
+
+def _prefetch(instance, name, objects):
+    """Fill `instance.<name>.all()` with `objects` the way `prefetch_related` does, without a query."""
+    queryset = type(objects[0])._default_manager.all()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    instance.__dict__.setdefault('_prefetched_objects_cache', {})[name] = queryset
+
+
+def build_users(count, role='student'):
+    users = [
+        User(id=i, username=f'{role}{i}', email=f'{role}{i}@example.com', role=role)
+        for i in range(1, count + 1)
+    ]
+    return users, {}
+
+
+def build_courses(count):
+    teachers, _ = build_users(max(1, count // 10), role='teacher')
+    courses = [
+        Course(
+            id=i, title=f'Course {i}', description='An introduction with worked examples. ' * 4,
+            created_at=CREATED_AT, teacher=teachers[i % len(teachers)],
+        )
+        for i in range(1, count + 1)
+    ]
+    return courses, {}
+
+
+def build_lessons(count):
+    courses, _ = build_courses(max(1, count // 20))
+    lessons = []
+    for i in range(1, count + 1):
+        lesson = Lesson(id=i, course=courses[i % len(courses)], title=f'Lesson {i}', content=CONTENT, order=i)
+        # What `with_quiz_id()` annotates: every other lesson has a quiz.
+        lesson.quiz_pk = i if i % 2 else None
+        lessons.append(lesson)
+    # The list view preloads the student's completed lesson ids.
+    return lessons, {'completed_lesson_ids': {lesson.id for lesson in lessons[::3]}}
+
+
+def build_quizzes(count):
+    quizzes = []
+    for i in range(1, count + 1):
+        quiz = Quiz(id=i, lesson_id=i, title=f'Quiz {i}')
+        questions = []
+        for q in range(QUESTIONS_PER_QUIZ):
+            question = Question(id=i * QUESTIONS_PER_QUIZ + q, quiz=quiz, text=f'Question {q} of quiz {i}?')
+            _prefetch(question, 'choices', [
+                Choice(id=question.id * CHOICES_PER_QUESTION + c, question=question, text=f'Answer {c}', is_correct=c == 0)
+                for c in range(CHOICES_PER_QUESTION)
+            ])
+            questions.append(question)
+        _prefetch(quiz, 'questions', questions)
+        quizzes.append(quiz)
+    return quizzes, {}
+
+
+def build_enrollments(count):
+    students, _ = build_users(count)
+    courses, _ = build_courses(max(1, count // 20))
+    enrollments = []
+    for i, student in enumerate(students, start=1):
+        enrollment = Enrollment(id=i, student=student, course=courses[i % len(courses)], enrolled_at=CREATED_AT)
+        # Building the summary also caches it as `enrollment.progress`, as select_related would.
+        EnrollmentProgress(
+            enrollment=enrollment, completed_lessons=i % 12, total_lessons=12,
+            last_lesson_id=i if i % 4 else None, last_activity_at=CREATED_AT if i % 4 else None,
+        )
+        enrollments.append(enrollment)
+    return enrollments, {}
+
+
+@dataclass
+class Benchmark:
+    name: str
+    full: type
+    lean: type
+    build: object  # callable taking a count and returning (instances, serializer context)
+
+
+BENCHMARKS = [
+    Benchmark('user', UserSerializer, UserReadSerializer, build_users),
+    Benchmark('course', CourseSerializer, CourseReadSerializer, build_courses),
+    Benchmark('lesson', LessonSerializer, LessonReadSerializer, build_lessons),
+    Benchmark('quiz', QuizSerializer, QuizReadSerializer, build_quizzes),
+    Benchmark('student_enrollment', StudentEnrollmentSerializer, StudentEnrollmentReadSerializer, build_enrollments),
+    Benchmark('roster', CourseRosterSerializer, CourseRosterReadSerializer, build_enrollments),
+]
+
+
+def serialize(serializer_class, instances, context):
+    return serializer_class(instances, many=True, context=context).data
+
+
+def measure(serializer_class, instances, context, repeat):
+    """Objects per second (best of `repeat` runs) and bytes allocated while rendering."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(serializer_class, instances, context)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        data = serialize(serializer_class, instances, context)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del data
+
+    count = len(instances)
+    return {
+        'objects_per_second': round(count / best) if best else None,
+        'seconds': round(best, 6),
+        'peak_bytes_per_object': round(peak / count),
+        'retained_bytes_per_object': round(retained / count),
+    }
+
+
+def run_benchmarks(count=1000, repeat=5, names=None):
+    """Run the selected benchmarks (all by default) and return the report."""
+    selected = [benchmark for benchmark in BENCHMARKS if names is None or benchmark.name in names]
+    unknown = set(names or ()) - {benchmark.name for benchmark in BENCHMARKS}
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}.")
+    if count < 1 or repeat < 1:
+        raise ValueError('count and repeat must be positive.')
+
+    results = {}
+    with database_blocked():
+        for benchmark in selected:
+            instances, context = benchmark.build(count)
+            full = measure(benchmark.full, instances, context, repeat)
+            lean = measure(benchmark.lean, instances, context, repeat)
+            results[benchmark.name] = {
+                'full': {'serializer': benchmark.full.__name__, **full},
+                'lean': {'serializer': benchmark.lean.__name__, **lean},
+                'speedup': round(full['seconds'] / lean['seconds'], 2) if lean['seconds'] else None,
+            }
+    return {'config': {'count': count, 'repeat': repeat}, 'benchmarks': results}
+
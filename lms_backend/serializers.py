@@ -0,0 +1,17 @@
+"""Helpers shared by the read-only serializers that list endpoints render with.
+
+Those serializers subclass DRF's `BaseSerializer` and build each dict by hand
+in `to_representation`: no field objects are bound per instance and no
+validators are constructed, which is most of a `ModelSerializer`'s cost when
+it only renders. Their output must stay identical to the full serializer they
+stand in for; `lms_backend.tests.ReadSerializerTests` compares the two.
+"""
+
+from rest_framework import serializers
+
+_datetime_field = serializers.DateTimeField()
+
+
+def datetime_representation(value):
+    """Format a datetime exactly as a default `DateTimeField` would (None stays None)."""
+    return _datetime_field.to_representation(value)
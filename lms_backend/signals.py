@@ -0,0 +1,18 @@
+"""Helpers shared by the apps' signal handlers."""
+
+from django.db.models import QuerySet
+
+
+def deleted_in_cascade(sender, origin):
+    """
+    Whether a delete signal for `sender` fires because a row of another model
+    is being deleted (e.g. lessons removed with their course).
+
+    Handlers use it to skip work on a parent that is going away too. `origin`
+    is what `delete()` was called on: an instance or a queryset, or None when
+    the signal is sent by hand or by a collector built without one.
+    """
+    if origin is None:
+        return False
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is not sender
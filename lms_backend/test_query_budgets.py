@@ -0,0 +1,253 @@
+"""
+Query budgets for every API endpoint.
+
+Each case runs once against a small data set and once against a large one
+(more courses, lessons, questions, enrollments, attempts and users). The two
+query counts must be equal, so no endpoint issues a query per row, and must
+stay within the budget checked in to `query_budgets.json`. Caches are
+cleared before every request, so the budgets cover the uncached path.
+
+After a deliberate change, regenerate the file with
+`UPDATE_QUERY_BUDGETS=1 python manage.py test lms_backend.test_query_budgets`
+and review the diff.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, resolve
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts import authentication
+from accounts.models import User
+from courses.models import Course
+from enrollments.models import Enrollment
+from enrollments.progress import rebuild_progress_summaries
+from lessons.models import Lesson, LessonProgress
+from lms_backend import throttling
+from quizzes import answer_keys, delivery
+from quizzes.models import Answer, Choice, Question, Quiz, QuizAttempt
+
+BUDGETS_PATH = Path(__file__).with_name('query_budgets.json')
+
+# Cascading deletes run one statement per 100 rows, so no table may grow past
+# 100 rows per course at the large size or the counts differ by batching alone.
+SMALL, LARGE = 5, 50
+
+# The Django admin is not part of the API.
+UNBUDGETED_PREFIXES = ('admin/',)
+# The lesson router's API root is shadowed by the lesson list, which is registered at the empty prefix.
+UNREACHABLE_ROUTES = {'api/lessons/', 'api/lessons/<drf_format_suffix:format>'}
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: object  # callable taking the seeded data
+    actor: str = None  # attribute of the seeded data to authenticate as
+    data: object = None  # callable taking the seeded data
+    status: tuple = (200,)
+    fmt: str = 'json'
+
+
+CASES = [
+    # Accounts and tokens
+    Case('register', 'POST', lambda d: '/api/accounts/register/',
+         data=lambda d: {'username': 'budget_new', 'email': 'budget_new@example.com', 'password': 'password123'}, status=(201,)),
+    Case('login', 'POST', lambda d: '/api/accounts/login/',
+         data=lambda d: {'username': d.student.username, 'password': 'password123'}),
+    Case('login refresh', 'POST', lambda d: '/api/accounts/login/refresh/', data=lambda d: {'refresh': d.refresh}),
+    Case('token refresh', 'POST', lambda d: '/api/token/refresh/', data=lambda d: {'refresh': d.refresh}),
+    Case('token verify', 'POST', lambda d: '/api/token/verify/', data=lambda d: {'token': d.refresh}),
+    Case('me', 'GET', lambda d: '/api/accounts/me/', actor='student'),
+    Case('admin user list', 'GET', lambda d: '/api/accounts/users/', actor='admin'),
+    Case('admin user update', 'PATCH', lambda d: f'/api/accounts/users/{d.others[0].id}/', actor='admin',
+         data=lambda d: {'role': 'teacher'}),
+    Case('admin user export', 'GET', lambda d: '/api/accounts/users/export.csv', actor='admin'),
+    # Courses
+    Case('catalog', 'GET', lambda d: '/api/courses/'),
+    Case('course create', 'POST', lambda d: '/api/courses/', actor='teacher',
+         data=lambda d: {'title': 'Budgeted', 'description': 'New course.'}, status=(201,)),
+    Case('my courses', 'GET', lambda d: '/api/courses/my/', actor='teacher'),
+    Case('course detail', 'GET', lambda d: f'/api/courses/{d.course.id}/'),
+    Case('course update', 'PATCH', lambda d: f'/api/courses/{d.course.id}/', actor='teacher',
+         data=lambda d: {'title': 'Renamed'}),
+    Case('course delete', 'DELETE', lambda d: f'/api/courses/{d.course.id}/', actor='teacher', status=(204,)),
+    # Enrollments
+    Case('my enrollments', 'GET', lambda d: '/api/enrollments/my-enrollments/', actor='student'),
+    Case('enroll', 'POST', lambda d: f'/api/enrollments/courses/{d.open_course.id}/enroll/', actor='student', status=(201,)),
+    Case('roster', 'GET', lambda d: f'/api/enrollments/courses/{d.course.id}/roster/', actor='teacher'),
+    Case('roster export', 'GET', lambda d: f'/api/enrollments/courses/{d.course.id}/roster/export.csv', actor='teacher'),
+    Case('bulk enroll', 'POST', lambda d: f'/api/enrollments/courses/{d.open_course.id}/bulk-enroll/', actor='teacher',
+         data=lambda d: {'student_ids': [student.id for student in d.others]}),
+    # Lessons
+    Case('lesson page', 'GET', lambda d: f'/courses/{d.course.id}/lessons/{d.lessons[0].id}/', fmt=None),
+    Case('lesson page (api prefix)', 'GET', lambda d: f'/api/lessons/courses/{d.course.id}/lessons/{d.lessons[0].id}/', fmt=None),
+    Case('lesson progress', 'POST', lambda d: '/api/lessons/progress/', actor='student',
+         data=lambda d: {'lesson': d.lessons[-1].id}, status=(201,)),
+    Case('lesson progress batch', 'POST', lambda d: '/api/lessons/progress/batch/', actor='student',
+         data=lambda d: {'items': [{'lesson': lesson.id, 'is_completed': False} for lesson in d.lessons]}),
+    Case('course outline', 'GET', lambda d: f'/api/lessons/courses/{d.course.id}/outline/', actor='student'),
+    Case('lesson list', 'GET', lambda d: f'/api/lessons/?course={d.course.id}', actor='student'),
+    Case('lesson list (admin)', 'GET', lambda d: '/api/lessons/', actor='admin'),
+    Case('lesson list (format suffix)', 'GET', lambda d: f'/api/lessons/.json?course={d.course.id}', actor='student', fmt=None),
+    Case('lesson detail', 'GET', lambda d: f'/api/lessons/{d.lessons[0].id}/', actor='student'),
+    Case('lesson detail (format suffix)', 'GET', lambda d: f'/api/lessons/{d.lessons[0].id}.json', actor='student', fmt=None),
+    Case('lesson create', 'POST', lambda d: '/api/lessons/', actor='teacher',
+         data=lambda d: {'course_id': d.course.id, 'title': 'Extra', 'content': 'More.', 'order': 1000}, status=(201,)),
+    # Quizzes
+    Case('quiz detail', 'GET', lambda d: f'/api/quizzes/{d.lessons[0].id}/', actor='student'),
+    Case('quiz attempt', 'POST', lambda d: '/api/quizzes/attempt/', actor='student', status=(201,),
+         data=lambda d: {'quiz': d.quiz.id, 'answers': [
+             {'question': question_id, 'selected_choice': choice_id} for question_id, choice_id in d.answers
+         ]}),
+    Case('quiz result', 'GET', lambda d: f'/api/quizzes/result/{d.attempt.id}/', actor='student'),
+    Case('quiz analytics', 'GET', lambda d: f'/api/quizzes/analytics/quiz/{d.quiz.id}/', actor='teacher'),
+    Case('course quiz analytics', 'GET', lambda d: f'/api/quizzes/analytics/course/{d.course.id}/', actor='teacher'),
+    Case('quiz attempts export', 'GET', lambda d: f'/api/quizzes/attempts/{d.quiz.id}/export.csv', actor='teacher'),
+    # Search and metrics
+    Case('search', 'GET', lambda d: '/api/search/?q=algebra', actor='student'),
+    Case('metrics', 'GET', lambda d: '/api/metrics/', actor='admin'),
+]
+
+
+class Seeded:
+    """The rows one data size creates, by role."""
+
+
+def seed(size):
+    """Create `size` of every related row the endpoints read."""
+    password = make_password('password123')
+    users = User.objects.bulk_create(
+        [User(username='budget_teacher', email='budget_teacher@example.com', role='teacher', password=password),
+         User(username='budget_admin', email='budget_admin@example.com', role='admin', is_staff=True, password=password),
+         User(username='budget_student', email='budget_student@example.com', role='student', password=password)]
+        + [User(username=f'budget_s{i}', email=f'budget_s{i}@example.com', role='student', password=password)
+           for i in range(size)]
+    )
+    d = Seeded()
+    d.teacher, d.admin, d.student, d.others = users[0], users[1], users[2], users[3:]
+
+    courses = Course.objects.bulk_create(
+        [Course(title=f'Algebra {i}', description='Linear algebra basics.', teacher=d.teacher) for i in range(size + 1)]
+    )
+    d.course, d.open_course = courses[0], courses[-1]
+    d.lessons = Lesson.objects.bulk_create(
+        [Lesson(course=d.course, title=f'Algebra lesson {i}', content='Vectors.', order=i) for i in range(size)]
+    )
+    quizzes = Quiz.objects.bulk_create([Quiz(lesson=lesson, title=f'Quiz {lesson.order}') for lesson in d.lessons])
+    d.quiz = quizzes[0]
+    questions = Question.objects.bulk_create(
+        [Question(quiz=d.quiz, text=f'Question {i}?', explanation='Because.') for i in range(size)]
+    )
+    choices = Choice.objects.bulk_create(
+        [Choice(question=question, text=f'Choice {i}', is_correct=i == 0) for question in questions for i in range(2)]
+    )
+    d.answers = [(choice.question_id, choice.id) for choice in choices if choice.is_correct]
+
+    Enrollment.objects.bulk_create(
+        [Enrollment(student=d.student, course=course) for course in courses[:-1]]
+        + [Enrollment(student=student, course=d.course) for student in d.others]
+    )
+    LessonProgress.objects.bulk_create(
+        [LessonProgress(student=d.student, lesson=lesson, is_completed=True) for lesson in d.lessons[:-1]]
+        + [LessonProgress(student=student, lesson=d.lessons[0], is_completed=True) for student in d.others]
+    )
+    rebuild_progress_summaries()
+
+    attempts = QuizAttempt.objects.bulk_create(
+        [QuizAttempt(student=d.student, quiz=d.quiz, score=100.0)]
+        + [QuizAttempt(student=student, quiz=d.quiz, score=50.0) for student in d.others]
+    )
+    d.attempt = attempts[0]
+    Answer.objects.bulk_create(
+        [Answer(attempt=d.attempt, question_id=question_id, selected_choice_id=choice_id) for question_id, choice_id in d.answers]
+        + [Answer(attempt=attempt, question_id=d.answers[0][0], selected_choice_id=d.answers[0][1]) for attempt in attempts[1:]]
+    )
+    d.refresh = str(RefreshToken.for_user(d.student))
+    return d
+
+
+def api_routes(patterns=None, prefix=''):
+    """Every reachable route in the URLconf outside the admin."""
+    routes = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if route.startswith(UNBUDGETED_PREFIXES) or route in UNREACHABLE_ROUTES:
+            continue
+        if hasattr(pattern, 'url_patterns'):
+            routes |= api_routes(pattern.url_patterns, route)
+        else:
+            routes.add(route)
+    return routes
+
+
+def load_budgets():
+    if not BUDGETS_PATH.exists():
+        return {}
+    return json.loads(BUDGETS_PATH.read_text(encoding='utf-8'))
+
+
+class QueryBudgetTests(APITestCase):
+    def _reset_caches(self):
+        cache.clear()
+        authentication._users.clear()
+        answer_keys._local_keys.clear()
+        delivery._local_payloads.clear()
+
+    def _count(self, case, data):
+        """Run one request in a savepoint that is rolled back afterwards and return its query count."""
+        self._reset_caches()
+        path = case.path(data)
+        self.routes.add(resolve(path.split('?')[0]).route)
+        client = APIClient()
+        if case.actor:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(getattr(data, case.actor))}')
+        payload = case.data(data) if case.data else None
+        savepoint = transaction.savepoint()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, case.method.lower())(path, payload, format=case.fmt)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+        finally:
+            transaction.savepoint_rollback(savepoint)
+        self.assertIn(response.status_code, case.status, f'{case.name}: {getattr(response, "data", response)}')
+        return len(queries)
+
+    def _measure(self, size):
+        savepoint = transaction.savepoint()
+        try:
+            data = seed(size)
+            return {case.name: self._count(case, data) for case in CASES}
+        finally:
+            transaction.savepoint_rollback(savepoint)
+
+    def test_query_counts_are_flat_and_within_budget(self):
+        throttling.get_counter_store().flushdb()
+        self.routes = set()
+        small, large = self._measure(SMALL), self._measure(LARGE)
+        self.assertEqual(api_routes() - self.routes, set(), 'These routes have no query budget case')
+        if os.environ.get('UPDATE_QUERY_BUDGETS'):
+            BUDGETS_PATH.write_text(json.dumps(large, indent=2) + '\n', encoding='utf-8')
+        budgets = load_budgets()
+        for case in CASES:
+            with self.subTest(case.name):
+                self.assertEqual(
+                    small[case.name], large[case.name],
+                    f'{case.name}: {small[case.name]} queries with {SMALL} rows but {large[case.name]} with {LARGE}',
+                )
+                self.assertIn(case.name, budgets, f'{case.name} has no budget; run with UPDATE_QUERY_BUDGETS=1')
+                self.assertLessEqual(
+                    large[case.name], budgets[case.name],
+                    f'{case.name}: {large[case.name]} queries, over its budget of {budgets[case.name]}',
+                )
+
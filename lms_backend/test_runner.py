@@ -0,0 +1,28 @@
+"""Test runner that keeps the suite's throttle counters out of the real store."""
+
+import os
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    `DiscoverRunner` with `THROTTLE_STORE_LOCATION` pointed at a temporary
+    file for the whole run, so every run starts with empty counters and never
+    touches the `throttle.sqlite3` a local server uses.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._throttle_directory = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        self._throttle_settings = override_settings(
+            THROTTLE_STORE_LOCATION=os.path.join(self._throttle_directory.name, 'throttle.sqlite3'),
+        )
+        self._throttle_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._throttle_settings.disable()
+        self._throttle_directory.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,181 @@
+"""Sliding-window request throttles whose counters are shared by every worker.
+
+DRF's stock throttles keep a list of request timestamps per client in the
+default cache. With the LocMem cache each worker counts on its own, and the
+list is rewritten on every hit. These throttles keep two integer counters per
+client instead (this window and the previous one) and estimate the sliding
+window as `previous * (1 - elapsed / window) + current`, so memory per client
+is fixed and the check is one increment plus one read.
+
+Counters live in a store with a small Redis-compatible interface (`incrby`,
+`expire`, `mget`). By default that is `SQLiteCounterStore`, a WAL-mode SQLite
+file shared by all workers on the host; set `THROTTLE_REDIS_URL` to use Redis
+instead when running on several hosts.
+
+Views can set `throttle_cost` to charge more than one unit per request. The
+cost is taken from every rate that applies, so an expensive endpoint uses up
+both its own scope and the caller's overall budget faster.
+"""
+
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+
+class SQLiteCounterStore:
+    """
+    The subset of Redis commands the throttles need, backed by SQLite.
+
+    Each thread gets its own connection; WAL mode lets workers read while
+    another one writes, and every increment is a single atomic upsert.
+    """
+    # Fraction of increments that also delete expired rows.
+    purge_probability = 0.01
+
+    def __init__(self, location):
+        self.location = location
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.location, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_counters ('
+                'key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def incrby(self, key, amount):
+        """Add `amount` to `key` (a missing or expired key starts at 0) and return the new value."""
+        now = time.time()
+        conn = self._connection()
+        (value,) = conn.execute(
+            'INSERT INTO throttle_counters (key, value, expires_at) VALUES (?, ?, NULL) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            'value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END, '
+            'expires_at = CASE WHEN expires_at <= ? THEN NULL ELSE expires_at END '
+            'RETURNING value',
+            (key, amount, now, now),
+        ).fetchone()
+        if random.random() < self.purge_probability:
+            conn.execute('DELETE FROM throttle_counters WHERE expires_at <= ?', (now,))
+        return value
+
+    def expire(self, key, seconds):
+        self._connection().execute(
+            'UPDATE throttle_counters SET expires_at = ? WHERE key = ?', (time.time() + seconds, key)
+        )
+
+    def mget(self, keys):
+        """Return the values of `keys` in order, None for missing or expired keys."""
+        rows = dict(self._connection().execute(
+            'SELECT key, value FROM throttle_counters WHERE key IN (%s) AND (expires_at IS NULL OR expires_at > ?)'
+            % ', '.join('?' * len(keys)),
+            (*keys, time.time()),
+        ).fetchall())
+        return [rows.get(key) for key in keys]
+
+    def flushdb(self):
+        self._connection().execute('DELETE FROM throttle_counters')
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_counter_store():
+    """Return the process-wide counter store configured in settings."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _build_store()
+    return _store
+
+
+@receiver(setting_changed)
+def _forget_store(setting, **kwargs):
+    # Lets tests point the throttles at another store with override_settings.
+    global _store
+    if setting in ('THROTTLE_STORE_LOCATION', 'THROTTLE_REDIS_URL'):
+        with _store_lock:
+            _store = None
+
+
+def _build_store():
+    redis_url = getattr(settings, 'THROTTLE_REDIS_URL', None)
+    if redis_url:
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured('THROTTLE_REDIS_URL is set but the redis package is not installed.') from exc
+        return redis.Redis.from_url(redis_url)
+    return SQLiteCounterStore(getattr(settings, 'THROTTLE_STORE_LOCATION', ':memory:'))
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """`SimpleRateThrottle` counting in a shared sliding window instead of a cached history list."""
+
+    def get_cost(self, view):
+        return getattr(view, 'throttle_cost', 1)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        store = get_counter_store()
+        cost = self.get_cost(view)
+        now = self.timer()
+        window = int(now // self.duration)
+        current_key = f'throttle:{self.key}:{window}'
+        previous_key = f'throttle:{self.key}:{window - 1}'
+
+        # Increment first so concurrent workers can't both squeeze past the limit.
+        current = store.incrby(current_key, cost)
+        if current == cost:
+            store.expire(current_key, self.duration * 2)
+        previous = int(store.mget([previous_key])[0] or 0)
+
+        self.elapsed = now - window * self.duration
+        self.previous = previous
+        self.cost = cost
+        estimate = previous * (1 - self.elapsed / self.duration) + current
+        if estimate <= self.num_requests:
+            self.current = current
+            return True
+        # Refund the rejected request so a client hammering the API still recovers.
+        self.current = store.incrby(current_key, -cost)
+        return self.throttle_failure()
+
+    def wait(self):
+        """Seconds until the estimate leaves room for one more request of this cost."""
+        room = self.num_requests - self.cost - self.current
+        if room >= 0 and self.previous:
+            return max(0.0, self.duration * (1 - room / self.previous) - self.elapsed)
+        return self.duration - self.elapsed
+
+
+class UserThrottle(UserRateThrottle, SlidingWindowRateThrottle):
+    """Per-user (or per-IP when anonymous) budget, scope `user`."""
+
+
+class AnonThrottle(AnonRateThrottle, SlidingWindowRateThrottle):
+    """Per-IP budget for anonymous requests, scope `anon`."""
+
+
+class ScopedThrottle(ScopedRateThrottle, SlidingWindowRateThrottle):
+    """Extra limit for views that set `throttle_scope`; other views are not affected."""
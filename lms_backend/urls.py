@@ -8,11 +8,11 @@ The `urlpatterns` list routes URLs to views. For more information please see:
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
     TokenVerifyView,
 )
+from accounts.views import MyTokenRefreshView
 from lessons.views import lesson_detail_view
+from lms_backend.metrics import MetricsView
 
 urlpatterns = [
     # Django admin site
@@ -29,8 +29,10 @@ urlpatterns = [
     path('api/enrollments/', include('enrollments.urls')),
     path('api/lessons/', include('lessons.urls')),
     path('api/quizzes/', include('quizzes.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 
     # JWT authentication endpoints (Login is handled under accounts/urls.py)
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
 ]
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""Score statistics for a quiz or for every quiz in a course.
+
+Counts, mean, min/max and the histogram come from one aggregate query.
+Percentiles need the scores in order, which is one `values_list` fetch of a
+single float column. First-attempt vs best-attempt numbers come from one
+grouped query per (student, quiz). No model instances are built. The
+per-quiz breakdown of a course runs the same three queries grouped by quiz,
+so its cost does not grow with the number of quizzes.
+
+Results are cached under the quiz's content version (regrading bumps it) and
+its attempts version (every new or deleted attempt bumps it), so they stay
+valid until the next submission.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Min, OuterRef, Q, Subquery
+
+from .models import Quiz, QuizAttempt
+from .versions import attempts_version, quiz_version
+
+ANALYTICS_TIMEOUT = 60 * 60 * 24
+
+HISTOGRAM_BUCKETS = 10
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def _bucket_filters():
+    width = 100 / HISTOGRAM_BUCKETS
+    filters = []
+    for index in range(HISTOGRAM_BUCKETS):
+        low = index * width
+        if index == HISTOGRAM_BUCKETS - 1:
+            # The top bucket includes perfect scores.
+            filters.append((low, 100, Q(score__gte=low)))
+        else:
+            filters.append((low, low + width, Q(score__gte=low, score__lt=low + width)))
+    return filters
+
+
+def percentile(sorted_scores, p):
+    """Linearly interpolated percentile of an ascending list, like numpy's default."""
+    if not sorted_scores:
+        return None
+    position = (len(sorted_scores) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_scores) - 1)
+    return sorted_scores[lower] + (sorted_scores[upper] - sorted_scores[lower]) * (position - lower)
+
+
+def _totals(buckets):
+    return {
+        'attempts': Count('id'),
+        'students': Count('student', distinct=True),
+        'mean': Avg('score'),
+        'min': Min('score'),
+        'max': Max('score'),
+        **{f'bucket_{i}': Count('id', filter=condition) for i, (_, _, condition) in enumerate(buckets)},
+    }
+
+
+def _first_and_best(attempts):
+    """(quiz_id, first score, best score) for every student and quiz in `attempts`."""
+    first_score = QuizAttempt.objects.filter(
+        quiz_id=OuterRef('quiz_id'), student_id=OuterRef('student_id'),
+    ).order_by('completed_at', 'id').values('score')[:1]
+    return list(
+        attempts.values('student_id', 'quiz_id')
+        .annotate(best=Max('score'), first=Subquery(first_score))
+        .values_list('quiz_id', 'first', 'best')
+    )
+
+
+def compute_statistics(attempts):
+    """Return the statistics dict for a queryset of quiz attempts."""
+    attempts = attempts.order_by()
+    buckets = _bucket_filters()
+    totals = attempts.aggregate(**_totals(buckets))
+    scores = list(attempts.order_by('score').values_list('score', flat=True))
+    per_student = [(first, best) for _, first, best in _first_and_best(attempts)]
+    return _statistics(buckets, totals, scores, per_student)
+
+
+def compute_statistics_by_quiz(attempts, quiz_ids):
+    """Return {quiz_id: statistics dict} for every quiz in `quiz_ids`, in three queries."""
+    attempts = attempts.order_by()
+    buckets = _bucket_filters()
+    empty = {'attempts': 0, 'students': 0, 'mean': None, 'min': None, 'max': None}
+    empty.update({f'bucket_{i}': 0 for i in range(len(buckets))})
+    totals = {quiz_id: empty for quiz_id in quiz_ids}
+    for row in attempts.values('quiz_id').annotate(**_totals(buckets)):
+        totals[row['quiz_id']] = row
+    scores = {quiz_id: [] for quiz_id in quiz_ids}
+    for quiz_id, score in attempts.order_by('quiz_id', 'score').values_list('quiz_id', 'score'):
+        scores[quiz_id].append(score)
+    per_student = {quiz_id: [] for quiz_id in quiz_ids}
+    for quiz_id, first, best in _first_and_best(attempts):
+        per_student[quiz_id].append((first, best))
+    return {
+        quiz_id: _statistics(buckets, totals[quiz_id], scores[quiz_id], per_student[quiz_id])
+        for quiz_id in quiz_ids
+    }
+
+
+def _statistics(buckets, totals, scores, per_student):
+    first_mean = sum(first for first, _ in per_student) / len(per_student) if per_student else None
+    best_mean = sum(best for _, best in per_student) / len(per_student) if per_student else None
+
+    return {
+        'attempts': totals['attempts'],
+        'students': totals['students'],
+        'mean': _round(totals['mean']),
+        'min': _round(totals['min']),
+        'max': _round(totals['max']),
+        'median': _round(percentile(scores, 50)),
+        'percentiles': {f'p{p}': _round(percentile(scores, p)) for p in PERCENTILES},
+        'histogram': [
+            {'min': _round(low), 'max': _round(high), 'count': totals[f'bucket_{i}']}
+            for i, (low, high, _) in enumerate(buckets)
+        ],
+        'first_attempt_mean': _round(first_mean),
+        'best_attempt_mean': _round(best_mean),
+        'mean_improvement': _round(best_mean - first_mean) if per_student else None,
+        'students_improved': sum(1 for first, best in per_student if best > first),
+    }
+
+
+def _versions(quiz_ids):
+    """A short digest of the content and attempts versions of these quizzes."""
+    versions = ','.join(f'{quiz_id}.{quiz_version(quiz_id)}.{attempts_version(quiz_id)}' for quiz_id in quiz_ids)
+    return hashlib.sha1(versions.encode('utf-8')).hexdigest()
+
+
+def _quiz_key(quiz):
+    return f'quizzes:analytics:quiz:{quiz.id}:{_versions([quiz.id])}'
+
+
+def get_quiz_analytics(quiz):
+    """Statistics for one quiz, cached until its next attempt."""
+    key = _quiz_key(quiz)
+    data = cache.get(key)
+    if data is None:
+        data = {'quiz': {'id': quiz.id, 'title': quiz.title}}
+        data.update(compute_statistics(QuizAttempt.objects.filter(quiz_id=quiz.id)))
+        cache.set(key, data, timeout=ANALYTICS_TIMEOUT)
+    return data
+
+
+def get_course_analytics(course):
+    """Statistics across every quiz in a course plus a per-quiz breakdown, cached the same way."""
+    quizzes = list(Quiz.objects.filter(lesson__course_id=course.id).order_by('lesson__order', 'id').only('id', 'title'))
+    key = f'quizzes:analytics:course:{course.id}:{_versions([quiz.id for quiz in quizzes])}'
+    data = cache.get(key)
+    if data is None:
+        data = {'course': {'id': course.id, 'title': course.title}}
+        data.update(compute_statistics(QuizAttempt.objects.filter(quiz__lesson__course_id=course.id)))
+        data['quizzes'] = _quiz_breakdown(course, quizzes)
+        cache.set(key, data, timeout=ANALYTICS_TIMEOUT)
+    return data
+
+
+def _quiz_breakdown(course, quizzes):
+    """Per-quiz statistics, reusing each quiz's cached entry and computing the missing ones together."""
+    keys = {quiz.id: _quiz_key(quiz) for quiz in quizzes}
+    cached = cache.get_many(keys.values())
+    missing = [quiz for quiz in quizzes if keys[quiz.id] not in cached]
+    if missing:
+        statistics = compute_statistics_by_quiz(
+            QuizAttempt.objects.filter(quiz_id__in=[quiz.id for quiz in missing]),
+            [quiz.id for quiz in missing],
+        )
+        computed = {}
+        for quiz in missing:
+            entry = {'quiz': {'id': quiz.id, 'title': quiz.title}}
+            entry.update(statistics[quiz.id])
+            computed[keys[quiz.id]] = entry
+        cache.set_many(computed, timeout=ANALYTICS_TIMEOUT)
+        cached.update(computed)
+    return [cached[keys[quiz.id]] for quiz in quizzes]
@@ -0,0 +1,80 @@
+"""Cached answer keys: which choice is correct for each question of a quiz.
+
+Keys are read on every submission and every result view, so they are kept in
+a per-process LRU in front of the Django cache, both under the quiz's content
+version (see `quizzes/versions.py`). Saving or deleting a `Question` or
+`Choice` bumps that version. The worker that saved the edit uses the new key
+at once; other workers only see the bump through a shared cache, so the LRU
+entries, and the cache entries when the cache is local memory, expire after
+`QUIZ_CACHE_TTL` seconds to bound how long a stale key can grade submissions.
+"""
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from lms_backend.caching import LRUCache
+from .models import Question
+from .versions import content_cache_timeout, quiz_version
+
+ANSWER_KEY_TIMEOUT = 60 * 60
+
+_local_keys = LRUCache(
+    maxsize=getattr(settings, 'ANSWER_KEY_LRU_SIZE', 512),
+    ttl=getattr(settings, 'QUIZ_CACHE_TTL', 30),
+)
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    The correct and valid choices for every question in one quiz.
+
+    `correct` maps question id -> correct choice id (None if the question has
+    no correct choice); `choices` maps question id -> set of its choice ids.
+    """
+    quiz_id: int
+    correct: dict
+    choices: dict
+
+    @property
+    def total_questions(self):
+        return len(self.choices)
+
+
+def load_answer_key(quiz_id):
+    """Build the answer key for a quiz from the database with a single query."""
+    correct = {}
+    choices = {}
+    rows = Question.objects.filter(quiz_id=quiz_id).values_list('id', 'choices__id', 'choices__is_correct')
+    for question_id, choice_id, is_correct in rows:
+        # LEFT JOIN: questions without choices still appear, with a NULL choice.
+        valid = choices.setdefault(question_id, set())
+        correct.setdefault(question_id, None)
+        if choice_id is not None:
+            valid.add(choice_id)
+            if is_correct and correct[question_id] is None:
+                correct[question_id] = choice_id
+    return AnswerKey(
+        quiz_id=quiz_id,
+        correct=correct,
+        choices={question_id: frozenset(ids) for question_id, ids in choices.items()},
+    )
+
+
+def get_answer_key(quiz_id):
+    """Return the current answer key for a quiz, from the LRU, the shared cache or the database."""
+    version = quiz_version(quiz_id)
+    local_key = (quiz_id, version)
+    answer_key = _local_keys.get(local_key)
+    if answer_key is not None:
+        return answer_key
+
+    cache_key = f'quizzes:answer_key:{quiz_id}:{version}'
+    answer_key = cache.get(cache_key)
+    if answer_key is None:
+        answer_key = load_answer_key(quiz_id)
+        cache.set(cache_key, answer_key, timeout=content_cache_timeout(ANSWER_KEY_TIMEOUT))
+    _local_keys.set(local_key, answer_key)
+    return answer_key
@@ -0,0 +1,77 @@
+"""Cached quiz delivery payloads.
+
+During a class session every student opens the same quiz, so the rendered
+JSON for a quiz (the `QuizSerializer` output, rendered by its read-only
+variant) is built once per quiz version, from a single prefetched
+question/choice tree, and shared as bytes from a per-process LRU and the
+Django cache. Like answer keys, payloads expire after `QUIZ_CACHE_TTL` where
+an edit's version bump can't reach this worker (see
+`quizzes.versions.content_cache_timeout`). `aget_quiz_payload` is the same
+lookup for async views; only a miss on both caches leaves the event loop, to
+build the payload.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from lms_backend.caching import LRUCache
+from lms_backend.responses import render_json
+from .models import Quiz, Question
+from .serializers import QuizReadSerializer
+from .versions import aquiz_version, content_cache_timeout, quiz_version
+
+QUIZ_PAYLOAD_TIMEOUT = 60 * 60
+
+_local_payloads = LRUCache(
+    maxsize=getattr(settings, 'QUIZ_PAYLOAD_LRU_SIZE', 128),
+    ttl=getattr(settings, 'QUIZ_CACHE_TTL', 30),
+)
+
+
+def delivery_queryset():
+    """Quizzes with their questions and choices loaded in two extra queries."""
+    return Quiz.objects.prefetch_related(
+        Prefetch('questions', queryset=Question.objects.order_by('id').prefetch_related('choices')),
+    )
+
+
+def build_quiz_payload(quiz_id):
+    """Serialize and render one quiz to JSON bytes."""
+    quiz = delivery_queryset().get(pk=quiz_id)
+    return render_json(QuizReadSerializer(quiz).data)
+
+
+def get_quiz_payload(quiz_id):
+    """Return the rendered JSON bytes for a quiz, building them on a cache miss."""
+    version = quiz_version(quiz_id)
+    local_key = (quiz_id, version)
+    payload = _local_payloads.get(local_key)
+    if payload is not None:
+        return payload
+
+    cache_key = f'quizzes:payload:{quiz_id}:{version}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = build_quiz_payload(quiz_id)
+        cache.set(cache_key, payload, timeout=content_cache_timeout(QUIZ_PAYLOAD_TIMEOUT))
+    _local_payloads.set(local_key, payload)
+    return payload
+
+
+async def aget_quiz_payload(quiz_id):
+    """`get_quiz_payload` for async views."""
+    version = await aquiz_version(quiz_id)
+    local_key = (quiz_id, version)
+    payload = _local_payloads.get(local_key)
+    if payload is not None:
+        return payload
+
+    cache_key = f'quizzes:payload:{quiz_id}:{version}'
+    payload = await cache.aget(cache_key)
+    if payload is None:
+        payload = await sync_to_async(build_quiz_payload)(quiz_id)
+        await cache.aset(cache_key, payload, timeout=content_cache_timeout(QUIZ_PAYLOAD_TIMEOUT))
+    _local_payloads.set(local_key, payload)
+    return payload
@@ -0,0 +1,99 @@
+"""Grading engine for quiz submissions.
+
+A whole submission is checked and scored against the quiz's cached answer
+key (see `quizzes/answer_keys.py`) in one pass, and the attempt plus every
+answer is written in a single transaction with `bulk_create`. Grading a 50-question quiz therefore costs a
+few queries instead of a couple per question.
+"""
+
+from dataclasses import dataclass
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .answer_keys import get_answer_key
+from .models import Answer, QuizAttempt
+from .versions import bump_quiz_version
+
+
+@dataclass(frozen=True)
+class GradedSubmission:
+    score: float
+    correct_count: int
+    # (question_id, selected_choice_id) pairs, in submission order.
+    answers: list
+
+
+def grade(answer_key, answers):
+    """
+    Validate and score `answers` (dicts with `question_id` and `selected_choice_id`).
+
+    Raises ValidationError if an answer names a question from another quiz,
+    a choice that does not belong to its question, or repeats a question.
+    Unanswered questions count as incorrect.
+    """
+    errors = []
+    seen = set()
+    pairs = []
+    correct_count = 0
+    for answer in answers:
+        question_id = answer['question_id']
+        choice_id = answer['selected_choice_id']
+        if question_id not in answer_key.choices:
+            errors.append({'question': f'Question {question_id} is not part of this quiz.'})
+        elif question_id in seen:
+            errors.append({'question': f'Question {question_id} was answered more than once.'})
+        elif choice_id not in answer_key.choices[question_id]:
+            errors.append({'selected_choice': f'Choice {choice_id} does not belong to question {question_id}.'})
+        else:
+            errors.append({})
+            seen.add(question_id)
+            pairs.append((question_id, choice_id))
+            if answer_key.correct[question_id] == choice_id:
+                correct_count += 1
+    if any(errors):
+        raise ValidationError({'answers': errors})
+
+    total = answer_key.total_questions
+    score = (correct_count / total) * 100 if total > 0 else 0
+    return GradedSubmission(score=score, correct_count=correct_count, answers=pairs)
+
+
+def save_attempt(student, quiz, graded):
+    """Write the attempt and all of its answers in one transaction."""
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(student_id=student.pk, quiz=quiz, score=graded.score)
+        Answer.objects.bulk_create([
+            Answer(attempt=attempt, question_id=question_id, selected_choice_id=choice_id)
+            for question_id, choice_id in graded.answers
+        ])
+    return attempt
+
+
+def regrade_quiz(quiz_id):
+    """
+    Recompute the score of every attempt on a quiz from its stored answers.
+
+    Use this after fixing a wrong answer key. Returns the number of attempts
+    whose score changed.
+    """
+    answer_key = get_answer_key(quiz_id)
+    total = answer_key.total_questions
+    correct_counts = {}
+    answers = Answer.objects.filter(attempt__quiz_id=quiz_id).values_list('attempt_id', 'question_id', 'selected_choice_id')
+    for attempt_id, question_id, choice_id in answers.iterator(chunk_size=2000):
+        if answer_key.correct.get(question_id) == choice_id:
+            correct_counts[attempt_id] = correct_counts.get(attempt_id, 0) + 1
+
+    changed = []
+    for attempt in QuizAttempt.objects.filter(quiz_id=quiz_id).only('id', 'score'):
+        score = (correct_counts.get(attempt.id, 0) / total) * 100 if total > 0 else 0
+        if score != attempt.score:
+            attempt.score = score
+            changed.append(attempt)
+    with transaction.atomic():
+        QuizAttempt.objects.bulk_update(changed, ['score'], batch_size=500)
+    if changed:
+        # Cached results embed the score, so make them re-render.
+        bump_quiz_version(quiz_id)
+    return len(changed)
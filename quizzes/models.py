@@ -8,6 +8,8 @@ from lessons.models import Lesson
 class Quiz(models.Model):
     lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='quiz')
     title = models.CharField(max_length=200)
+    # When the quiz or any of its questions or choices last changed (see quizzes/signals.py).
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.title
@@ -17,6 +19,7 @@ class Question(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='questions')
     text = models.TextField(help_text="The question text.")
     explanation = models.TextField(blank=True, help_text="Explanation for why the correct answer is right.")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.text[:50]
@@ -26,6 +29,7 @@ class Choice(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='choices')
     text = models.CharField(max_length=500)
     is_correct = models.BooleanField(default=False, help_text="Is this the correct answer?")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.question.text[:30]} - {self.text[:30]}"
@@ -37,6 +41,12 @@ class QuizAttempt(models.Model):
     score = models.FloatField(help_text="The final score as a percentage (e.g., 85.7).")
     completed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # A student's attempts at a quiz in order: attempt history and first-attempt analytics.
+            models.Index(fields=['student', 'quiz', 'completed_at'], name='quizattempt_student_quiz_time'),
+        ]
+
     def __str__(self):
         return f"{self.student.username}'s attempt on {self.quiz.title}"
 
@@ -0,0 +1,69 @@
+"""Query plan and cache for rendering quiz results.
+
+A result is rendered from a fixed number of queries (attempt with quiz,
+answers with questions, choices), with the correct choice resolved in
+memory from the cached answer key. Attempts are immutable once submitted, so
+the rendered bytes are cached per attempt and quiz version; editing the quiz
+or regrading it bumps the version.
+"""
+
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from lms_backend.responses import render_json
+from .models import Answer, QuizAttempt
+from .serializers import QuizResultSerializer
+from .versions import quiz_version
+
+RESULT_TIMEOUT = 60 * 60 * 24
+
+AttemptOwner = namedtuple('AttemptOwner', ['student_id', 'quiz_id'])
+
+
+def result_queryset():
+    """Attempts with everything QuizResultSerializer reads, loaded up front."""
+    return QuizAttempt.objects.select_related('quiz').prefetch_related(
+        Prefetch(
+            'answers',
+            queryset=Answer.objects.select_related('question').prefetch_related('question__choices').order_by('id'),
+        )
+    )
+
+
+def _owner_key(attempt_id):
+    return f'quizzes:attempt_owner:{attempt_id}'
+
+
+def get_attempt_owner(attempt_id):
+    """
+    Return who took an attempt and on which quiz, or None if it doesn't exist.
+
+    Neither ever changes after submission, so the answer is cached until the
+    attempt is deleted.
+    """
+    owner = cache.get(_owner_key(attempt_id))
+    if owner is None:
+        row = QuizAttempt.objects.filter(pk=attempt_id).values_list('student_id', 'quiz_id').first()
+        if row is None:
+            return None
+        owner = AttemptOwner(*row)
+        cache.set(_owner_key(attempt_id), owner, timeout=RESULT_TIMEOUT)
+    return owner
+
+
+def forget_attempt(attempt_id):
+    """Drop cached data for a deleted attempt."""
+    cache.delete(_owner_key(attempt_id))
+
+
+def get_result_payload(attempt_id, quiz_id):
+    """Return the rendered JSON bytes for an attempt's result."""
+    cache_key = f'quizzes:result:{attempt_id}:{quiz_version(quiz_id)}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        attempt = result_queryset().get(pk=attempt_id)
+        payload = render_json(QuizResultSerializer(attempt).data)
+        cache.set(cache_key, payload, timeout=RESULT_TIMEOUT)
+    return payload
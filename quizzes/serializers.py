@@ -2,6 +2,9 @@
 
 from rest_framework import serializers
 from .models import Quiz, Question, Choice, QuizAttempt, Answer
+from .answer_keys import get_answer_key
+from .grading import grade, save_attempt
+from lms_backend.metrics import TimedSerializerMixin
 
 class ChoiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,46 +19,63 @@ class QuestionSerializer(serializers.ModelSerializer):
         model = Question
         fields = ['id', 'text', 'choices']
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
         model = Quiz
         fields = ['id', 'title', 'lesson', 'questions']
 
-class AnswerSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Answer
-        fields = ['question', 'selected_choice']
+class QuizReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only `QuizSerializer` output, used to build the cached delivery payload.
+
+    Expects questions and choices to be prefetched, as `delivery_queryset()` does.
+    """
+
+    def to_representation(self, quiz):
+        return {
+            'id': quiz.id,
+            'title': quiz.title,
+            'lesson': quiz.lesson_id,
+            'questions': [
+                {
+                    'id': question.id,
+                    'text': question.text,
+                    'choices': [{'id': choice.id, 'text': choice.text} for choice in question.choices.all()],
+                }
+                for question in quiz.questions.all()
+            ],
+        }
+
+class AnswerSubmissionSerializer(serializers.Serializer):
+    """
+    One submitted answer, taken as plain ids.
+
+    The ids are checked against the quiz's answer key in one pass by the
+    grading engine instead of being fetched one row at a time here.
+    """
+    question = serializers.IntegerField(source='question_id')
+    selected_choice = serializers.IntegerField(source='selected_choice_id')
 
-class QuizAttemptSerializer(serializers.ModelSerializer):
-    answers = AnswerSerializer(many=True)
+class QuizAttemptSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    answers = AnswerSubmissionSerializer(many=True)
 
     class Meta:
         model = QuizAttempt
         fields = ['id', 'quiz', 'answers']
         read_only_fields = ['id']
 
+    def validate(self, attrs):
+        # Validate every answer and compute the score against the answer key at once.
+        answer_key = get_answer_key(attrs['quiz'].id)
+        attrs['graded'] = grade(answer_key, attrs['answers'])
+        return attrs
+
     def create(self, validated_data):
-        answers_data = validated_data.pop('answers')
         # Assuming student is from the request, will be added in the view
         student = self.context['request'].user
-
-        # Calculate score
-        total_questions = validated_data['quiz'].questions.count()
-        correct_answers = 0
-        for answer_data in answers_data:
-            choice = answer_data['selected_choice']
-            if choice.is_correct:
-                correct_answers += 1
-        
-        score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-
-        attempt = QuizAttempt.objects.create(student=student, score=score, **validated_data)
-        for answer_data in answers_data:
-            Answer.objects.create(attempt=attempt, **answer_data)
-            
-        return attempt
+        return save_attempt(student, validated_data['quiz'], validated_data['graded'])
 
 # Serializers for displaying quiz results, including correct answers and explanations.
 
@@ -73,6 +93,14 @@ class QuestionResultSerializer(serializers.ModelSerializer):
         fields = ['id', 'text', 'explanation', 'choices', 'correct_choice']
 
     def get_correct_choice(self, obj):
+        # QuizResultSerializer puts the quiz's cached answer key in the context.
+        answer_key = self.context.get('answer_key')
+        if answer_key is not None:
+            correct_id = answer_key.correct.get(obj.id)
+            for choice in obj.choices.all():
+                if choice.id == correct_id:
+                    return CorrectChoiceSerializer(choice).data
+            return None
         try:
             correct_choice = obj.choices.get(is_correct=True)
             return CorrectChoiceSerializer(correct_choice).data
@@ -86,7 +114,7 @@ class AnswerResultSerializer(serializers.ModelSerializer):
         model = Answer
         fields = ['question', 'selected_choice']
 
-class QuizResultSerializer(serializers.ModelSerializer):
+class QuizResultSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer to show the results of a quiz attempt, including explanations.
     """
@@ -96,3 +124,8 @@ class QuizResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuizAttempt
         fields = ['id', 'student', 'quiz_title', 'score', 'completed_at', 'answers']
+
+    def to_representation(self, instance):
+        # Load the answer key once per result; nested serializers share this context.
+        self.context.setdefault('answer_key', get_answer_key(instance.quiz_id))
+        return super().to_representation(instance)
@@ -0,0 +1,63 @@
+"""Signal handlers that invalidate cached quiz data when quizzes or attempts change.
+
+They also keep `updated_at` honest for conditional GETs: question and choice
+writes touch their quiz, and adding or removing a quiz touches its lesson,
+whose output includes the quiz id. Rows removed in a cascade leave their
+parent alone, since the parent is being deleted too.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from lessons.models import Lesson
+from lms_backend.conditional import touch
+from lms_backend.signals import deleted_in_cascade
+from .models import Quiz, Question, Choice, QuizAttempt
+from .results import forget_attempt
+from .versions import bump_attempts_version, bump_quiz_version
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def invalidate_on_quiz_change(sender, instance, signal, created=False, origin=None, **kwargs):
+    bump_quiz_version(instance.id)
+    # Editing a quiz leaves the lesson's output alone; adding or removing one changes its quiz id.
+    if (created or signal is post_delete) and not deleted_in_cascade(sender, origin):
+        touch(Lesson.objects.filter(pk=instance.lesson_id))
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_on_question_change(sender, instance, origin=None, **kwargs):
+    bump_quiz_version(instance.quiz_id)
+    if not deleted_in_cascade(sender, origin):
+        touch(Quiz.objects.filter(pk=instance.quiz_id))
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_on_choice_change(sender, instance, origin=None, **kwargs):
+    if deleted_in_cascade(sender, origin):
+        # Removed in a cascade from its question or above, whose own handler bumps the version.
+        return
+    if Choice.question.is_cached(instance):
+        quiz_id = instance.question.quiz_id
+    else:
+        # Look the quiz up by id so a question deleted in the same cascade doesn't break this.
+        quiz_id = Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        bump_quiz_version(quiz_id)
+        touch(Quiz.objects.filter(pk=quiz_id))
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def invalidate_on_attempt_delete(sender, instance, **kwargs):
+    forget_attempt(instance.id)
+    bump_attempts_version(instance.quiz_id)
+
+
+@receiver(post_save, sender=QuizAttempt)
+def invalidate_analytics_on_attempt(sender, instance, created=False, **kwargs):
+    # Attempts are never edited through the ORM (regrading bumps the quiz version instead).
+    if created:
+        bump_attempts_version(instance.quiz_id)
@@ -1,10 +1,19 @@
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from accounts.models import User
 from courses.models import Course
 from lessons.models import Lesson
-from .models import Quiz, Question, Choice, QuizAttempt
+from .models import Quiz, Question, Choice, QuizAttempt, Answer
+from .answer_keys import get_answer_key
+from .grading import regrade_quiz
+from .versions import content_cache_timeout
 
 
 class QuizFlowTests(APITestCase):
@@ -92,3 +101,290 @@ class QuizFlowTests(APITestCase):
 		result_url = reverse('quiz-result', kwargs={'id': attempt_id})
 		resp_other = self.client.get(result_url)
 		self.assertEqual(resp_other.status_code, status.HTTP_404_NOT_FOUND)
+
+	def test_choice_from_another_question_is_rejected(self):
+		self.client.force_authenticate(user=self.student)
+		payload = {
+			'quiz': self.quiz.id,
+			'answers': [{'question': self.q1.id, 'selected_choice': self.q2_correct.id}],
+		}
+		resp = self.client.post(self.attempt_url, payload, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+		self.assertIn('selected_choice', resp.data['answers'][0])
+		self.assertFalse(QuizAttempt.objects.exists())
+
+	def test_question_from_another_quiz_and_duplicates_are_rejected(self):
+		other_lesson = Lesson.objects.create(course=self.quiz.lesson.course, title='Other', content='Body', order=2)
+		other_quiz = Quiz.objects.create(lesson=other_lesson, title='Other Quiz')
+		foreign = Question.objects.create(quiz=other_quiz, text='Foreign?')
+		foreign_choice = Choice.objects.create(question=foreign, text='Yes', is_correct=True)
+		self.client.force_authenticate(user=self.student)
+		payload = {
+			'quiz': self.quiz.id,
+			'answers': [
+				{'question': foreign.id, 'selected_choice': foreign_choice.id},
+				{'question': self.q1.id, 'selected_choice': self.q1_correct.id},
+				{'question': self.q1.id, 'selected_choice': self.q1_wrong.id},
+			],
+		}
+		resp = self.client.post(self.attempt_url, payload, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+		errors = resp.data['answers']
+		self.assertIn('question', errors[0])
+		self.assertEqual(errors[1], {})
+		self.assertIn('question', errors[2])
+
+
+class QuizDeliveryTests(APITestCase):
+	"""Quiz delivery is served from a per-version cached payload."""
+
+	def setUp(self):
+		cache.clear()
+		self.student = User.objects.create_user(
+			username='delivery_student', password='Pass!12345', role='student', email='delivery_student@example.com'
+		)
+		course = Course.objects.create(title='Delivery Course', description='Quizzes', teacher=self.student)
+		self.lesson = Lesson.objects.create(course=course, title='Delivery Lesson', content='Body', order=1)
+		self.empty_lesson = Lesson.objects.create(course=course, title='No Quiz', content='Body', order=2)
+		self.quiz = Quiz.objects.create(lesson=self.lesson, title='Delivery Quiz')
+		for i in range(3):
+			question = Question.objects.create(quiz=self.quiz, text=f'Q{i}?')
+			Choice.objects.create(question=question, text='A', is_correct=True)
+			Choice.objects.create(question=question, text='B', is_correct=False)
+		self.url = reverse('quiz-detail', kwargs={'lesson_id': self.lesson.id})
+		self.client.force_authenticate(user=self.student)
+
+	def test_missing_quiz_returns_404(self):
+		resp = self.client.get(reverse('quiz-detail', kwargs={'lesson_id': self.empty_lesson.id}))
+		self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+	def test_cached_payload_only_costs_the_quiz_lookup(self):
+		first = self.client.get(self.url)
+		with self.assertNumQueries(1):
+			second = self.client.get(self.url)
+		self.assertEqual(second.content, first.content)
+		self.assertEqual(len(second.json()['questions']), 3)
+		self.assertNotIn('is_correct', second.content.decode())
+
+	def test_edits_are_visible_on_the_next_request(self):
+		self.client.get(self.url)
+		choice = Choice.objects.filter(question__quiz=self.quiz).first()
+		choice.text = 'Edited'
+		choice.save()
+		resp = self.client.get(self.url)
+		texts = {c['text'] for q in resp.json()['questions'] for c in q['choices']}
+		self.assertIn('Edited', texts)
+
+	def test_unchanged_quiz_returns_304_from_the_lookup_alone(self):
+		first = self.client.get(self.url)
+		with self.assertNumQueries(1):
+			resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+		self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+		self.assertNotIn('Last-Modified', first)
+
+	def test_question_and_choice_edits_touch_the_quiz(self):
+		etag = self.client.get(self.url)['ETag']
+		choice = Choice.objects.filter(question__quiz=self.quiz).first()
+		choice.is_correct = not choice.is_correct
+		choice.save()
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+		etag = resp['ETag']
+		Question.objects.filter(quiz=self.quiz).first().delete()
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(len(resp.json()['questions']), 2)
+
+
+class QuizGradingQueryTests(APITestCase):
+	"""Grading and result rendering cost the same number of queries for any quiz length."""
+
+	def setUp(self):
+		self.student = User.objects.create_user(
+			username='grading_student', password='Pass!12345', role='student', email='grading_student@example.com'
+		)
+		course = Course.objects.create(title='Grading Course', description='Big quizzes', teacher=self.student)
+		self.lesson_count = 0
+		self.course = course
+		self.attempt_url = reverse('quiz-attempt')
+		self.client.force_authenticate(user=self.student)
+
+	def _make_quiz(self, questions):
+		self.lesson_count += 1
+		lesson = Lesson.objects.create(course=self.course, title=f'L{self.lesson_count}', content='Body', order=self.lesson_count)
+		quiz = Quiz.objects.create(lesson=lesson, title=f'Quiz {self.lesson_count}')
+		answers = []
+		for i in range(questions):
+			question = Question.objects.create(quiz=quiz, text=f'Q{i}?')
+			right = Choice.objects.create(question=question, text='Right', is_correct=True)
+			Choice.objects.create(question=question, text='Wrong', is_correct=False)
+			answers.append({'question': question.id, 'selected_choice': right.id})
+		return quiz, answers
+
+	def _submit(self, quiz, answers):
+		with CaptureQueriesContext(connection) as ctx:
+			resp = self.client.post(self.attempt_url, {'quiz': quiz.id, 'answers': answers}, format='json')
+		self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+		return len(ctx.captured_queries)
+
+	def test_submission_query_count_does_not_grow_with_questions(self):
+		small_quiz, small_answers = self._make_quiz(5)
+		large_quiz, large_answers = self._make_quiz(50)
+		self.assertEqual(self._submit(small_quiz, small_answers), self._submit(large_quiz, large_answers))
+		attempt = QuizAttempt.objects.get(quiz=large_quiz)
+		self.assertAlmostEqual(attempt.score, 100.0)
+		self.assertEqual(Answer.objects.filter(attempt=attempt).count(), 50)
+
+	def _result_queries(self, attempt):
+		cache.clear()
+		with CaptureQueriesContext(connection) as ctx:
+			resp = self.client.get(reverse('quiz-result', kwargs={'id': attempt.id}))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		return len(ctx.captured_queries), resp
+
+	def test_result_query_count_does_not_grow_with_questions(self):
+		small_quiz, small_answers = self._make_quiz(5)
+		large_quiz, large_answers = self._make_quiz(40)
+		self._submit(small_quiz, small_answers)
+		self._submit(large_quiz, large_answers)
+		small, _ = self._result_queries(QuizAttempt.objects.get(quiz=small_quiz))
+		large, resp = self._result_queries(QuizAttempt.objects.get(quiz=large_quiz))
+		self.assertEqual(small, large)
+		answer = resp.data['answers'][0]
+		self.assertEqual(answer['question']['correct_choice']['id'], answer['selected_choice'])
+
+	def test_repeat_result_views_are_served_from_cache(self):
+		quiz, answers = self._make_quiz(3)
+		self._submit(quiz, answers)
+		url = reverse('quiz-result', kwargs={'id': QuizAttempt.objects.get(quiz=quiz).id})
+		first = self.client.get(url)
+		with self.assertNumQueries(0):
+			second = self.client.get(url)
+		self.assertEqual(second.content, first.content)
+
+	def test_regrade_refreshes_cached_result(self):
+		quiz, answers = self._make_quiz(2)
+		self._submit(quiz, answers)
+		attempt = QuizAttempt.objects.get(quiz=quiz)
+		url = reverse('quiz-result', kwargs={'id': attempt.id})
+		self.assertAlmostEqual(self.client.get(url).data['score'], 100.0)
+		question = Question.objects.filter(quiz=quiz).first()
+		question.choices.update(is_correct=False)
+		question.save()
+		regrade_quiz(quiz.id)
+		self.assertAlmostEqual(self.client.get(url).data['score'], 50.0)
+
+
+class AnswerKeyCacheTests(APITestCase):
+	"""Answer keys are served from cache and rebuilt when questions or choices change."""
+
+	def setUp(self):
+		cache.clear()
+		self.student = User.objects.create_user(
+			username='key_student', password='Pass!12345', role='student', email='key_student@example.com'
+		)
+		course = Course.objects.create(title='Key Course', description='Keys', teacher=self.student)
+		lesson = Lesson.objects.create(course=course, title='Key Lesson', content='Body', order=1)
+		self.quiz = Quiz.objects.create(lesson=lesson, title='Key Quiz')
+		self.question = Question.objects.create(quiz=self.quiz, text='Pick one')
+		self.right = Choice.objects.create(question=self.question, text='Right', is_correct=True)
+		self.wrong = Choice.objects.create(question=self.question, text='Wrong', is_correct=False)
+
+	def test_repeat_reads_skip_the_database(self):
+		get_answer_key(self.quiz.id)
+		with self.assertNumQueries(0):
+			answer_key = get_answer_key(self.quiz.id)
+		self.assertEqual(answer_key.correct, {self.question.id: self.right.id})
+		self.assertEqual(answer_key.choices[self.question.id], {self.right.id, self.wrong.id})
+
+	def test_choice_and_question_changes_invalidate_the_key(self):
+		get_answer_key(self.quiz.id)
+		self.right.is_correct = False
+		self.right.save()
+		self.wrong.is_correct = True
+		self.wrong.save()
+		self.assertEqual(get_answer_key(self.quiz.id).correct, {self.question.id: self.wrong.id})
+		extra = Question.objects.create(quiz=self.quiz, text='Another')
+		self.assertEqual(get_answer_key(self.quiz.id).total_questions, 2)
+		extra.delete()
+		self.assertEqual(get_answer_key(self.quiz.id).total_questions, 1)
+
+	def test_keys_expire_unless_the_cache_is_shared(self):
+		with override_settings(SHARED_CACHE=False, QUIZ_CACHE_TTL=30):
+			self.assertEqual(content_cache_timeout(3600), 30)
+		with override_settings(SHARED_CACHE=True):
+			self.assertEqual(content_cache_timeout(3600), 3600)
+
+	def test_regrade_applies_a_corrected_key(self):
+		attempt = QuizAttempt.objects.create(student=self.student, quiz=self.quiz, score=100.0)
+		Answer.objects.create(attempt=attempt, question=self.question, selected_choice=self.right)
+		self.right.is_correct = False
+		self.right.save()
+		self.wrong.is_correct = True
+		self.wrong.save()
+		self.assertEqual(regrade_quiz(self.quiz.id), 1)
+		attempt.refresh_from_db()
+		self.assertAlmostEqual(attempt.score, 0.0)
+
+
+class QuizAnalyticsTests(APITestCase):
+	"""Score statistics are aggregated in the database and cached until the next attempt."""
+
+	def setUp(self):
+		cache.clear()
+		self.teacher = User.objects.create_user(username='stats_teacher', password='Pass!12345', role='teacher', email='stats_teacher@example.com')
+		self.other_teacher = User.objects.create_user(username='stats_other', password='Pass!12345', role='teacher', email='stats_other@example.com')
+		self.course = Course.objects.create(title='Stats Course', description='Scores', teacher=self.teacher)
+		lesson = Lesson.objects.create(course=self.course, title='Stats lesson', content='Body', order=1)
+		self.quiz = Quiz.objects.create(lesson=lesson, title='Stats quiz')
+		self.students = [
+			User.objects.create_user(username=f'stats_s{i}', password='Pass!12345', role='student', email=f'stats_s{i}@example.com')
+			for i in range(3)
+		]
+		# (student, score) in submission order: first attempts 40/60/100, retakes 80 and 90.
+		for student, score in [(0, 40), (1, 60), (2, 100), (0, 80), (1, 90)]:
+			QuizAttempt.objects.create(student=self.students[student], quiz=self.quiz, score=score)
+		self.url = reverse('quiz-analytics', kwargs={'quiz_id': self.quiz.id})
+		self.client.force_authenticate(user=self.teacher)
+
+	def test_quiz_statistics(self):
+		resp = self.client.get(self.url)
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		data = resp.data
+		self.assertEqual((data['attempts'], data['students']), (5, 3))
+		self.assertEqual(data['mean'], 74.0)
+		self.assertEqual((data['min'], data['max'], data['median']), (40.0, 100.0, 80.0))
+		self.assertEqual(data['percentiles']['p25'], 60.0)
+		self.assertEqual([bucket['count'] for bucket in data['histogram']], [0, 0, 0, 0, 1, 0, 1, 0, 1, 2])
+		self.assertEqual(data['first_attempt_mean'], 66.67)
+		self.assertEqual(data['best_attempt_mean'], 90.0)
+		self.assertEqual(data['students_improved'], 2)
+
+	def test_results_are_cached_until_the_next_attempt(self):
+		self.client.get(self.url)
+		with self.assertNumQueries(1):
+			# Only the quiz lookup for the permission check.
+			self.client.get(self.url)
+		QuizAttempt.objects.create(student=self.students[2], quiz=self.quiz, score=0)
+		self.assertEqual(self.client.get(self.url).data['attempts'], 6)
+
+	def test_course_statistics_include_each_quiz(self):
+		resp = self.client.get(reverse('course-quiz-analytics', kwargs={'course_id': self.course.id}))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		self.assertEqual(resp.data['attempts'], 5)
+		self.assertEqual([quiz['quiz']['id'] for quiz in resp.data['quizzes']], [self.quiz.id])
+
+	def test_only_the_course_teacher_or_admin_can_view(self):
+		for user in (self.other_teacher, self.students[0]):
+			self.client.force_authenticate(user=user)
+			self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+	def test_attempts_export_streams_every_attempt(self):
+		resp = self.client.get(reverse('quiz-attempts-export', kwargs={'quiz_id': self.quiz.id, 'fmt': 'ndjson'}))
+		self.assertEqual(resp.status_code, status.HTTP_200_OK)
+		rows = [json.loads(line) for line in b''.join(resp.streaming_content).decode().splitlines()]
+		self.assertEqual([row['score'] for row in rows], [40, 60, 100, 80, 90])
+		self.assertEqual(rows[0]['username'], 'stats_s0')
+		self.client.force_authenticate(user=self.other_teacher)
+		resp = self.client.get(reverse('quiz-attempts-export', kwargs={'quiz_id': self.quiz.id, 'fmt': 'csv'}))
+		self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,10 +1,13 @@
-"""Routes for fetching quizzes, submitting attempts, and viewing results."""
+"""Routes for fetching quizzes, submitting attempts, viewing results, and score analytics."""
 
 from django.urls import path
-from .views import QuizDetailView, QuizAttemptView, QuizResultView
+from .views import QuizDetailView, QuizAttemptView, QuizResultView, QuizAnalyticsView, CourseQuizAnalyticsView, QuizAttemptExportView
 
 urlpatterns = [
     path('<int:lesson_id>/', QuizDetailView.as_view(), name='quiz-detail'),
     path('attempt/', QuizAttemptView.as_view(), name='quiz-attempt'),
     path('result/<int:id>/', QuizResultView.as_view(), name='quiz-result'),
+    path('analytics/quiz/<int:quiz_id>/', QuizAnalyticsView.as_view(), name='quiz-analytics'),
+    path('analytics/course/<int:course_id>/', CourseQuizAnalyticsView.as_view(), name='course-quiz-analytics'),
+    path('attempts/<int:quiz_id>/export.<str:fmt>', QuizAttemptExportView.as_view(), name='quiz-attempts-export'),
 ]
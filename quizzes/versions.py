@@ -0,0 +1,58 @@
+"""Per-quiz content versions shared by the quiz caches.
+
+Anything cached from a quiz's title, questions or choices (answer keys,
+delivery payloads) is stored under the quiz's current version. The signal
+handlers in `quizzes/signals.py` bump it on every write. Analytics also
+depend on the attempts, which have their own version bumped per attempt so
+that submissions don't throw away the content caches.
+"""
+
+from django.conf import settings
+
+from lms_backend.caching import aget_version, bump_version, get_version
+
+
+def _version_key(quiz_id):
+    return f'quizzes:version:{quiz_id}'
+
+
+def quiz_version(quiz_id):
+    """Return the current content version of a quiz."""
+    return get_version(_version_key(quiz_id))
+
+
+async def aquiz_version(quiz_id):
+    """`quiz_version` for async views."""
+    return await aget_version(_version_key(quiz_id))
+
+
+def bump_quiz_version(quiz_id):
+    """Invalidate everything cached for this quiz."""
+    bump_version(_version_key(quiz_id))
+
+
+def content_cache_timeout(timeout):
+    """
+    Return how long to keep something cached under a quiz's content version.
+
+    Bumps only reach other workers through a shared cache. With per-process
+    local memory, a worker that didn't handle an edit keeps reading the old
+    version, so its entries must expire after `QUIZ_CACHE_TTL` instead.
+    """
+    if getattr(settings, 'SHARED_CACHE', False):
+        return timeout
+    return getattr(settings, 'QUIZ_CACHE_TTL', 30)
+
+
+def _attempts_version_key(quiz_id):
+    return f'quizzes:attempts:version:{quiz_id}'
+
+
+def attempts_version(quiz_id):
+    """Return the version of a quiz's attempt set, which moves on every new or deleted attempt."""
+    return get_version(_attempts_version_key(quiz_id))
+
+
+def bump_attempts_version(quiz_id):
+    """Invalidate everything computed from this quiz's attempts (analytics)."""
+    bump_version(_attempts_version_key(quiz_id))
@@ -1,21 +1,52 @@
-"""Quiz endpoints for retrieval, submission, and result viewing."""
+"""Quiz endpoints for retrieval, submission, result viewing, score analytics, and attempt exports."""
 
+from django.db.models import F
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from accounts.authz import get_authorization
+from courses.models import Course
+from lms_backend import conditional
+from lms_backend.async_views import AsyncAPIView
+from lms_backend.exports import streaming_export
+from lms_backend.responses import PrerenderedJSONResponse
+from .analytics import get_course_analytics, get_quiz_analytics
+from .delivery import aget_quiz_payload
+from .results import get_attempt_owner, get_result_payload, result_queryset
 from .models import Quiz, QuizAttempt
 from .serializers import QuizSerializer, QuizAttemptSerializer, QuizResultSerializer
 
 # /api/quizzes/<lesson_id>/
-class QuizDetailView(generics.RetrieveAPIView):
+class QuizDetailView(AsyncAPIView, generics.RetrieveAPIView):
     """
     Provides the quiz for a specific lesson.
+
+    The rendered payload is cached per quiz version (see `quizzes/delivery.py`),
+    so each request only has to look up which quiz belongs to the lesson and
+    when it last changed. A client that still has that version gets a 304.
+    Async: the lookup and the cache reads don't hold a worker thread.
     """
     serializer_class = QuizSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_object(self):
+    async def aget_quiz_version(self):
+        """Return the lesson's quiz id and `updated_at`, which question and choice edits move too."""
         lesson_id = self.kwargs.get('lesson_id')
-        # Using get() will raise a 404 if the quiz doesn't exist, which is what we want.
-        return Quiz.objects.get(lesson__id=lesson_id)
+        row = await Quiz.objects.filter(lesson_id=lesson_id).values_list('id', 'updated_at').afirst()
+        if row is None:
+            raise NotFound('No quiz exists for this lesson.')
+        return row
+
+    async def get(self, request, *args, **kwargs):
+        quiz_id, updated_at = await self.aget_quiz_version()
+        etag = conditional.make_etag(updated_at)
+        not_modified = conditional.not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = PrerenderedJSONResponse(await aget_quiz_payload(quiz_id))
+        return conditional.set_etag(response, etag)
 
 # /api/quizzes/attempt/
 class QuizAttemptView(generics.CreateAPIView):
@@ -24,6 +55,9 @@ class QuizAttemptView(generics.CreateAPIView):
     """
     serializer_class = QuizAttemptSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Grading writes a row per answer: 5 units of 150/hour is 30 submissions an hour.
+    throttle_scope = 'quiz_attempt'
+    throttle_cost = 5
 
     def get_serializer_context(self):
         """
@@ -36,6 +70,10 @@ class QuizAttemptView(generics.CreateAPIView):
 class QuizResultView(generics.RetrieveAPIView):
     """
     Shows the results of a specific quiz attempt.
+
+    Results are rendered once from a fixed set of queries and then served
+    from cache (see `quizzes/results.py`); an attempt's owner is cached too,
+    so repeat views don't touch the database.
     """
     serializer_class = QuizResultSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -46,4 +84,56 @@ class QuizResultView(generics.RetrieveAPIView):
         """
         Ensure users can only see their own quiz results.
         """
-        return self.queryset.filter(student=self.request.user)
+        return result_queryset().filter(student_id=self.request.user.pk)
+
+    def retrieve(self, request, *args, **kwargs):
+        attempt_id = self.kwargs['id']
+        owner = get_attempt_owner(attempt_id)
+        # Other students' attempts look exactly like missing ones.
+        if owner is None or owner.student_id != request.user.id:
+            raise NotFound()
+        return PrerenderedJSONResponse(get_result_payload(attempt_id, owner.quiz_id))
+
+# /api/quizzes/analytics/quiz/<quiz_id>/
+class QuizAnalyticsView(APIView):
+    """
+    Score statistics for one quiz, for the course teacher or an admin.
+
+    Attempt count, mean/median/percentiles, a histogram, and first-attempt vs
+    best-attempt means. Computed in the database and cached until the next attempt.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, quiz_id):
+        quiz = get_object_or_404(Quiz.objects.select_related('lesson').only('id', 'title', 'lesson__course'), pk=quiz_id)
+        if not get_authorization(request).can_manage_course(quiz.lesson.course_id):
+            raise PermissionDenied('Only the course teacher or an admin can view quiz analytics.')
+        return Response(get_quiz_analytics(quiz))
+
+# /api/quizzes/analytics/course/<course_id>/
+class CourseQuizAnalyticsView(APIView):
+    """
+    The same statistics across every quiz in a course, plus one entry per quiz.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, course_id):
+        course = get_object_or_404(Course.objects.only('id', 'title'), pk=course_id)
+        if not get_authorization(request).can_manage_course(course.id):
+            raise PermissionDenied('Only the course teacher or an admin can view quiz analytics.')
+        return Response(get_course_analytics(course))
+
+# /api/quizzes/attempts/<quiz_id>/export.<fmt>
+class QuizAttemptExportView(APIView):
+    """
+    Stream every attempt on a quiz as CSV or NDJSON, for the course teacher or an admin.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    columns = ['id', 'student_id', 'username', 'score', 'completed_at']
+
+    def get(self, request, quiz_id, fmt):
+        quiz = get_object_or_404(Quiz.objects.select_related('lesson').only('id', 'lesson__course'), pk=quiz_id)
+        if not get_authorization(request).can_manage_course(quiz.lesson.course_id):
+            raise PermissionDenied('Only the course teacher or an admin can export quiz attempts.')
+        rows = QuizAttempt.objects.filter(quiz_id=quiz.id).order_by('id').annotate(username=F('student__username'))
+        return streaming_export(request, rows, self.columns, fmt, f'quiz-{quiz.id}-attempts')
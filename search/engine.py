@@ -0,0 +1,150 @@
+"""Ranked full-text search over courses and lessons.
+
+SQLite queries the FTS5 `search_index` table; PostgreSQL queries weighted
+tsvectors backed by GIN indexes. Both are created in
+`search/migrations/0001_search_index.py`; the SQLite index is kept in sync by
+the triggers in `search/sqlite_index.py`. Courses are public, like the
+catalog, while lesson hits are limited by `Lesson.objects.visible_to(user)`
+so search never reveals content the lesson API would hide.
+
+Titles and snippets are HTML: the engines mark matches with control
+characters that can't come from user input, the text is escaped, and only
+then are the markers turned into `<mark>` tags. A lesson containing markup
+comes back as text, never as live tags.
+"""
+
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.utils.html import escape
+
+from lessons.models import Lesson
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+# What the engines wrap matches in; swapped for the tags after escaping.
+MARKER_START = '\x02'
+MARKER_END = '\x03'
+# Long queries add cost without improving results; only the first few terms are used.
+MAX_TERMS = 8
+
+SQLITE_SEARCH = """
+    SELECT rowid, course_id,
+           highlight(search_index, 1, %s, %s),
+           snippet(search_index, 2, %s, %s, '…', 16),
+           bm25(search_index, 0.0, 10.0, 1.0) AS rank
+    FROM search_index
+    WHERE search_index MATCH %s AND (rowid %% 2 = 0 OR {lesson_filter})
+    ORDER BY rank
+    LIMIT %s
+"""
+
+POSTGRES_SEARCH = """
+    SELECT kind, id, course_id,
+           ts_headline('english', title, query, %s),
+           ts_headline('english', body, query, %s),
+           ts_rank(document, query) AS rank
+    FROM (
+        SELECT 'course' AS kind, id, id AS course_id, title, description AS body,
+               setweight(to_tsvector('english', title), 'A') ||
+               setweight(to_tsvector('english', description), 'B') AS document
+        FROM courses_course
+        UNION ALL
+        SELECT 'lesson', id, course_id, title, content,
+               setweight(to_tsvector('english', title), 'A') ||
+               setweight(to_tsvector('english', content), 'B')
+        FROM lessons_lesson
+        WHERE {lesson_filter}
+    ) AS documents, to_tsquery('english', %s) AS query
+    WHERE document @@ query
+    ORDER BY rank DESC
+    LIMIT %s
+"""
+
+
+def search_terms(text):
+    """Split user input into plain word terms so no query syntax reaches the engine."""
+    return re.findall(r'\w+', text.lower())[:MAX_TERMS]
+
+
+def render_highlight(text):
+    """Escape highlighted column text and turn the engine's match markers into `<mark>` tags."""
+    # A stray marker in user text can at worst add a bare <mark>, which carries no attributes or script.
+    return str(escape(text)).replace(MARKER_START, HIGHLIGHT_START).replace(MARKER_END, HIGHLIGHT_END)
+
+
+def _visible_lessons_sql(user, column):
+    """Return `column IN (<visible lesson ids>)` SQL, or a false clause if none are visible."""
+    queryset = Lesson.objects.visible_to(user).order_by().values('id')
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return '1 = 0', ()
+    return f'{column} IN ({sql})', params
+
+
+def search(user, text, limit=20):
+    """
+    Return ranked hits for `text` as dicts with type, id, course_id, title,
+    snippet and score. Titles and snippets are escaped HTML with matches in <mark> tags.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgres(user, terms, limit)
+    return _search_sqlite(user, terms, limit)
+
+
+def _search_sqlite(user, terms, limit):
+    # Each term is quoted and prefix-matched; terms are ANDed together.
+    match = ' '.join(f'"{term}"*' for term in terms)
+    lesson_filter, lesson_params = _visible_lessons_sql(user, '(rowid - 1) / 2')
+    sql = SQLITE_SEARCH.format(lesson_filter=lesson_filter)
+    params = [
+        MARKER_START, MARKER_END,
+        MARKER_START, MARKER_END,
+        match, *lesson_params, limit,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': 'course' if rowid % 2 == 0 else 'lesson',
+            'id': rowid // 2,
+            'course_id': course_id,
+            'title': render_highlight(title),
+            'snippet': render_highlight(snippet),
+            # bm25() is lower-is-better; flip it so higher scores rank first for clients.
+            'score': -rank,
+        }
+        for rowid, course_id, title, snippet, rank in rows
+    ]
+
+
+def _search_postgres(user, terms, limit):
+    query = ' & '.join(f'{term}:*' for term in terms)
+    headline_options = f'StartSel={MARKER_START}, StopSel={MARKER_END}'
+    lesson_filter, lesson_params = _visible_lessons_sql(user, 'id')
+    sql = POSTGRES_SEARCH.format(lesson_filter=lesson_filter)
+    params = [
+        'HighlightAll=true, ' + headline_options,
+        'MaxWords=24, MinWords=8, ' + headline_options,
+        *lesson_params, query, limit,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': kind,
+            'id': object_id,
+            'course_id': course_id,
+            'title': render_highlight(title),
+            'snippet': render_highlight(snippet),
+            'score': rank,
+        }
+        for kind, object_id, course_id, title, snippet, rank in rows
+    ]
@@ -0,0 +1,74 @@
+"""Create the full-text index for courses and lessons.
+
+SQLite gets an FTS5 table kept in sync by the triggers in
+`search/sqlite_index.py`, which later migrations re-run whenever a table
+rebuild drops them.
+PostgreSQL gets GIN expression indexes on the weighted tsvectors that
+`search/engine.py` queries, so no extra table has to be maintained.
+"""
+
+from django.db import migrations
+
+from search import sqlite_index
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_index USING fts5(
+        course_id UNINDEXED, title, body, tokenize = 'porter unicode61'
+    )
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS search_index",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX search_course_document ON courses_course USING GIN ((
+        setweight(to_tsvector('english', title), 'A') ||
+        setweight(to_tsvector('english', description), 'B')
+    ))
+    """,
+    """
+    CREATE INDEX search_lesson_document ON lessons_lesson USING GIN ((
+        setweight(to_tsvector('english', title), 'A') ||
+        setweight(to_tsvector('english', content), 'B')
+    ))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS search_course_document",
+    "DROP INDEX IF EXISTS search_lesson_document",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+def _drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        sqlite_index.drop_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_alter_course_description'),
+        ('lessons', '0004_remove_lessonprogress_unique_user_lesson_progress_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+        # Also indexes everything that existed before this migration.
+        migrations.RunPython(sqlite_index.reinstall_triggers, _drop_triggers),
+    ]
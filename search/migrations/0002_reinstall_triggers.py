@@ -0,0 +1,23 @@
+"""Restore the SQLite search triggers after `updated_at` was added.
+
+Adding `Course.updated_at` and `Lesson.updated_at` rebuilds both tables on
+SQLite, which drops the triggers that keep `search_index` in sync. Databases
+that had `0001` applied before those migrations lost them.
+"""
+
+from django.db import migrations
+
+from search import sqlite_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_updated_at'),
+        ('lessons', '0007_lesson_updated_at'),
+        ('search', '0001_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(sqlite_index.reinstall_triggers, migrations.RunPython.noop),
+    ]
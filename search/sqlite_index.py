@@ -0,0 +1,85 @@
+"""Triggers that keep the SQLite `search_index` FTS5 table in sync.
+
+The index is maintained by triggers on `courses_course` and `lessons_lesson`,
+so bulk inserts, queryset updates and cascaded deletes are indexed too. Rowids
+encode the source row: courses use `id * 2` and lessons use `id * 2 + 1`.
+
+SQLite can't alter most columns in place, so Django rebuilds the table for
+many schema changes (adding a NOT NULL column, AlterField, ...), and the
+rebuild drops the table's triggers without any warning. Every migration that
+changes the schema of `courses_course` or `lessons_lesson` must therefore be
+followed by a `search` migration that depends on it and runs
+`reinstall_triggers`, as `0002_reinstall_triggers.py` does.
+"""
+
+TRIGGERS = {
+    'search_course_insert': """
+        CREATE TRIGGER search_course_insert AFTER INSERT ON courses_course BEGIN
+            INSERT INTO search_index(rowid, course_id, title, body)
+            VALUES (new.id * 2, new.id, new.title, new.description);
+        END
+    """,
+    'search_course_update': """
+        CREATE TRIGGER search_course_update AFTER UPDATE OF title, description ON courses_course BEGIN
+            UPDATE search_index SET title = new.title, body = new.description
+            WHERE rowid = new.id * 2;
+        END
+    """,
+    'search_course_delete': """
+        CREATE TRIGGER search_course_delete AFTER DELETE ON courses_course BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 2;
+        END
+    """,
+    'search_lesson_insert': """
+        CREATE TRIGGER search_lesson_insert AFTER INSERT ON lessons_lesson BEGIN
+            INSERT INTO search_index(rowid, course_id, title, body)
+            VALUES (new.id * 2 + 1, new.course_id, new.title, new.content);
+        END
+    """,
+    'search_lesson_update': """
+        CREATE TRIGGER search_lesson_update AFTER UPDATE OF course_id, title, content ON lessons_lesson BEGIN
+            UPDATE search_index SET course_id = new.course_id, title = new.title, body = new.content
+            WHERE rowid = new.id * 2 + 1;
+        END
+    """,
+    'search_lesson_delete': """
+        CREATE TRIGGER search_lesson_delete AFTER DELETE ON lessons_lesson BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+        END
+    """,
+}
+
+REBUILD = [
+    "DELETE FROM search_index",
+    """
+    INSERT INTO search_index(rowid, course_id, title, body)
+    SELECT id * 2, id, title, description FROM courses_course
+    """,
+    """
+    INSERT INTO search_index(rowid, course_id, title, body)
+    SELECT id * 2 + 1, course_id, title, content FROM lessons_lesson
+    """,
+]
+
+
+def drop_triggers(schema_editor):
+    """Drop the sync triggers, whichever of them still exist."""
+    for name in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+def reinstall_triggers(apps, schema_editor):
+    """
+    Recreate the sync triggers and rebuild the index from the base tables.
+
+    A `RunPython` callable, safe to run any number of times. The rebuild
+    catches up on writes made while the triggers were missing. Does nothing
+    outside SQLite.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    drop_triggers(schema_editor)
+    for statement in TRIGGERS.values():
+        schema_editor.execute(statement)
+    for statement in REBUILD:
+        schema_editor.execute(statement)
@@ -0,0 +1,111 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from courses.models import Course
+from enrollments.models import Enrollment
+from lessons.models import Lesson
+
+
+class SearchAPITests(APITestCase):
+    """
+    Test suite for /api/search/.
+
+    Checks ranking and highlighting, that the index follows inserts, updates and
+    deletes, and that lesson hits follow the same visibility rules as the lesson API.
+    """
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='search_teacher', password='password123', role='teacher', email='search_teacher@example.com')
+        self.student = User.objects.create_user(username='search_student', password='password123', role='student', email='search_student@example.com')
+        self.outsider = User.objects.create_user(username='search_outsider', password='password123', role='student', email='search_outsider@example.com')
+
+        self.course = Course.objects.create(title="Python Basics", description="Variables and loops.", teacher=self.teacher)
+        self.other = Course.objects.create(title="Gardening", description="Growing python-free tomatoes.", teacher=self.teacher)
+        self.lesson = Lesson.objects.create(course=self.course, title="Working with variables", content="Assign a value to a variable.", order=1)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.url = reverse('search')
+
+    def _search(self, text):
+        resp = self.client.get(self.url, {'q': text})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.data['results']
+
+    def test_title_matches_rank_first_and_are_highlighted(self):
+        results = self._search('python')
+        self.assertEqual([r['id'] for r in results], [self.course.id, self.other.id])
+        self.assertEqual(results[0]['title'], '<mark>Python</mark> Basics')
+
+    def test_highlights_escape_user_markup(self):
+        Course.objects.create(title="Python <img src=x onerror=alert(1)>", description="<script>python()</script>", teacher=self.teacher)
+        hit = next(r for r in self._search('python') if 'img' in r['title'])
+        self.assertEqual(hit['title'], '<mark>Python</mark> &lt;img src=x onerror=alert(1)&gt;')
+        self.assertNotIn('<img', hit['title'])
+        self.assertNotIn('<script>', hit['snippet'])
+
+    def test_anonymous_users_only_see_courses(self):
+        results = self._search('variable')
+        self.assertEqual({r['type'] for r in results}, {'course'})
+
+    def test_enrolled_student_sees_lesson_snippets(self):
+        self.client.force_authenticate(user=self.student)
+        results = self._search('variable')
+        lesson_hits = [r for r in results if r['type'] == 'lesson']
+        self.assertEqual([r['id'] for r in lesson_hits], [self.lesson.id])
+        self.assertIn('<mark>', lesson_hits[0]['snippet'])
+
+    def test_not_enrolled_student_does_not_see_lessons(self):
+        self.client.force_authenticate(user=self.outsider)
+        results = self._search('variable')
+        self.assertNotIn('lesson', {r['type'] for r in results})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.client.force_authenticate(user=self.teacher)
+        self.lesson.title = 'Closures explained'
+        self.lesson.save()
+        self.assertEqual([r['id'] for r in self._search('closures')], [self.lesson.id])
+        self.course.delete()
+        self.assertEqual(self._search('closures'), [])
+
+    def test_query_syntax_is_treated_as_plain_words(self):
+        self.assertEqual(self._search('"python" OR NEAR('), self._search('python near'))
+        self.assertEqual(self._search('***'), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Only the SQLite index is maintained by triggers.')
+class SearchTriggerMigrationTests(TransactionTestCase):
+    """
+    The search triggers survive later migrations that rebuild the indexed tables.
+
+    Replays the upgrade of a database that took the search index before
+    `updated_at` was added to courses and lessons.
+    """
+    before_updated_at = [
+        ('courses', '0003_alter_course_description'),
+        ('lessons', '0006_lessonprogress_lessonprogress_student_done'),
+        ('search', '0001_search_index'),
+    ]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+
+    def _triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search_%'")
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_triggers_exist_after_migrating(self):
+        self._migrate(self.before_updated_at)
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        self.assertEqual(len(self._triggers()), 6)
+
+        teacher = User.objects.create_user(username='trigger_teacher', password='password123', role='teacher', email='trigger_teacher@example.com')
+        course = Course.objects.create(title="Pottery", description="Wheel throwing.", teacher=teacher)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT title FROM search_index WHERE rowid = %s", [course.id * 2])
+            self.assertEqual(cursor.fetchone(), ('Pottery',))
@@ -0,0 +1,8 @@
+"""Route for the full-text search endpoint."""
+
+from django.urls import path
+from .views import SearchView
+
+urlpatterns = [
+    path('', SearchView.as_view(), name='search'),
+]
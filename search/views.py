@@ -0,0 +1,32 @@
+"""Full-text search endpoint across courses and the lessons a user can read."""
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .engine import search
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+class SearchView(APIView):
+    """
+    GET /api/search/?q=<text>&limit=<n>
+
+    - Courses match for everyone, just like the public course list.
+    - Lessons only match for users who could open them through the lesson API.
+    Results are ranked best first, with matches wrapped in <mark> tags.
+    """
+    # Empty list means "AllowAny"; lesson visibility is enforced inside the query.
+    permission_classes = []
+
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        results = search(request.user, text, limit=limit) if text else []
+        return Response({'query': text, 'results': results})